@@ -1,29 +1,41 @@
 #!/usr/bin/python
 
 """simple calculator app
-"""
 
-def calculator() -> None:
-    """
-    A simple calculator function that takes user input for two numbers and an operator to perform basic arithmetic operations.
-    Handles exceptions for invalid input, invalid operators, and zero division errors.
-    """
+Calculates with floats, or with the number backend given on the command line:
+
+    ./app.py
+    ./app.py decimal 50     # decimals with 50 significant digits
+    ./app.py fraction       # exact fractions
+"""
+import sys
 
-    operations = {
+operations = {
     "+": lambda x, y: x + y,
     "-": lambda x, y: x - y,
     "*": lambda x, y: x * y,
     "/": lambda x, y: x / y
-    }
+}
+
+def calculator(backend=None) -> None:
+    """
+    A simple calculator function that takes user input for two numbers and an operator to perform basic arithmetic operations.
+    Handles exceptions for invalid input, invalid operators, and zero division errors.
+
+    Args:
+        backend (optional): The number backend from `backends.get_backend`, whose parser and operations are used
+            instead of `float` and `operations`. Defaults to None.
+    """
+    parse, table = (backend.parse, backend.operations) if backend else (float, operations)
 
     print("Simple Calculator")
     while True:
         try:
-            num1 = float(input("Enter first number: "))
+            num1 = parse(input("Enter first number: "))
             operator = input("Enter operator (+, -, *, /): ")
-            num2 = float(input("Enter second number: "))
+            num2 = parse(input("Enter second number: "))
 
-            result = operations[operator](num1, num2)
+            result = table[operator](num1, num2)
             print("Result:", num1 , operator, num2, "=", result)
             # q to quit the program or any other key to continue
             if input("Press q to quit or any other key to continue: ").lower() == "q":
@@ -35,5 +47,16 @@ def calculator() -> None:
         except ZeroDivisionError:
             print("Cannot divide by zero.")
 
+def main() -> None:
+    # imported here since backends imports the operations of this module
+    from backends import backend_from_args
+    try:
+        backend = backend_from_args(sys.argv[1:])
+    except ValueError as error:
+        print(error)
+        print("Usage: ./app.py [float|decimal [PRECISION]|fraction]")
+        return
+    calculator(backend)
+
 if __name__ == '__main__':
-    calculator()
\ No newline at end of file
+    main()
@@ -0,0 +1,154 @@
+"""calculator number backends
+
+The kinds of numbers a calculation can use, each with a parser and its own `operations` table:
+
+    - float: the interactive calculator's floats, fast but binary, so 0.1 + 0.2 is 0.30000000000000004.
+    - decimal: decimal numbers rounded to a configurable number of significant digits, for financial math.
+    - fraction: exact rational numbers, such as 1/3, that are never rounded.
+"""
+from app import operations
+from decimal import Decimal, Context, InvalidOperation, DivisionByZero
+from fractions import Fraction
+from functools import lru_cache
+
+# the number of significant digits of the decimal backend unless one is given
+DECIMAL_PRECISION = 28
+
+class FloatBackend:
+    name = "float"
+
+    def __init__(self) -> None:
+        """
+        Initializes the class instance with `float` and the `operations` of the interactive calculator.
+
+        Returns:
+            None
+        """
+        self.parse = float
+        self.operations = operations
+
+class DecimalBackend:
+    name = "decimal"
+
+    def __init__(self, precision: int = DECIMAL_PRECISION) -> None:
+        """
+        Initializes the class instance with one decimal context that every operation uses.
+
+        The operations are the bound methods of that context, so none of them looks up the thread's current context
+        or creates one, and the context's precision and rounding apply to every result. Numbers are parsed exactly
+        and only results are rounded. Overflow gives infinity, and an invalid operation, such as Infinity - Infinity
+        or any operation on a signaling NaN, gives NaN, as they do for floats, so no decimal exception is raised.
+
+        Args:
+            precision (int): The number of significant digits of results.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If the precision is not a positive number.
+        """
+        if precision < 1:
+            raise ValueError("The decimal precision must be a positive number")
+        self.precision = precision
+        self.context = Context(prec=precision, traps=[DivisionByZero])
+        self.operations = {
+            "+": self.context.add,
+            "-": self.context.subtract,
+            "*": self.context.multiply,
+            "/": self.divide
+        }
+
+    @staticmethod
+    def parse(text: str) -> Decimal:
+        """
+        Converts text to a decimal number exactly, without rounding it to the precision.
+
+        Args:
+            text (str): The number.
+
+        Returns:
+            Decimal: The number.
+
+        Raises:
+            ValueError: If the text is not a number.
+        """
+        try:
+            return Decimal(text)
+        except InvalidOperation:
+            raise ValueError(f"could not convert string to decimal: {text!r}") from None
+
+    def divide(self, x: Decimal, y: Decimal) -> Decimal:
+        """
+        Divides two decimal numbers, raising ZeroDivisionError for any zero divisor like float division does.
+
+        Args:
+            x (Decimal): The dividend.
+            y (Decimal): The divisor.
+
+        Returns:
+            Decimal: The quotient, rounded to the precision.
+        """
+        if not y:
+            raise ZeroDivisionError("decimal division by zero")
+        return self.context.divide(x, y)
+
+class FractionBackend:
+    name = "fraction"
+
+    def __init__(self) -> None:
+        """
+        Initializes the class instance with `Fraction`, which reads numbers such as "1.25" and "1/3", and the
+        `operations` of the interactive calculator, whose lambdas work on fractions as they are.
+
+        Returns:
+            None
+        """
+        self.parse = Fraction
+        self.operations = operations
+
+BACKENDS = {backend.name: backend for backend in (FloatBackend, DecimalBackend, FractionBackend)}
+
+@lru_cache(maxsize=None)
+def get_backend(name: str = "float", precision: int = None):
+    """
+    Returns a number backend, creating it the first time it is asked for, so a decimal context is created once per
+    precision and then reused.
+
+    Args:
+        name (str): float, decimal or fraction.
+        precision (int, optional): The number of significant digits of the decimal backend. Defaults to
+            `DECIMAL_PRECISION`.
+
+    Returns:
+        Union[FloatBackend, DecimalBackend, FractionBackend]: The backend.
+
+    Raises:
+        ValueError: If the backend is unknown, or a precision is given for a backend other than decimal.
+    """
+    if name.lower() not in BACKENDS:
+        raise ValueError(f'Unknown number backend "{name}", use {", ".join(BACKENDS)}')
+    if name.lower() == "decimal":
+        return DecimalBackend(DECIMAL_PRECISION if precision is None else precision)
+    if precision is not None:
+        raise ValueError("Only the decimal backend has a precision")
+    return BACKENDS[name.lower()]()
+
+def backend_from_args(args: list):
+    """
+    Returns the number backend named on a command line, such as `decimal 50` or `fraction`.
+
+    Args:
+        args (list): The backend name and, for decimal, the precision. Empty for floats.
+
+    Returns:
+        Union[FloatBackend, DecimalBackend, FractionBackend]: The backend.
+
+    Raises:
+        ValueError: If the arguments do not name a backend.
+    """
+    if len(args) > 2:
+        raise ValueError("Give a backend name and, for decimal, a precision")
+    if len(args) == 2 and not args[1].isdigit():
+        raise ValueError(f'The decimal precision "{args[1]}" is not a number')
+    return get_backend(args[0] if args else "float", int(args[1]) if len(args) == 2 else None)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""calculator batch mode
+
+Evaluates a CSV file of calculations, one `num1,operator,num2` row per line, and prints one result per line in the
+same order, or the calculator's error message for rows that cannot be calculated:
+
+    ./batch.py calculations.csv
+    ./batch.py < calculations.csv
+
+Rows are grouped by operator and each group is evaluated with NumPy array operations. Without NumPy the rows are
+evaluated one at a time with the `operations` of the interactive calculator.
+"""
+from app import operations
+import sys
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# the optional header row of a calculations file
+HEADER = "num1,operator,num2"
+
+# the NumPy function of each operator in `operations`
+UFUNCS = {"+": "add", "-": "subtract", "*": "multiply", "/": "divide"}
+
+# the error code of a row, and the message printed for it, the same as the interactive calculator's
+INVALID_NUMBER, INVALID_OPERATOR, ZERO_DIVISION = 1, 2, 3
+ERRORS = {
+    INVALID_NUMBER: "Invalid input. Please enter a valid number.",
+    INVALID_OPERATOR: "Invalid operator. Please enter a valid operator.",
+    ZERO_DIVISION: "Cannot divide by zero."
+}
+
+def read_columns(text: str) -> tuple:
+    """
+    Splits the rows of a calculations file into columns.
+
+    Blank lines and a `num1,operator,num2` header are skipped, and rows without exactly three fields are read as
+    invalid numbers.
+
+    Args:
+        text (str): The contents of the file.
+
+    Returns:
+        tuple: The lists of first numbers, operators and second numbers, as strings.
+    """
+    if text[:len(HEADER)].lower() == HEADER:
+        text = text[len(HEADER):]
+    text = text.strip("\n")
+    if not text:
+        return [], [], []
+    rows = text.count("\n") + 1
+    # every line break starts a field of its own, so the rows have three fields each only if all of them start a
+    # first number, which splitting the first numbers at the line breaks shows
+    fields = text.replace("\n", ",\n").split(",")
+    num1 = "".join(fields[0::3]).split("\n")
+    if len(fields) == 3 * rows and len(num1) == rows:
+        return num1, fields[1::3], fields[2::3]
+    fields = []
+    for line in text.splitlines():
+        if line.strip():
+            row = line.split(",")
+            fields.extend(row if len(row) == 3 else ("", "", ""))
+    return fields[0::3], fields[1::3], fields[2::3]
+
+def evaluate_rows(num1: list, operators: list, num2: list) -> list:
+    """
+    Evaluates calculations one row at a time with the `operations` of the interactive calculator.
+
+    Args:
+        num1 (list): The first numbers, as strings.
+        operators (list): The operators.
+        num2 (list): The second numbers, as strings.
+
+    Returns:
+        list: The result of each row, or its error message.
+    """
+    results = []
+    for x, operator, y in zip(num1, operators, num2):
+        try:
+            x, y = float(x), float(y)
+            results.append(str(operations[operator](x, y)))
+        except ValueError:
+            results.append(ERRORS[INVALID_NUMBER])
+        except KeyError:
+            results.append(ERRORS[INVALID_OPERATOR])
+        except ZeroDivisionError:
+            results.append(ERRORS[ZERO_DIVISION])
+    return results
+
+def parse_numbers(strings: list) -> tuple:
+    """
+    Converts a column of numbers to an array.
+
+    Args:
+        strings (list): The numbers, as strings.
+
+    Returns:
+        tuple: The array of numbers, NaN where a string is not a number, and a boolean array marking those rows.
+    """
+    try:
+        return numpy.fromiter(map(float, strings), float, len(strings)), numpy.zeros(len(strings), bool)
+    except ValueError:
+        values = numpy.empty(len(strings))
+        invalid = numpy.zeros(len(strings), bool)
+        for index, string in enumerate(strings):
+            try:
+                values[index] = float(string)
+            except ValueError:
+                values[index] = numpy.nan
+                invalid[index] = True
+        return values, invalid
+
+def evaluate_columns(num1, operators, num2) -> tuple:
+    """
+    Evaluates calculations with one NumPy operation per operator.
+
+    Each operator's rows are selected with a mask and computed in place, and division by zero is masked out per row
+    instead of raising, so the results match `evaluate_rows`. Overflow gives infinity, as it does for floats.
+
+    Args:
+        num1 (numpy.ndarray): The first numbers.
+        operators (list): The operators.
+        num2 (numpy.ndarray): The second numbers.
+
+    Returns:
+        tuple: The array of results, NaN for rows with an error, and the array of error codes, 0 for rows without one.
+    """
+    codes = "".join(operators)
+    if len(codes) == len(operators) and codes.isascii() and "" not in operators:
+        # every operator is one ASCII character, so they are compared as bytes instead of as strings
+        operators = numpy.frombuffer(codes.encode("ascii"), numpy.uint8)
+        keys = {operator: ord(operator) for operator in operations}
+    else:
+        operators = numpy.asarray(operators)
+        keys = {operator: operator for operator in operations}
+    results = numpy.full(len(num1), numpy.nan)
+    errors = numpy.full(len(num1), INVALID_OPERATOR, numpy.uint8)
+    with numpy.errstate(all="ignore"):
+        for operator in operations:
+            rows = operators == keys[operator]
+            errors[rows] = 0
+            if operator == "/":
+                zero = rows & (num2 == 0)
+                errors[zero] = ZERO_DIVISION
+                rows &= ~zero
+            getattr(numpy, UFUNCS[operator])(num1, num2, out=results, where=rows)
+    return results, errors
+
+def evaluate_text(text: str) -> list:
+    """
+    Evaluates a calculations file, with NumPy when it is installed.
+
+    Args:
+        text (str): The contents of the file.
+
+    Returns:
+        list: The result of each row, or its error message.
+    """
+    num1, operators, num2 = read_columns(text)
+    if numpy is None:
+        return evaluate_rows(num1, operators, num2)
+    num1, invalid1 = parse_numbers(num1)
+    num2, invalid2 = parse_numbers(num2)
+    results, errors = evaluate_columns(num1, operators, num2)
+    errors[invalid1 | invalid2] = INVALID_NUMBER
+    lines = list(map(str, results.tolist()))
+    for index in numpy.flatnonzero(errors).tolist():
+        lines[index] = ERRORS[int(errors[index])]
+    return lines
+
+def main() -> None:
+    if len(sys.argv) > 2:
+        print("Usage: ./batch.py [FILE]")
+        return
+    try:
+        if len(sys.argv) == 2:
+            with open(sys.argv[1]) as f:
+                text = f.read()
+        else:
+            text = sys.stdin.read()
+    except OSError as error:
+        print(error)
+        return
+    lines = evaluate_text(text)
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+
+if __name__ == '__main__':
+    main()
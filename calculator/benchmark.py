@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""calculator benchmarks
+
+Run all benchmarks with `./benchmark.py` or a single one with `./benchmark.py batch`.
+"""
+from contextlib import redirect_stdout
+from app import operations
+from expression import compile_expression, interpret, parse
+from backends import get_backend, BACKENDS
+from decimal import Context
+import subprocess
+import tempfile
+import parallel
+import stream
+import batch
+import random
+import time
+import sys
+import io
+import os
+
+def timed(function) -> float:
+    """
+    Runs a function with its output silenced and returns the elapsed time in seconds.
+
+    Args:
+        function (callable): The function to run.
+
+    Returns:
+        float: The elapsed time in seconds.
+    """
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        function()
+    return time.perf_counter() - start
+
+def make_rows(count: int, seed: int = 0) -> tuple:
+    """
+    Returns random calculations with every operator, where one in a hundred divisions is by zero.
+
+    Args:
+        count (int): The number of calculations.
+        seed (int): The random seed.
+
+    Returns:
+        tuple: The lists of first numbers, operators and second numbers, as floats.
+    """
+    generator = random.Random(seed)
+    num1 = [generator.uniform(-1000, 1000) for _ in range(count)]
+    operators = generator.choices(list(operations), k=count)
+    num2 = [0.0 if generator.random() < 0.01 else generator.uniform(-1000, 1000) for _ in range(count)]
+    return num1, operators, num2
+
+def dispatch_rows(num1: list, operators: list, num2: list) -> list:
+    """
+    Evaluates calculations one row at a time through the `operations` lambdas, like the interactive calculator.
+
+    Args:
+        num1 (list): The first numbers.
+        operators (list): The operators.
+        num2 (list): The second numbers.
+
+    Returns:
+        list: The result of each row, None for division by zero.
+    """
+    results = []
+    for x, operator, y in zip(num1, operators, num2):
+        try:
+            results.append(operations[operator](x, y))
+        except ZeroDivisionError:
+            results.append(None)
+    return results
+
+def bench_batch(count: int = 10000000) -> None:
+    """
+    Compares per-row lambda dispatch with NumPy evaluation grouped by operator, for the calculation alone and for a
+    whole CSV file from text to result lines.
+
+    Args:
+        count (int): The number of calculations.
+
+    Returns:
+        None
+    """
+    if batch.numpy is None:
+        print('batch: NumPy is not installed')
+        return
+    print(f'batch: {count} calculations')
+    num1, operators, num2 = make_rows(count)
+    dispatched = timed(lambda: dispatch_rows(num1, operators, num2))
+    x, y = batch.numpy.array(num1), batch.numpy.array(num2)
+    evaluated = timed(lambda: batch.evaluate_columns(x, operators, y))
+    print(f'  calculation   {dispatched:8.2f} s lambda per row {evaluated:8.2f} s numpy'
+          f' {dispatched / evaluated:8.1f}x')
+    del x, y
+    text = '\n'.join(f'{a},{operator},{b}' for a, operator, b in zip(num1, operators, num2))
+    del num1, operators, num2
+    rows = timed(lambda: batch.evaluate_rows(*batch.read_columns(text)))
+    columns = timed(lambda: batch.evaluate_text(text))
+    print(f'  csv to lines  {rows:8.2f} s lambda per row {columns:8.2f} s numpy {rows / columns:8.1f}x')
+
+def bench_expression(count: int = 1000000, slow_count: int = 100000) -> None:
+    """
+    Compares evaluating one formula over many variable bindings with the compiled expression, a cache lookup of the
+    compiled expression per binding, parsing and walking the tree per binding, and Python's `eval`.
+
+    Args:
+        count (int): The number of bindings for the fast evaluations.
+        slow_count (int): The number of bindings for the evaluations that parse the formula every time.
+
+    Returns:
+        None
+    """
+    source = '(x + 2 * 3) * (y - 4 / 8) / (x * x + 1) - -y + 10 * (2 - 1)'
+    generator = random.Random(0)
+    bindings = [{'x': generator.uniform(-100, 100), 'y': generator.uniform(-100, 100)} for _ in range(count)]
+    code = compile(source, '<expression>', 'eval')
+    expression = compile_expression(source)
+    results = {
+        'compiled': timed(lambda: expression.evaluate_many(bindings)) / count,
+        'cached': timed(lambda: [compile_expression(source).evaluate(variables) for variables in bindings]) / count,
+        'eval code': timed(lambda: [eval(code, {}, variables) for variables in bindings]) / count,
+        're-parse': timed(lambda: [interpret(parse(source), variables) for variables in bindings[:slow_count]]) / slow_count,
+        'eval text': timed(lambda: [eval(source, {}, variables) for variables in bindings[:slow_count]]) / slow_count,
+    }
+    print(f'expression: {source}')
+    for name, seconds in results.items():
+        print(f'  {name:<10} {1 / seconds:12.0f} evaluations/s {seconds * 1e9:10.0f} ns each')
+
+def write_lines(filename: str, count: int, seed: int = 0) -> None:
+    """
+    Writes a file of `num1 operator num2` calculations like a user would type them, with whole and decimal numbers.
+
+    Args:
+        filename (str): The file to write.
+        count (int): The number of lines.
+        seed (int): The random seed.
+
+    Returns:
+        None
+    """
+    generator = random.Random(seed)
+    decimals = ('', '.5', '.25', '.75')
+    with open(filename, 'w') as f:
+        for _ in range(count):
+            f.write(f'{generator.randrange(1000)}{generator.choice(decimals)} {generator.choice(list(operations))}'
+                    f' {generator.randrange(100)}\n')
+
+def bench_stream(count: int = 1000000) -> None:
+    """
+    Measures the lines per second of the streaming mode, in this process and as `./stream.py` in a shell pipeline,
+    where the time includes starting Python.
+
+    Args:
+        count (int): The number of lines.
+
+    Returns:
+        None
+    """
+    print(f'stream: {count} lines')
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'calculations.txt')
+        target = os.path.join(directory, 'results.txt')
+        write_lines(source, count)
+        with open(source, 'rb') as f, open(target, 'wb') as out:
+            elapsed = timed(lambda: stream.stream(f, out))
+        print(f'  in process {count / elapsed:12.0f} lines/s {elapsed:8.2f} s')
+        with open(source, 'rb') as f, open(target, 'wb') as out:
+            start = time.perf_counter()
+            subprocess.run([sys.executable, 'stream.py'], stdin=f, stdout=out, check=True,
+                           cwd=os.path.dirname(os.path.abspath(__file__)))
+            elapsed = time.perf_counter() - start
+        print(f'  pipeline   {count / elapsed:12.0f} lines/s {elapsed:8.2f} s')
+
+def bench_parallel(size: int = 2 << 30, worker_counts: tuple = (1, 2, 4, 8)) -> None:
+    """
+    Measures how the parallel file mode scales with the number of worker processes on a large file.
+
+    Args:
+        size (int): The size of the file of calculations in bytes.
+        worker_counts (tuple): The numbers of workers to compare.
+
+    Returns:
+        None
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'calculations.txt')
+        target = os.path.join(directory, 'results.txt')
+        write_lines(source, 1000000)
+        with open(source, 'rb') as f:
+            block = f.read()
+        with open(source, 'ab') as f:
+            for _ in range(size // len(block) - 1):
+                f.write(block)
+        lines = size // len(block) * 1000000
+        print(f'parallel: {os.path.getsize(source) / 1024 / 1024:.0f} MiB, {lines} lines, {os.cpu_count()} CPUs')
+        baseline = None
+        for workers in worker_counts:
+            elapsed = timed(lambda: parallel.evaluate_file(source, target, workers))
+            baseline = baseline or elapsed
+            print(f'  {workers} workers {lines / elapsed:12.0f} lines/s {elapsed:8.2f} s {baseline / elapsed:6.2f}x')
+            os.remove(target)
+
+def bench_backends(count: int = 1000000, precision: int = 28) -> None:
+    """
+    Compares the operations per second of each number backend on money amounts, and of two ways of using decimals
+    that the decimal backend avoids: the thread's current context, and a new context for every operation.
+
+    Args:
+        count (int): The number of operand pairs, each used with every operator.
+        precision (int): The precision of the decimal backend.
+
+    Returns:
+        None
+    """
+    generator = random.Random(0)
+    num1 = [f'{generator.randrange(1000000) / 100:.2f}' for _ in range(count)]
+    num2 = [f'{generator.randrange(1, 100000) / 100:.2f}' for _ in range(count)]
+    decimal = get_backend('decimal', precision)
+    variants = {name: get_backend(name, precision if name == 'decimal' else None) for name in BACKENDS}
+    variants['decimal, thread context'] = type('ThreadContext', (), {'parse': decimal.parse, 'operations': operations})
+    variants['decimal, context per op'] = type('ContextPerOp', (), {'parse': decimal.parse, 'operations': {
+        operator: (lambda name: lambda x, y: getattr(Context(prec=precision), name)(x, y))(name)
+        for operator, name in (('+', 'add'), ('-', 'subtract'), ('*', 'multiply'), ('/', 'divide'))}})
+    print(f'backends: {count} operand pairs x {len(operations)} operators, decimal precision {precision}')
+    lines = [f'{x} {operator} {y}' for x, y, operator in zip(num1, num2, generator.choices(list(operations), k=count))]
+    for name, backend in variants.items():
+        x, y = list(map(backend.parse, num1)), list(map(backend.parse, num2))
+        elapsed = timed(lambda: [list(map(function, x, y)) for function in backend.operations.values()])
+        line = f'  {name:<24} {len(operations) * count / elapsed:12.0f} ops/s'
+        if name in BACKENDS:
+            line += f' {count / timed(lambda: stream.evaluate_lines(lines, backend)):12.0f} stream lines/s'
+        print(line)
+
+benchmarks = {
+    'batch': bench_batch,
+    'expression': bench_expression,
+    'stream': bench_stream,
+    'parallel': bench_parallel,
+    'backends': bench_backends,
+}
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or benchmarks:
+        benchmarks[name]()
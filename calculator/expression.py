@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""calculator expression mode
+
+Evaluates full expressions with +, -, *, /, parentheses, unary minus and variables, and assigns variables with
+`name = expression`:
+
+    ./expression.py
+
+Each expression is parsed into a tree, its constant parts are folded and the tree is compiled into a Python function
+once, so the same formula is evaluated over many variable bindings without parsing it again.
+"""
+from app import operations
+from functools import lru_cache
+import math
+import re
+
+# the number of compiled expressions kept by `compile_expression`
+CACHE_SIZE = 1024
+
+TOKEN = re.compile(r"\s*(?:(\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)|([A-Za-z_]\w*)|(\S))")
+ASSIGNMENT = re.compile(r"\s*([A-Za-z_]\w*)\s*=(?!=)(.*)")
+
+# the binding power of each binary operator, higher binds tighter
+PRECEDENCE = {"+": 1, "-": 1, "*": 2, "/": 2}
+
+def tokenize(source: str) -> list:
+    """
+    Splits an expression into tokens.
+
+    Args:
+        source (str): The expression.
+
+    Returns:
+        list: The tokens, each a ("number", text), ("name", text) or ("symbol", text) pair.
+
+    Raises:
+        ValueError: If the expression contains a character that is not part of a token.
+    """
+    tokens = []
+    position = 0
+    source = source.rstrip()
+    while position < len(source):
+        match = TOKEN.match(source, position)
+        number, name, symbol = match.groups()
+        if number is not None:
+            tokens.append(("number", number))
+        elif name is not None:
+            tokens.append(("name", name))
+        elif symbol in PRECEDENCE or symbol in "()":
+            tokens.append(("symbol", symbol))
+        else:
+            raise ValueError(f'unexpected "{symbol}" at position {match.start(3)}')
+        position = match.end()
+    return tokens
+
+class Parser:
+    def __init__(self, tokens: list) -> None:
+        """
+        Initializes the class instance with the tokens of an expression.
+
+        The expression tree is made of tuples: ("number", value), ("name", name), ("neg", operand), and
+        (operator, left, right) for the binary operators of `operations`.
+
+        Args:
+            tokens (list): The tokens, as returned by `tokenize`.
+
+        Returns:
+            None
+        """
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> tuple:
+        return self.tokens[self.position] if self.position < len(self.tokens) else ("end", None)
+
+    def take(self) -> tuple:
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def parse(self) -> tuple:
+        """
+        Parses the whole expression.
+
+        Returns:
+            tuple: The expression tree.
+
+        Raises:
+            ValueError: If the tokens are not a valid expression, or are nested too deeply to parse recursively.
+        """
+        if not self.tokens:
+            raise ValueError("empty expression")
+        try:
+            tree = self.parse_binary(1)
+        except RecursionError:
+            raise ValueError("expression too deeply nested") from None
+        if self.peek()[0] != "end":
+            raise ValueError(f'unexpected "{self.peek()[1]}"')
+        return tree
+
+    def parse_binary(self, precedence: int) -> tuple:
+        """
+        Parses operands joined by binary operators that bind at least as tightly as `precedence`, left to right.
+
+        Args:
+            precedence (int): The lowest precedence of the operators to take.
+
+        Returns:
+            tuple: The expression tree.
+        """
+        left = self.parse_unary()
+        while True:
+            kind, value = self.peek()
+            if kind != "symbol" or PRECEDENCE.get(value, 0) < precedence:
+                return left
+            self.take()
+            left = (value, left, self.parse_binary(PRECEDENCE[value] + 1))
+
+    def parse_unary(self) -> tuple:
+        """
+        Parses a number, a variable, a parenthesized expression, or one of those after unary minus or plus.
+
+        Returns:
+            tuple: The expression tree.
+        """
+        kind, value = self.take()
+        if kind == "number":
+            return ("number", float(value))
+        if kind == "name":
+            return ("name", value)
+        if value == "-":
+            return ("neg", self.parse_unary())
+        if value == "+":
+            return self.parse_unary()
+        if value == "(":
+            tree = self.parse_binary(1)
+            if self.take() != ("symbol", ")"):
+                raise ValueError('missing ")"')
+            return tree
+        raise ValueError("unexpected end of expression" if kind == "end" else f'unexpected "{value}"')
+
+def parse(source: str) -> tuple:
+    """
+    Parses an expression into a tree. See `Parser`.
+
+    Args:
+        source (str): The expression.
+
+    Returns:
+        tuple: The expression tree.
+
+    Raises:
+        ValueError: If the expression is not valid.
+    """
+    return Parser(tokenize(source)).parse()
+
+def fold_constants(tree: tuple) -> tuple:
+    """
+    Replaces the parts of an expression tree that have no variables with their value.
+
+    A division by zero is left in the tree, so it is raised when the expression is evaluated.
+
+    Args:
+        tree (tuple): The expression tree.
+
+    Returns:
+        tuple: The folded tree.
+    """
+    kind = tree[0]
+    if kind in ("number", "name"):
+        return tree
+    if kind == "neg":
+        operand = fold_constants(tree[1])
+        return ("number", -operand[1]) if operand[0] == "number" else ("neg", operand)
+    left, right = fold_constants(tree[1]), fold_constants(tree[2])
+    if left[0] == "number" and right[0] == "number":
+        try:
+            return ("number", operations[kind](left[1], right[1]))
+        except ZeroDivisionError:
+            pass
+    return (kind, left, right)
+
+def interpret(tree: tuple, variables: dict) -> float:
+    """
+    Evaluates an expression tree by walking it, with the `operations` of the interactive calculator.
+
+    Args:
+        tree (tuple): The expression tree.
+        variables (dict): The value of each variable.
+
+    Returns:
+        float: The value of the expression.
+
+    Raises:
+        KeyError: If a variable has no value.
+        ZeroDivisionError: If the expression divides by zero.
+    """
+    kind = tree[0]
+    if kind == "number":
+        return tree[1]
+    if kind == "name":
+        return variables[tree[1]]
+    if kind == "neg":
+        return -interpret(tree[1], variables)
+    return operations[kind](interpret(tree[1], variables), interpret(tree[2], variables))
+
+def python_source(tree: tuple, names: dict, precedence: int = 0) -> str:
+    """
+    Returns the Python source of an expression tree, with only the parentheses that keep the tree's order.
+
+    Python's operators have the same precedence and left associativity as the parser's, so an operand is
+    parenthesized only if its operator binds less tightly than the one it belongs to, or as tightly when it is the
+    right operand. Python refuses more than 200 nested parentheses, so a long chain such as "1 + 2 + ... + 300" must
+    not get one per operator.
+
+    Args:
+        tree (tuple): The expression tree.
+        names (dict): The local variable name of each expression variable.
+        precedence (int): The lowest precedence the tree's operator may have without parentheses.
+
+    Returns:
+        str: The Python expression.
+    """
+    kind = tree[0]
+    if kind == "number":
+        # repr gives back the same float, and "inf" and "nan" are names of the compiled function's globals
+        return repr(tree[1])
+    if kind == "name":
+        return names[tree[1]]
+    if kind == "neg":
+        # unary minus binds more tightly than every binary operator
+        return f"-{python_source(tree[1], names, max(PRECEDENCE.values()) + 1)}"
+    source = (f"{python_source(tree[1], names, PRECEDENCE[kind])} {kind} "
+              f"{python_source(tree[2], names, PRECEDENCE[kind] + 1)}")
+    return f"({source})" if PRECEDENCE[kind] < precedence else source
+
+def compile_tree(tree: tuple):
+    """
+    Compiles an expression tree into a Python function.
+
+    The function reads each variable once into a local and computes the whole tree in one Python expression, so
+    an evaluation runs as a single function call. The generated source only holds numbers, the operators of
+    `operations` and local names chosen here, never the text of the expression. A tree that Python cannot compile,
+    such as one nested in more than 200 parentheses, is evaluated by `interpret` instead.
+
+    Args:
+        tree (tuple): The expression tree.
+
+    Returns:
+        callable: A function of the dictionary of variable values that returns the value of the expression.
+    """
+    names = {name: f"v{index}" for index, name in enumerate(sorted(tree_variables(tree)))}
+    lines = ["def evaluate(variables):"]
+    lines += [f"    {local} = variables[{name!r}]" for name, local in names.items()]
+    lines.append(f"    return {python_source(tree, names)}")
+    namespace = {"inf": math.inf, "nan": math.nan}
+    try:
+        exec(compile("\n".join(lines), "<expression>", "exec"), namespace)
+    except (SyntaxError, RecursionError, MemoryError):
+        return lambda variables: interpret(tree, variables)
+    return namespace["evaluate"]
+
+def tree_variables(tree: tuple) -> set:
+    """
+    Returns the names of the variables of an expression tree.
+
+    Args:
+        tree (tuple): The expression tree.
+
+    Returns:
+        set: The variable names.
+    """
+    if tree[0] == "number":
+        return set()
+    if tree[0] == "name":
+        return {tree[1]}
+    return set().union(*map(tree_variables, tree[1:]))
+
+class Expression:
+    def __init__(self, source: str) -> None:
+        """
+        Initializes the class instance by parsing, folding and compiling an expression.
+
+        Args:
+            source (str): The expression, such as "(x + 1) * -y / 2".
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If the expression is not valid, or is nested too deeply to be walked recursively.
+        """
+        self.source = source
+        try:
+            self.tree = fold_constants(parse(source))
+            self.variables = tree_variables(self.tree)
+        except RecursionError:
+            raise ValueError("expression too deeply nested") from None
+        self.evaluate = compile_tree(self.tree)
+
+    def evaluate_many(self, bindings) -> list:
+        """
+        Evaluates the expression once for each set of variable values.
+
+        Args:
+            bindings (iterable): The dictionaries of variable values.
+
+        Returns:
+            list: The value of the expression for each dictionary.
+
+        Raises:
+            KeyError: If a variable has no value.
+            ZeroDivisionError: If the expression divides by zero.
+        """
+        return list(map(self.evaluate, bindings))
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_expression(source: str) -> Expression:
+    """
+    Returns the compiled expression of a source text, compiling it only the first time it is seen.
+
+    The `CACHE_SIZE` most recently used expressions are kept, keyed by their exact source text.
+
+    Args:
+        source (str): The expression.
+
+    Returns:
+        Expression: The compiled expression.
+
+    Raises:
+        ValueError: If the expression is not valid.
+    """
+    return Expression(source)
+
+def expression_calculator() -> None:
+    """
+    An expression calculator that evaluates the expressions entered by the user and keeps the variables they assign.
+    Handles exceptions for invalid expressions, unknown variables and zero division errors.
+    """
+    print("Expression Calculator")
+    variables = {}
+    while True:
+        source = input("Enter expression, name = expression, or q to quit: ")
+        if source.strip().lower() == "q":
+            break
+        assignment = ASSIGNMENT.match(source)
+        name, source = assignment.groups() if assignment else (None, source)
+        try:
+            result = compile_expression(source).evaluate(variables)
+        except ValueError as error:
+            print(f"Invalid expression: {error}.")
+        except KeyError as error:
+            print(f"Unknown variable {error}.")
+        except ZeroDivisionError:
+            print("Cannot divide by zero.")
+        else:
+            if name:
+                variables[name] = result
+                print(name, "=", result)
+            else:
+                print("Result:", result)
+
+if __name__ == '__main__':
+    expression_calculator()
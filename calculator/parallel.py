@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""calculator parallel file mode
+
+Evaluates a file of calculations, one `num1 operator num2` or full expression per line like `stream.py`, on several
+processes and writes the results to another file in the same order:
+
+    ./parallel.py calculations.txt results.txt      # one worker per CPU
+    ./parallel.py calculations.txt results.txt 4    # four workers
+    ./parallel.py payments.txt results.txt 4 decimal 50     # decimals with 50 significant digits
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import deque
+from stream import evaluate_lines
+from backends import get_backend, backend_from_args
+import mmap
+import time
+import sys
+import os
+
+# the number of bytes of input evaluated by a worker at a time
+CHUNK_SIZE = 16 << 20
+
+def chunk_bounds(filename: str, chunk_size: int = CHUNK_SIZE) -> list:
+    """
+    Splits a file into chunks of about `chunk_size` bytes that end at a line break.
+
+    Args:
+        filename (str): The file.
+        chunk_size (int): The size of a chunk, which is extended to the end of the line it stops in.
+
+    Returns:
+        list: The start and end offsets of each chunk.
+    """
+    size = os.path.getsize(filename)
+    if size == 0:
+        return []
+    bounds = []
+    with open(filename, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start = 0
+        while start < size:
+            end = data.find(b"\n", min(start + chunk_size, size) - 1)
+            end = size if end < 0 else end + 1
+            bounds.append((start, end))
+            start = end
+    return bounds
+
+def evaluate_chunk(filename: str, start: int, end: int, backend_name: str = "float", precision: int = None) -> bytes:
+    """
+    Evaluates the lines of one chunk of a file. Runs in a worker process, which maps the file itself, so only the
+    offsets are sent to it, and creates the number backend once for all of its chunks.
+
+    Args:
+        filename (str): The file of calculations.
+        start (int): The offset of the first line of the chunk.
+        end (int): The offset just after the last line of the chunk.
+        backend_name (str): The number backend, float, decimal or fraction.
+        precision (int, optional): The precision of the decimal backend.
+
+    Returns:
+        bytes: The results of the chunk's lines, one per line.
+    """
+    with open(filename, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        text = data[start:end].decode("utf-8", "replace")
+    if text.endswith("\n"):
+        text = text[:-1]
+    backend = get_backend(backend_name, precision)
+    return ("\n".join(evaluate_lines(text.split("\n"), backend)) + "\n").encode("utf-8")
+
+def evaluate_file(source: str, target: str, workers: int = None, chunk_size: int = CHUNK_SIZE, backend=None) -> int:
+    """
+    Evaluates a file of calculations on a pool of worker processes and writes the results in order.
+
+    At most two chunks per worker are in flight, so the results waiting to be written stay small however large the
+    file is. The target is written to a temporary file that then replaces it. If a chunk fails, the chunks not started
+    yet are cancelled, the temporary file is removed, and the chunk's error is raised, so the target is left as it was.
+
+    Args:
+        source (str): The file of calculations.
+        target (str): The file of results.
+        workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+        chunk_size (int): The size of the chunks given to the workers.
+        backend (optional): The number backend from `backends.get_backend`, whose name and precision are sent to the
+            workers. Defaults to None, for floats.
+
+    Returns:
+        int: The number of chunks evaluated.
+
+    Raises:
+        OSError: If a file cannot be read or written.
+        BrokenProcessPool: If a worker process died.
+        Exception: Any error a worker raised while evaluating a chunk.
+    """
+    workers = workers or os.cpu_count()
+    bounds = chunk_bounds(source, chunk_size)
+    temp_filename = f"{target}.{os.getpid()}.tmp"
+    backend_args = (backend.name, getattr(backend, "precision", None)) if backend else ("float", None)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            with open(temp_filename, "wb") as f:
+                pending = deque()
+                for start, end in bounds:
+                    pending.append(executor.submit(evaluate_chunk, source, start, end, *backend_args))
+                    if len(pending) >= 2 * workers:
+                        f.write(pending.popleft().result())
+                while pending:
+                    f.write(pending.popleft().result())
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            executor.shutdown(cancel_futures=True)
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
+            raise
+    os.replace(temp_filename, target)
+    return len(bounds)
+
+def main() -> None:
+    if len(sys.argv) not in range(3, 7):
+        print("Usage: ./parallel.py SOURCE TARGET [WORKERS [float|decimal [PRECISION]|fraction]]")
+        return
+    source, target = sys.argv[1], sys.argv[2]
+    start = time.perf_counter()
+    try:
+        workers = int(sys.argv[3]) if len(sys.argv) >= 4 else None
+        if workers is not None and workers < 1:
+            raise ValueError("WORKERS must be a positive number")
+        evaluate_file(source, target, workers, backend=backend_from_args(sys.argv[4:]))
+    except (OSError, ValueError, ArithmeticError) as error:
+        print(error)
+        return
+    except BrokenProcessPool:
+        print("A worker process died, no results were written.")
+        return
+    print(f"{os.path.getsize(source) / 1024 / 1024:.1f} MiB evaluated in {time.perf_counter() - start:.2f} s")
+
+if __name__ == '__main__':
+    main()
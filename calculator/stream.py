@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""calculator streaming mode
+
+Reads calculations from standard input, one `num1 operator num2` or full expression per line, and writes one result
+per line, or an error message for lines that cannot be calculated, without prompting:
+
+    ./stream.py < calculations.txt > results.txt
+    printf '10 + 5\\n(1 + 2) * 3\\n' | ./stream.py
+    ./stream.py decimal 50 < payments.txt       # decimals with 50 significant digits
+    ./stream.py fraction < calculations.txt     # exact fractions
+
+Input is read and output is written in large chunks, so a pipeline is not slowed down by a read or a flush per line.
+Blank lines give blank lines, so every result stays on the line number of its calculation.
+"""
+from app import operations
+from expression import compile_expression
+from backends import backend_from_args
+import sys
+
+# the number of bytes read from standard input at a time
+CHUNK_SIZE = 1 << 20
+
+def evaluate_expression(line: str) -> str:
+    """
+    Evaluates a line that is not a `num1 operator num2` calculation as a full expression.
+
+    Any error a single line can cause, such as one too long or too deeply nested to compile or evaluate, gives an
+    error message for that line, so the lines after it are still evaluated.
+
+    Args:
+        line (str): The line.
+
+    Returns:
+        str: The result, or the error message.
+    """
+    if not line.strip():
+        return ""
+    try:
+        return str(compile_expression(line.strip()).evaluate({}))
+    except (ValueError, SyntaxError, RecursionError, OverflowError) as error:
+        return f"Invalid expression: {error}."
+    except MemoryError:
+        return "Invalid expression: too large to evaluate."
+    except KeyError as error:
+        return f"Unknown variable {error}."
+    except ZeroDivisionError:
+        return "Cannot divide by zero."
+
+def evaluate_lines(lines: list, backend=None) -> list:
+    """
+    Evaluates lines of calculations.
+
+    Lines of a number, an operator and a number separated by whitespace are calculated with the `operations` of the
+    interactive calculator, or of the number backend, and other lines are evaluated as full expressions. Full
+    expressions are only evaluated with floats.
+
+    Args:
+        lines (list): The lines, without their line breaks.
+        backend (optional): The number backend from `backends.get_backend`. Defaults to None, for floats.
+
+    Returns:
+        list: The result of each line, or its error message.
+    """
+    parse, table = (backend.parse, backend.operations) if backend else (float, operations)
+    expressions = backend is None or backend.name == "float"
+    results = []
+    append = results.append
+    for line in lines:
+        parts = line.split()
+        if len(parts) == 3 and parts[1] in table:
+            try:
+                append(str(table[parts[1]](parse(parts[0]), parse(parts[2]))))
+                continue
+            except ValueError:
+                pass
+            except ZeroDivisionError:
+                append("Cannot divide by zero.")
+                continue
+        if expressions:
+            append(evaluate_expression(line))
+        elif line.strip():
+            append("Invalid input. Please enter a valid number.")
+        else:
+            append("")
+    return results
+
+def stream(source, target, chunk_size: int = CHUNK_SIZE, backend=None) -> int:
+    """
+    Evaluates every line of a binary input stream and writes the results to a binary output stream.
+
+    Each chunk is cut after its last line break, and the rest is carried over to the next chunk, so no line is split
+    and no multi-byte character is cut. The results of a chunk are written with one call.
+
+    Args:
+        source (file): The input stream, such as `sys.stdin.buffer`.
+        target (file): The output stream, such as `sys.stdout.buffer`.
+        chunk_size (int): The number of bytes read at a time.
+        backend (optional): The number backend from `backends.get_backend`. Defaults to None, for floats.
+
+    Returns:
+        int: The number of lines evaluated.
+    """
+    count = 0
+    rest = b""
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            rest += chunk
+            continue
+        lines = (rest + chunk[:end]).decode("utf-8", "replace").split("\n")
+        rest = chunk[end + 1:]
+        target.write(("\n".join(evaluate_lines(lines, backend)) + "\n").encode("utf-8"))
+        count += len(lines)
+    if rest:
+        target.write((evaluate_lines([rest.decode("utf-8", "replace")], backend)[0] + "\n").encode("utf-8"))
+        count += 1
+    return count
+
+def main() -> None:
+    try:
+        backend = backend_from_args(sys.argv[1:])
+    except ValueError as error:
+        print(error)
+        print("Usage: ./stream.py [float|decimal [PRECISION]|fraction] < calculations.txt")
+        return
+    stream(sys.stdin.buffer, sys.stdout.buffer, backend=backend)
+    sys.stdout.flush()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,5 @@
+import sys
+import os
+
+# the modules of this project are imported by their plain names, as app.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
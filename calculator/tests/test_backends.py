@@ -0,0 +1,36 @@
+from backends import get_backend
+from app import calculator
+import stream
+import parallel
+import io
+import pytest
+
+@pytest.mark.parametrize("name", ["float", "decimal", "fraction"])
+def test_stream_lines(name):
+    target = io.BytesIO()
+    source = "1 + 2\n1 / 0\nx * 2\nInfinity - Infinity\nsNaN + 1\n2 * 3\n"
+    stream.stream(io.BytesIO(source.encode()), target, backend=get_backend(name))
+    results = target.getvalue().decode().splitlines()
+    assert results[0] in ("3.0", "3") and results[-1] in ("6.0", "6")
+    assert results[1] == "Cannot divide by zero."
+
+def test_decimal_invalid_operations_give_nan():
+    target = io.BytesIO()
+    stream.stream(io.BytesIO(b"Infinity - Infinity\nsNaN + 1\nInfinity / Infinity\n0 * Infinity\n0.1 + 0.2\n"),
+                  target, backend=get_backend("decimal"))
+    assert target.getvalue().decode().splitlines() == ["NaN", "NaN", "NaN", "NaN", "0.3"]
+
+def test_decimal_parallel_file(tmp_path):
+    source, target = tmp_path / "calculations.txt", tmp_path / "results.txt"
+    source.write_text("Infinity - Infinity\n1 / 3\nsNaN * 2\n")
+    parallel.evaluate_file(str(source), str(target), 1, backend=get_backend("decimal", 5))
+    assert target.read_text().splitlines() == ["NaN", "0.33333", "NaN"]
+
+def test_decimal_calculator_with_signaling_nan(monkeypatch, capsys):
+    entries = iter(["sNaN", "+", "1", "", "1", "/", "0", "2", "*", "3", "q"])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(entries))
+    calculator(get_backend("decimal"))
+    out = capsys.readouterr().out
+    assert "Result: sNaN + 1 = NaN" in out
+    assert "Cannot divide by zero." in out
+    assert "Result: 2 * 3 = 6" in out
@@ -0,0 +1,22 @@
+import batch
+import pytest
+
+def test_rows_with_the_wrong_number_of_fields_are_invalid():
+    # two short and long rows whose fields add up to two rows of three
+    assert batch.evaluate_text("1,+\n2,3,*,4\n") == [batch.ERRORS[batch.INVALID_NUMBER]] * 2
+    assert batch.read_columns("1,+,2\n3,-\n4,*,5,6\n") == (["1", "", ""], ["+", "", ""], ["2", "", ""])
+
+def test_read_columns_skips_header_and_blank_lines():
+    assert batch.read_columns("num1,operator,num2\n1,+,2\n\n3,/,4\n") == (["1", "3"], ["+", "/"], ["2", "4"])
+
+def test_numpy_matches_rows_per_element():
+    text = "\n".join(["6,/,0", "6,/,3", "-0,/,0", "1e308,*,10", "x,+,1", "1,%,2", "5,-,7", "inf,-,inf", "2,*,0", "4,/,-0"])
+    expected = batch.evaluate_rows(*batch.read_columns(text))
+    assert expected[0] == expected[2] == expected[9] == batch.ERRORS[batch.ZERO_DIVISION]
+    assert batch.evaluate_text(text) == expected
+
+def test_without_numpy(monkeypatch):
+    text = "1,+,2\n3,/,0\n"
+    expected = batch.evaluate_text(text)
+    monkeypatch.setattr(batch, "numpy", None)
+    assert batch.evaluate_text(text) == expected == ["3.0", batch.ERRORS[batch.ZERO_DIVISION]]
@@ -0,0 +1,31 @@
+from expression import compile_expression, interpret, parse, expression_calculator
+import pytest
+
+@pytest.mark.parametrize("terms", [201, 250, 900])
+def test_long_chains_compile(terms):
+    assert compile_expression(" + ".join(["x"] * terms)).evaluate({"x": 1.0}) == terms
+    assert compile_expression(" - ".join(["x"] * terms)).evaluate({"x": 1.0}) == 2 - terms
+
+def test_parentheses_deeper_than_python_allows():
+    # right operands that need their parentheses, which Python refuses past 200 levels
+    source = "x - (" * 300 + "x" + ")" * 300
+    assert compile_expression(source).evaluate({"x": 1.0}) == interpret(parse(source), {"x": 1.0}) == 1.0
+
+@pytest.mark.parametrize("source", ["(" * 1000 + "1" + ")" * 1000, "-" * 5000 + "1", " + ".join(["1"] * 5000)])
+def test_too_deeply_nested(source):
+    with pytest.raises(ValueError, match="too deeply nested"):
+        compile_expression(source)
+
+@pytest.mark.parametrize("source", ["1 - (2 - 3)", "1 - 2 - 3", "8 / (4 / 2)", "8 / 4 / 2", "-(2 * 3) * -x",
+                                    "-(x - 1) / 2", "x * (y + 1) - -(-y)", "2 - -x * (1 + y) / (x - y)"])
+def test_compiled_keeps_the_tree_order(source):
+    variables = {"x": 0.1, "y": 0.7}
+    assert compile_expression(source).evaluate(variables) == interpret(parse(source), variables)
+
+def test_calculator_survives_deep_input(monkeypatch, capsys):
+    entries = iter(["(" * 1000 + "1" + ")" * 1000, " + ".join(["1"] * 250), "q"])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(entries))
+    expression_calculator()
+    out = capsys.readouterr().out
+    assert "Invalid expression: expression too deeply nested." in out
+    assert "Result: 250.0" in out
@@ -0,0 +1,30 @@
+import parallel
+import os
+import pytest
+
+def failing_chunk(filename: str, start: int, end: int, *backend_args) -> bytes:
+    # runs in the worker processes, which are forked with `parallel.evaluate_chunk` replaced by this function
+    if start > 0:
+        raise ArithmeticError("chunk failed")
+    return b"0.0\n"
+
+@pytest.fixture
+def source(tmp_path):
+    filename = tmp_path / "calculations.txt"
+    filename.write_text("".join(f"{index} + 1\n" for index in range(1000)))
+    return str(filename)
+
+def test_results_in_order(source, tmp_path):
+    target = str(tmp_path / "results.txt")
+    assert parallel.evaluate_file(source, target, 2, chunk_size=100) > 2
+    with open(target) as f:
+        assert f.read().splitlines() == [f"{index + 1.0}" for index in range(1000)]
+
+def test_failed_chunk_leaves_no_temporary_file(source, tmp_path, monkeypatch):
+    target = tmp_path / "results.txt"
+    target.write_text("previous results\n")
+    monkeypatch.setattr(parallel, "evaluate_chunk", failing_chunk)
+    with pytest.raises(ArithmeticError, match="chunk failed"):
+        parallel.evaluate_file(source, str(target), 2, chunk_size=100)
+    assert sorted(os.listdir(tmp_path)) == ["calculations.txt", "results.txt"]
+    assert target.read_text() == "previous results\n"
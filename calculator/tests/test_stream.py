@@ -0,0 +1,29 @@
+import stream
+import io
+import pytest
+
+def run(text: str, backend=None) -> list:
+    target = io.BytesIO()
+    stream.stream(io.BytesIO(text.encode()), target, chunk_size=64, backend=backend)
+    return target.getvalue().decode().split("\n")[:-1]
+
+def test_every_line_gets_its_result():
+    lines = ["1 + 2", " + ".join(["1"] * 250), "(" * 1000 + "1" + ")" * 1000, "", "2 / 0", "(1 + 2) * 3", "1 + 2"]
+    results = run("\n".join(lines) + "\n")
+    assert results == ["3.0", "250.0", "Invalid expression: expression too deeply nested.", "",
+                       "Cannot divide by zero.", "9.0", "3.0"]
+
+@pytest.mark.parametrize("error", [SyntaxError("too many nested parentheses"), RecursionError("too deep"),
+                                   OverflowError("too large"), MemoryError()])
+def test_errors_of_one_line_do_not_stop_the_stream(monkeypatch, error):
+    compile_expression = stream.compile_expression
+
+    def failing(source):
+        if source == "x":
+            raise error
+        return compile_expression(source)
+
+    monkeypatch.setattr(stream, "compile_expression", failing)
+    results = run("1 + 2\nx\n(1 + 2)\n")
+    assert results[0] == results[2] == "3.0"
+    assert results[1].startswith("Invalid expression: ")
@@ -2,7 +2,8 @@
 """contact book app
 """
 
-from contact_book_model import ContactBook
+from contact_book_model import ContactBook, get_engine
+from importexport import import_contacts, export_contacts, read_contacts
 
 def add_new_contact():
     """
@@ -20,18 +21,18 @@ def add_new_contact():
     phone = input('Enter the contact phone number: ')
     email = input('Enter the contact email: ')
     address = input('Enter the contact address: ')
-    contact = ContactBook()
-    try:
-        new_contact = contact.add_contact(name=name, phone=phone, email=email, address=address)
-        print(f'New contact added: ({new_contact.name}: {new_contact.phone})')
-    except ValueError as e:
-        print(e)
+    with ContactBook() as contact:
+        try:
+            new_contact = contact.add_contact(name=name, phone=phone, email=email, address=address)
+            print(f'New contact added: ({new_contact.name}: {new_contact.phone})')
+        except ValueError as e:
+            print(e)
 
 def view_contact():
     """
     Prints a contact in the contact book.
 
-    This function creates a new `ContactBook` instance and prints a contact in the contact book.
+    This function creates a new `ContactBook` instance and prints a contact in the contact book. The contact can be looked up by id or by name or email; a name or email may be misspelled, in which case the closest matches are listed to choose from.
 
     Parameters:
         None
@@ -39,19 +40,44 @@ def view_contact():
     Returns:
         None
     """
-    contact_id = int(input('Enter contact id: '))
-    contact = ContactBook()
-    current_contact = contact.get_contact(contact_id)
-    if current_contact:
-        print(f'Contact: {current_contact.to_dict()}')
-    else:
-        print('Contact not found')
+    lookup = input('Enter contact id, name or email: ').strip()
+    with ContactBook() as contact:
+        if not lookup.isdigit():
+            matches = contact.fuzzy_search_contacts(lookup, limit=5)
+            if not matches:
+                print('Contact not found')
+                return
+            for match in matches:
+                print(f'[{match.id}] {match.name} - {match.phone}')
+            lookup = input('Enter contact id: ')
+        current_contact = contact.get_contact(int(lookup))
+        if current_contact:
+            print(f'Contact: {current_contact.to_dict()}')
+        else:
+            print('Contact not found')
 
 def view_all_contacts():
     """
     Prints all contacts in the contact book.
 
-    This function creates a new `ContactBook` instance and prints all the contacts in the contact book.
+    This function creates a new `ContactBook` instance and prints all the contacts in the contact book, streaming them from the database one page at a time.
+
+    Parameters:
+        None
+
+    Returns:
+        None
+    """
+    with ContactBook() as contact_book:
+        for page in contact_book.iter_contacts():
+            for contact in page:
+                print(contact)
+
+def search_contacts():
+    """
+    Prints the contacts matching a search.
+
+    This function prompts the user for a search text and prints the contacts whose name starts with it, followed by the contacts whose name, phone, email or address contain its words. The search runs on database indexes, so it does not load every contact.
 
     Parameters:
         None
@@ -59,10 +85,14 @@ def view_all_contacts():
     Returns:
         None
     """
-    contact = ContactBook()
-    contacts = contact.get_all_contacts()
-    for index, contact in enumerate(contacts):
-        print(contact)
+    query = input('Enter a name, phone, email or address to search for: ')
+    with ContactBook() as contact_book:
+        contacts = contact_book.search_contacts(query)
+        if contacts:
+            for contact in contacts:
+                print(contact)
+        else:
+            print('No matching contacts found')
 
 def edit_contact():
     """
@@ -77,27 +107,32 @@ def edit_contact():
         None
     """
     contact_id = int(input('Enter contact id: '))
-    contact = ContactBook()
-    current_contact = contact.get_contact(contact_id)
-    if current_contact:
-        print(f'Current contact: {current_contact.to_dict()}')
-        name = input(f'Enter new name ({current_contact.name}): ')
-        phone = input(f'Enter new phone ({current_contact.phone}): ')
-        email = input(f'Enter new email ({current_contact.email}): ')
-        address = input(f'Enter new address ({current_contact.address}): ')
-        if not name:
-            name = current_contact.name
-        if not phone:
-            phone = current_contact.phone
-        if not email:
-            email = current_contact.email
-        if not address:
-            address = current_contact.address
-        contact.update_contact(contact_id, name, email, phone, address)
-        print('Contact updated successfully')
-        print(f'Updated contact: {current_contact.to_dict()}')
-    else:
-        print('Contact not found')
+    with ContactBook() as contact:
+        current_contact = contact.get_contact(contact_id)
+        if current_contact:
+            print(f'Current contact: {current_contact.to_dict()}')
+            name = input(f'Enter new name ({current_contact.name}): ')
+            phone = input(f'Enter new phone ({current_contact.phone}): ')
+            email = input(f'Enter new email ({current_contact.email}): ')
+            address = input(f'Enter new address ({current_contact.address}): ')
+            if not name:
+                name = current_contact.name
+            if not phone:
+                phone = current_contact.phone
+            if not email:
+                email = current_contact.email
+            if not address:
+                address = current_contact.address
+            try:
+                contact.update_contact(contact_id, name, email, phone, address)
+            except ValueError as e:
+                print(e)
+                return
+            print('Contact updated successfully')
+            # read back, since an edit held by a write-behind cache leaves current_contact with the old values
+            print(f'Updated contact: {contact.get_contact(contact_id).to_dict()}')
+        else:
+            print('Contact not found')
 
 def delete_contact():
     """
@@ -112,11 +147,72 @@ def delete_contact():
         None
     """
     contact_id = int(input('Enter contact id: '))
-    contact = ContactBook()
-    contact.delete_contact(contact_id)
+    with ContactBook() as contact:
+        contact.delete_contact(contact_id)
     print('Contact deleted successfully')
 
 
+def merge_duplicates():
+    """
+    Merges contacts with the same phone number.
+
+    This function creates a new `ContactBook` instance and merges contacts whose phone numbers are the same once formatting is ignored, such as "+1 555-0100" and "15550100". It prints the number of duplicate contacts merged.
+
+    Parameters:
+        None
+
+    Returns:
+        None
+    """
+    with ContactBook() as contact_book:
+        merged = contact_book.merge_duplicate_phones()
+    print(f'{merged} duplicate contacts merged')
+
+def import_file():
+    """
+    Imports contacts from a CSV or vCard file.
+
+    This function prompts the user for the path of a .csv or .vcf file and imports its contacts with `import_contacts`. It prints the number of contacts imported and each skipped row with the reason, such as a phone number that is already taken.
+
+    Parameters:
+        None
+
+    Returns:
+        None
+    """
+    path = input('Enter the path of the .csv or .vcf file: ').strip()
+    with ContactBook() as contact_book:
+        try:
+            report = import_contacts(contact_book, read_contacts(path))
+        except (OSError, ValueError) as e:
+            print(e)
+            return
+    print(f'{report.imported} contacts imported, {len(report.conflicts)} skipped')
+    for row, phone, reason in report.conflicts:
+        print(f'  row {row} ({phone}): {reason}')
+
+def export_file():
+    """
+    Exports every contact to a CSV or vCard file.
+
+    This function prompts the user for the path of the file to write, whose extension, .csv or .vcf, chooses the format, and prints the number of contacts exported.
+
+    Parameters:
+        None
+
+    Returns:
+        None
+    """
+    path = input('Enter the path of the .csv or .vcf file to write: ').strip()
+    with ContactBook() as contact_book:
+        try:
+            exported = export_contacts(contact_book, path)
+        except (OSError, ValueError) as e:
+            print(e)
+            return
+    print(f'{exported} contacts exported to {path}')
+
+
 def terminate() -> None:
     """
     Terminate message for the program.
@@ -128,8 +224,12 @@ options = {
     2: ('Edit Contact', lambda: edit_contact()),
     3: ('View Contact', lambda: view_contact()),
     4: ('View Contacts', lambda: view_all_contacts()),
-    5: ('Delete Contact', lambda: delete_contact()),
-    6: ('Exit', lambda: terminate()),
+    5: ('Search Contacts', lambda: search_contacts()),
+    6: ('Delete Contact', lambda: delete_contact()),
+    7: ('Merge Duplicates', lambda: merge_duplicates()),
+    8: ('Import Contacts', lambda: import_file()),
+    9: ('Export Contacts', lambda: export_file()),
+    10: ('Exit', lambda: terminate()),
 }
 def main():
     """
@@ -138,6 +238,8 @@ def main():
     It handles user input validation and option execution, providing feedback on invalid inputs.
     """
     print('Contact book app')
+    # connect and create the schema once, every action reuses the engine
+    get_engine()
     running = True
     exit_option = len(options)
     while running:
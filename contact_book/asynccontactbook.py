@@ -0,0 +1,235 @@
+from contact_book_model import ContactBook, ContactModel, engine_options, get_engine, get_contact_cache
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine
+from sqlalchemy.engine import make_url
+import sqlalchemy
+from functools import lru_cache
+import os
+from typing import Union, List
+
+# the asyncio driver used for each database backend of DATABASE_URL
+ASYNC_DRIVERS = {'sqlite': 'aiosqlite', 'postgresql': 'asyncpg', 'mysql': 'aiomysql'}
+
+AsyncSession = async_sessionmaker(expire_on_commit=False)
+
+def async_url(url: str) -> str:
+    """
+    Returns the URL of a database with its driver replaced by the asyncio driver of the same backend.
+
+    Args:
+        url (str): The database URL, such as "sqlite:///contacts.db".
+
+    Returns:
+        str: The URL with an asyncio driver, such as "sqlite+aiosqlite:///contacts.db". URLs that already name an
+        asyncio driver are returned unchanged.
+
+    Raises:
+        ValueError: If there is no asyncio driver for the backend.
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f'No asyncio driver for "{backend}" databases, set ASYNC_DATABASE_URL')
+    if url.get_driver_name() in ASYNC_DRIVERS.values():
+        return url.render_as_string(hide_password=False)
+    return url.set(drivername=f'{backend}+{ASYNC_DRIVERS[backend]}').render_as_string(hide_password=False)
+
+@lru_cache(maxsize=None)
+def get_async_engine() -> AsyncEngine:
+    """
+    Returns the process-wide asyncio database engine, creating it on first use.
+
+    Returns:
+        AsyncEngine: The shared engine.
+
+    The engine connects to `ASYNC_DATABASE_URL`, or to `DATABASE_URL` through the asyncio driver of its backend
+    (aiosqlite for SQLite), with the same connection pool options as `get_engine`. The schema is created and
+    migrated once by `get_engine` before the first connection, which blocks only on first use.
+    """
+    get_engine()
+    engine = create_async_engine(os.getenv('ASYNC_DATABASE_URL') or async_url(os.getenv('DATABASE_URL')), **engine_options())
+    AsyncSession.configure(bind=engine)
+    return engine
+
+class AsyncContactBook:
+    def __init__(self) -> None:
+        """
+        Initializes the class instance by opening an asyncio session on the shared asyncio engine.
+
+        Every method has the same arguments and results as the `ContactBook` method of the same name, and runs that
+        method on this session's connection with `AsyncSession.run_sync`: its queries wait on the database without
+        blocking the event loop, and no threads are used. Many `AsyncContactBook` instances can be open at once,
+        one per request, sharing the engine's pool.
+
+        Objects are not expired on commit, since reloading an expired attribute outside `run_sync` is not possible.
+
+        Returns:
+            None
+        """
+        self.engine = get_async_engine()
+        self.session = AsyncSession()
+        self.contact_book = ContactBook(self.session.sync_session)
+
+    async def __aenter__(self) -> 'AsyncContactBook':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def run(self, method, *args, **kwargs):
+        """
+        Runs a `ContactBook` method on this session's connection.
+
+        Args:
+            method (callable): The bound method of `self.contact_book`.
+            *args: The positional arguments of the method.
+            **kwargs: The keyword arguments of the method.
+
+        Returns:
+            The result of the method.
+        """
+        return await self.session.run_sync(lambda session: method(*args, **kwargs))
+
+    async def close(self) -> None:
+        """
+        Writes the edits waiting in the contact cache, then closes the session and returns its connection to the pool.
+
+        Returns:
+            None
+        """
+        cache = get_contact_cache()
+        try:
+            if cache is not None and cache.pending:
+                await self.run(self.contact_book.write_pending)
+        finally:
+            await self.session.close()
+
+    async def add_contact(self, name: str, phone: str, email: Union[str, None] = None, address: Union[str, None] = None) -> ContactModel:
+        """
+        Adds a new contact to the database. See `ContactBook.add_contact`.
+        """
+        return await self.run(self.contact_book.add_contact, name, phone, email, address)
+
+    async def phone_in_use(self, phone: str, contact_id: Union[int, None] = None) -> bool:
+        """
+        Returns whether another contact already has a phone number. See `ContactBook.phone_in_use`.
+        """
+        return await self.run(self.contact_book.phone_in_use, phone, contact_id)
+
+    async def insert_many(self, rows: List[dict]) -> None:
+        """
+        Inserts many contacts in the current transaction, without committing it. See `ContactBook.insert_many`.
+        """
+        await self.run(self.contact_book.insert_many, rows)
+
+    async def get_contact(self, contact_id: int) -> ContactModel:
+        """
+        Returns a contact from the database. See `ContactBook.get_contact`.
+        """
+        return await self.run(self.contact_book.get_contact, contact_id)
+
+    async def get_contact_by_phone(self, phone: str) -> Union[ContactModel, None]:
+        """
+        Returns the contact with a phone number. See `ContactBook.get_contact_by_phone`.
+        """
+        return await self.run(self.contact_book.get_contact_by_phone, phone)
+
+    async def get_all_contacts(self) -> List[ContactModel]:
+        """
+        Returns a list of all contacts in the database. See `ContactBook.get_all_contacts`.
+        """
+        return await self.run(self.contact_book.get_all_contacts)
+
+    async def get_contacts_page(self, after_id: Union[int, None] = None, limit: int = 100) -> List[ContactModel]:
+        """
+        Returns one page of contacts ordered by id. See `ContactBook.get_contacts_page`.
+        """
+        return await self.run(self.contact_book.get_contacts_page, after_id, limit)
+
+    async def iter_contacts(self, page_size: int = 100):
+        """
+        Iterates over all contacts in the database page by page. See `ContactBook.iter_contacts`.
+
+        Yields:
+            list[ContactModel]: The contacts of each page.
+        """
+        after_id = None
+        while True:
+            page = await self.get_contacts_page(after_id, page_size)
+            if not page:
+                return
+            yield page
+            if len(page) < page_size:
+                return
+            after_id = page[-1].id
+
+    async def iter_contact_names(self, page_size: int = 10000):
+        """
+        Iterates over the id, name and email of every contact. See `ContactBook.iter_contact_names`.
+
+        Yields:
+            tuple: The id, name and email of each contact.
+        """
+        query = sqlalchemy.select(ContactModel.id, ContactModel.name, ContactModel.email)
+        result = await self.session.stream(query.execution_options(yield_per=page_size))
+        async for row in result:
+            yield tuple(row)
+
+    async def count_contacts(self) -> int:
+        """
+        Returns the number of contacts in the database. See `ContactBook.count_contacts`.
+        """
+        return await self.run(self.contact_book.count_contacts)
+
+    async def get_contacts_by_name(self, limit: int, offset: int = 0, after: Union[ContactModel, None] = None) -> List[ContactModel]:
+        """
+        Returns one page of contacts ordered by name. See `ContactBook.get_contacts_by_name`.
+        """
+        return await self.run(self.contact_book.get_contacts_by_name, limit, offset, after)
+
+    async def search_by_name_prefix(self, prefix: str, limit: int = 20) -> List[ContactModel]:
+        """
+        Returns the contacts whose name starts with a prefix. See `ContactBook.search_by_name_prefix`.
+        """
+        return await self.run(self.contact_book.search_by_name_prefix, prefix, limit)
+
+    async def search_by_tokens(self, query: str, limit: int = 20) -> List[ContactModel]:
+        """
+        Returns the contacts containing every word of a query. See `ContactBook.search_by_tokens`.
+        """
+        return await self.run(self.contact_book.search_by_tokens, query, limit)
+
+    async def search_contacts(self, query: str, limit: int = 20) -> List[ContactModel]:
+        """
+        Returns the contacts matching a search. See `ContactBook.search_contacts`.
+        """
+        return await self.run(self.contact_book.search_contacts, query, limit)
+
+    async def fuzzy_search_contacts(self, query: str, limit: int = 10) -> List[ContactModel]:
+        """
+        Returns the contacts whose name or email is most similar to a query. See `ContactBook.fuzzy_search_contacts`.
+        """
+        return await self.run(self.contact_book.fuzzy_search_contacts, query, limit)
+
+    async def update_contact(self, contact_id: int, name: str, email: Union[str, None] = None, phone: Union[str, None] = None, address: Union[str, None] = None) -> None:
+        """
+        Updates a contact in the database. See `ContactBook.update_contact`.
+        """
+        await self.run(self.contact_book.update_contact, contact_id, name, email, phone, address)
+
+    async def write_pending(self) -> None:
+        """
+        Writes the edits waiting in the contact cache. See `ContactBook.write_pending`.
+        """
+        await self.run(self.contact_book.write_pending)
+
+    async def delete_contact(self, contact_id: int) -> None:
+        """
+        Deletes a contact from the database. See `ContactBook.delete_contact`.
+        """
+        await self.run(self.contact_book.delete_contact, contact_id)
+
+    async def merge_duplicate_phones(self, batch_size: int = 10000) -> int:
+        """
+        Merges contacts whose phone numbers are equal after normalization. See `ContactBook.merge_duplicate_phones`.
+        """
+        return await self.run(self.contact_book.merge_duplicate_phones, batch_size)
@@ -0,0 +1,426 @@
+#!/usr/bin/env python
+"""contact book benchmarks
+
+Run all benchmarks with `./benchmark.py` or a single one with `./benchmark.py engine`.
+"""
+from contact_book_model import Base, ContactBook, ContactModel, get_engine, get_contact_cache, normalize_phone
+from trigramindex import TrigramIndex
+from importexport import import_contacts, read_contacts, write_csv, write_vcards, export_contacts
+from asynccontactbook import AsyncContactBook, get_async_engine
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy.orm import sessionmaker
+import sqlalchemy
+import tempfile
+import asyncio
+import difflib
+import random
+import time
+import sys
+import os
+
+def timed(function, repeat: int) -> float:
+    """
+    Runs a function `repeat` times and returns the mean time per run in seconds.
+
+    Args:
+        function (callable): The function to run.
+        repeat (int): The number of runs.
+
+    Returns:
+        float: The mean time per run in seconds.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+def bench_engine(actions: int = 200) -> None:
+    """
+    Compares the per-action latency of creating an engine, the schema and a session for every action
+    with opening a session on the shared engine.
+
+    Args:
+        actions (int): The number of actions to time.
+
+    Returns:
+        None
+    """
+    print(f'engine: per-action latency over {actions} view contact actions')
+
+    def per_action_engine():
+        engine = sqlalchemy.create_engine(os.getenv('DATABASE_URL'))
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        session.query(ContactModel).filter_by(id=1).first()
+        session.close()
+        engine.dispose()
+
+    def shared_engine():
+        with ContactBook() as contact_book:
+            contact_book.get_contact(1)
+
+    get_engine()
+    with ContactBook() as contact_book:
+        if contact_book.get_contact(1) is None:
+            contact_book.add_contact('benchmark', '0')
+    for name, action in (('engine per action', per_action_engine), ('shared engine', shared_engine)):
+        print(f'  {name:<18} {timed(action, actions) * 1000:10.3f} ms/action')
+
+def fill_contacts(count: int, chunk_size: int = 10000) -> None:
+    """
+    Inserts generated contacts until the database holds at least `count` of them.
+
+    Args:
+        count (int): The number of contacts the database should hold.
+        chunk_size (int): The number of contacts inserted per statement.
+
+    Returns:
+        None
+    """
+    first_names = ['James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda', 'William', 'Elizabeth',
+                   'Wanjiru', 'Otieno', 'Achieng', 'Kamau', 'Njeri', 'Mwangi', 'Akinyi', 'Kipchoge', 'Amina', 'Baraka']
+    last_names = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Kariuki', 'Ochieng',
+                  'Mutua', 'Wambui', 'Kiprono', 'Odhiambo', 'Chebet', 'Njoroge', 'Kimani', 'Onyango', 'Mbugua', 'Wekesa']
+    streets = ['Moi Avenue', 'Kenyatta Avenue', 'Ngong Road', 'Baker Street', 'Main Road', 'Station Lane', 'Park Drive']
+    generator = random.Random(0)
+    engine = get_engine()
+    with ContactBook() as contact_book:
+        start = contact_book.count_contacts()
+    with engine.begin() as connection:
+        for first in range(start, count, chunk_size):
+            rows = []
+            for number in range(first, min(first + chunk_size, count)):
+                first_name, last_name = generator.choice(first_names), generator.choice(last_names)
+                rows.append({
+                    'name': f'{first_name} {last_name} {number}',
+                    'phone': f'+2547{number:08d}',
+                    'phone_normalized': f'2547{number:08d}',
+                    'email': f'{first_name}.{last_name}{number}@example.com'.lower(),
+                    'address': f'{generator.randint(1, 999)} {generator.choice(streets)}',
+                })
+            connection.execute(ContactModel.__table__.insert(), rows)
+
+def bench_search(count: int = 1000000, repeat: int = 50) -> None:
+    """
+    Compares the latency of filtering every contact in Python with the indexed name prefix and full-text searches.
+
+    Args:
+        count (int): The number of contacts in the database.
+        repeat (int): The number of runs of each indexed search.
+
+    Returns:
+        None
+    """
+    print(f'search: latency with {count} contacts')
+    fill_contacts(count)
+    queries = ['wanj', 'kamau smi', 'ngong', '+25470000', 'mary.brown']
+
+    def load_and_filter():
+        with ContactBook() as contact_book:
+            for query in queries:
+                words = query.lower().split()
+                [contact for contact in contact_book.get_all_contacts()
+                 if all(any(word in (value or '').lower() for value in (contact.name, contact.phone, contact.email, contact.address)) for word in words)]
+
+    def search(method):
+        def run():
+            with ContactBook() as contact_book:
+                for query in queries:
+                    getattr(contact_book, method)(query)
+        return run
+
+    print(f'  {"load and filter":<22} {timed(load_and_filter, 1) / len(queries) * 1000:10.3f} ms/search')
+    for method in ('search_by_name_prefix', 'search_by_tokens', 'search_contacts'):
+        print(f'  {method:<22} {timed(search(method), repeat) / len(queries) * 1000:10.3f} ms/search')
+
+def generate_names(count: int, seed: int = 0) -> list:
+    """
+    Generates distinct-looking full names from random syllables, to resemble a real address book.
+
+    Args:
+        count (int): The number of names.
+        seed (int): The random seed.
+
+    Returns:
+        list: The names.
+    """
+    onsets = ['', 'b', 'ch', 'd', 'f', 'g', 'h', 'j', 'k', 'l', 'm', 'n', 'ny', 'p', 'r', 's', 'sh', 't', 'v', 'w', 'y',
+              'z', 'br', 'kr', 'st', 'th', 'mb', 'nd']
+    vowels = ['a', 'e', 'i', 'o', 'u', 'ai', 'ei', 'ou', 'ia']
+    codas = ['', '', '', 'n', 'r', 'l', 's', 'ng', 'm', 'k']
+    syllables = [onset + vowel + coda for onset in onsets for vowel in vowels for coda in codas]
+    generator = random.Random(seed)
+
+    def word():
+        return ''.join(generator.choice(syllables) for _ in range(generator.randint(2, 4))).capitalize()
+
+    return [f'{word()} {word()}' for _ in range(count)]
+
+def misspell(text: str, generator: random.Random) -> str:
+    """
+    Returns a text with two random letters swapped and one dropped.
+
+    Args:
+        text (str): The text.
+        generator (random.Random): The random generator.
+
+    Returns:
+        str: The misspelled text.
+    """
+    letters = list(text)
+    position = generator.randrange(1, len(letters) - 2)
+    letters[position], letters[position + 1] = letters[position + 1], letters[position]
+    del letters[generator.randrange(1, len(letters))]
+    return ''.join(letters)
+
+def bench_fuzzy(count: int = 500000, queries: int = 20, limit: int = 10) -> None:
+    """
+    Compares the latency of a difflib scan over every name with the trigram index for misspelled name lookups.
+
+    Args:
+        count (int): The number of contacts.
+        queries (int): The number of misspelled names to look up.
+        limit (int): The number of matches per lookup.
+
+    Returns:
+        None
+    """
+    print(f'fuzzy: top {limit} matches for misspelled names among {count} contacts')
+    names = generate_names(count)
+    index = TrigramIndex()
+    start = time.perf_counter()
+    for contact_id, name in enumerate(names, start=1):
+        index.add(contact_id, name, name.replace(' ', '.').lower() + '@example.com')
+    print(f'  {"trigram index build":<20} {time.perf_counter() - start:10.3f} s')
+    generator = random.Random(1)
+    targets = generator.sample(range(count), queries)
+    misspelled = [misspell(names[target], generator) for target in targets]
+
+    scan_queries = misspelled[:3]
+    scan = timed(lambda: [difflib.get_close_matches(query, names, n=limit, cutoff=0.6) for query in scan_queries], 1) / len(scan_queries)
+    print(f'  {"difflib scan":<20} {scan * 1000:10.3f} ms/lookup')
+    indexed = timed(lambda: [index.search(query, limit) for query in misspelled], 10) / len(misspelled)
+    print(f'  {"trigram index":<20} {indexed * 1000:10.3f} ms/lookup')
+    found = sum(target + 1 in [contact_id for contact_id, score in index.search(query, limit)] for target, query in zip(targets, misspelled))
+    print(f'  intended contact in the top {limit} for {found}/{queries} lookups')
+
+def bench_duplicates(count: int = 200000, attempts: int = 500) -> None:
+    """
+    Compares rejecting a duplicate phone number by catching the failed commit with the Bloom filter pre-check,
+    and times the streaming merge of duplicates.
+
+    Args:
+        count (int): The number of contacts in the database.
+        attempts (int): The number of duplicate and new contacts to add.
+
+    Returns:
+        None
+    """
+    print(f'duplicates: adding contacts with {count} contacts in the database')
+    fill_contacts(count)
+    generator = random.Random(2)
+    # the same numbers as fill_contacts, formatted differently
+    duplicates = [f'+254 7{number:08d}' for number in generator.sample(range(count), attempts)]
+    fresh = iter(range(10 ** 9, 2 * 10 ** 9))
+
+    def commit_and_catch():
+        with ContactBook() as contact_book:
+            for phone in duplicates:
+                contact_book.session.add(ContactModel(name='duplicate', phone=phone))
+                try:
+                    contact_book.session.commit()
+                except sqlalchemy.exc.IntegrityError:
+                    contact_book.session.rollback()
+
+    def pre_check():
+        with ContactBook() as contact_book:
+            for phone in duplicates:
+                try:
+                    contact_book.add_contact('duplicate', phone)
+                except ValueError:
+                    pass
+
+    def add_new():
+        with ContactBook() as contact_book:
+            for _ in range(attempts):
+                contact_book.add_contact('new', str(next(fresh)))
+
+    with ContactBook() as contact_book:
+        contact_book.phone_in_use('0')  # load the phone filter outside the timings
+    print(f'  {"commit and catch":<18} {timed(commit_and_catch, 1) / attempts * 1000:10.3f} ms/duplicate')
+    print(f'  {"bloom pre-check":<18} {timed(pre_check, 1) / attempts * 1000:10.3f} ms/duplicate')
+    print(f'  {"add new contact":<18} {timed(add_new, 1) / attempts * 1000:10.3f} ms/contact')
+
+    # plant duplicates that bypass the unique index, then merge them
+    engine = get_engine()
+    with engine.begin() as connection:
+        connection.execute(sqlalchemy.text('DROP INDEX ix_contacts_phone_normalized'))
+        connection.execute(ContactModel.__table__.insert(), [
+            {'name': 'duplicate', 'phone': phone, 'phone_normalized': normalize_phone(phone), 'email': 'merged@example.com'}
+            for phone in duplicates
+        ])
+    with ContactBook() as contact_book:
+        start = time.perf_counter()
+        merged = contact_book.merge_duplicate_phones()
+        print(f'  {"merge duplicates":<18} {time.perf_counter() - start:10.3f} s for {merged} duplicates')
+
+def bench_import(count: int = 200000, batch_size: int = 10000) -> None:
+    """
+    Measures the throughput of importing and exporting CSV and vCard files, compared with adding contacts one at a time.
+
+    Args:
+        count (int): The number of contacts in each file.
+        batch_size (int): The number of contacts inserted per transaction.
+
+    Returns:
+        None
+    """
+    print(f'import: {count} contacts per file, {batch_size} per batch')
+    names = generate_names(count)
+    with tempfile.TemporaryDirectory() as directory:
+        files = {}
+        for extension, writer, offset in (('csv', write_csv, 0), ('vcf', write_vcards, count)):
+            files[extension] = os.path.join(directory, f'contacts.{extension}')
+            rows = ({'name': name, 'phone': f'+1 {offset + number:010d}', 'email': f'contact{offset + number}@example.com',
+                     'address': f'{number} Moi Avenue, Nairobi'} for number, name in enumerate(names))
+            with open(files[extension], 'w', newline='', encoding='utf-8') as file:
+                writer(rows, file)
+
+        with ContactBook() as contact_book:
+            for extension, path in files.items():
+                start = time.perf_counter()
+                report = import_contacts(contact_book, read_contacts(path), batch_size)
+                elapsed = time.perf_counter() - start
+                print(f'  {"import " + extension:<18} {report.imported / elapsed:10.0f} contacts/s ({len(report.conflicts)} conflicts)')
+            start = time.perf_counter()
+            report = import_contacts(contact_book, read_contacts(files['csv']), batch_size)
+            elapsed = time.perf_counter() - start
+            print(f'  {"reimport csv":<18} {count / elapsed:10.0f} rows/s ({len(report.conflicts)} conflicts)')
+
+            added = 1000
+            start = time.perf_counter()
+            for number in range(added):
+                contact_book.add_contact(names[number], f'+44 {number:010d}')
+            print(f'  {"add_contact":<18} {added / (time.perf_counter() - start):10.0f} contacts/s')
+
+            for extension in files:
+                path = os.path.join(directory, f'export.{extension}')
+                start = time.perf_counter()
+                exported = export_contacts(contact_book, path, batch_size)
+                print(f'  {"export " + extension:<18} {exported / (time.perf_counter() - start):10.0f} contacts/s')
+
+def bench_cache(count: int = 100000, actions: int = 2000, hot: int = 500, edits: int = 2000) -> None:
+    """
+    Measures the contact cache: edit actions that read a contact twice, with and without the cache, and rapid edits
+    written through one commit each or coalesced by write-behind.
+
+    Args:
+        count (int): The number of contacts in the database.
+        actions (int): The number of edit actions reading random contacts among the `hot` most used ones.
+        hot (int): The number of contacts the actions pick from.
+        edits (int): The number of rapid edits, spread over 50 contacts.
+
+    Returns:
+        None
+    """
+    print(f'cache: {actions} edit actions reading contacts, {edits} rapid edits, {count} contacts in the database')
+    fill_contacts(count)
+    generator = random.Random(3)
+    picks = [generator.randrange(1, hot + 1) for _ in range(actions)]
+    commits = []
+    sqlalchemy.event.listen(get_engine(), 'commit', lambda connection: commits.append(1))
+
+    def configure(size, write_delay=None):
+        os.environ['CONTACT_CACHE_SIZE'] = str(size)
+        os.environ['CONTACT_CACHE_WRITE_DELAY'] = '' if write_delay is None else str(write_delay)
+        get_contact_cache.cache_clear()
+        return get_contact_cache()
+
+    def read_twice():
+        # like app.edit_contact: a session per action, the contact read to show it and again to update it
+        for contact_id in picks:
+            with ContactBook() as contact_book:
+                contact_book.get_contact(contact_id)
+            with ContactBook() as contact_book:
+                contact_book.get_contact(contact_id)
+
+    for name, size in (('no cache', 0), ('lru cache', 1024)):
+        cache = configure(size)
+        elapsed = timed(read_twice, 1)
+        stats = f' ({cache.hits} hits, {cache.misses} misses)' if cache else ''
+        print(f'  {name:<18} {elapsed / actions * 1000:10.3f} ms/action{stats}')
+
+    for name, write_delay in (('write-through', None), ('write-behind', 1.0)):
+        cache = configure(1024, write_delay)
+        with ContactBook() as contact_book:
+            contacts = [contact_book.get_contact(contact_id).column_values() for contact_id in range(1, 51)]
+        del commits[:]
+        start = time.perf_counter()
+        with ContactBook() as contact_book:
+            for number in range(edits):
+                contact = contacts[number % len(contacts)]
+                contact_book.update_contact(contact['id'], f'{contact["name"]} {number}', contact['email'], contact['phone'], contact['address'])
+        elapsed = time.perf_counter() - start
+        print(f'  {name:<18} {elapsed / edits * 1000:10.3f} ms/edit ({len(commits)} commits)')
+    configure(0)
+
+def bench_async(count: int = 100000, requests: int = 4000, concurrency: int = 100) -> None:
+    """
+    Compares the throughput of concurrent requests served by `AsyncContactBook` on one event loop with `ContactBook`
+    driven from a thread pool. Each request opens a contact book, reads a contact and runs a name prefix search.
+
+    Args:
+        count (int): The number of contacts in the database.
+        requests (int): The number of requests.
+        concurrency (int): The number of requests in flight at once, and the number of threads.
+
+    Returns:
+        None
+    """
+    print(f'async: {requests} requests, {concurrency} at a time, {count} contacts in the database')
+    fill_contacts(count)
+    generator = random.Random(4)
+    picks = [(generator.randrange(1, count + 1), generator.choice('abcdefghijklmnopqrstuvwxyz')) for _ in range(requests)]
+
+    def sync_request(pick):
+        with ContactBook() as contact_book:
+            contact_book.get_contact(pick[0])
+            contact_book.search_by_name_prefix(pick[1], 10)
+
+    def threads():
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(sync_request, picks))
+
+    async def async_request(pick, slots):
+        async with slots:
+            async with AsyncContactBook() as contact_book:
+                await contact_book.get_contact(pick[0])
+                await contact_book.search_by_name_prefix(pick[1], 10)
+
+    async def event_loop():
+        slots = asyncio.Semaphore(concurrency)
+        await asyncio.gather(*(async_request(pick, slots) for pick in picks))
+        # pooled connections belong to this event loop
+        await get_async_engine().dispose()
+
+    sync_request(picks[0])
+    get_async_engine()  # create the engines outside the timings
+    for name, run in (('thread pool', threads), ('asyncio', lambda: asyncio.run(event_loop()))):
+        print(f'  {name:<18} {requests / timed(run, 1):10.0f} requests/s')
+
+benchmarks = {
+    'engine': bench_engine,
+    'search': bench_search,
+    'fuzzy': bench_fuzzy,
+    'duplicates': bench_duplicates,
+    'import': bench_import,
+    'cache': bench_cache,
+    'async': bench_async,
+}
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as directory:
+        # benchmark against a scratch SQLite database unless BENCHMARK_DATABASE_URL points elsewhere
+        os.environ['DATABASE_URL'] = os.getenv('BENCHMARK_DATABASE_URL') or 'sqlite:///' + os.path.join(directory, 'contacts.db')
+        for name in sys.argv[1:] or benchmarks:
+            benchmarks[name]()
@@ -0,0 +1,71 @@
+import hashlib
+import math
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        Initializes an empty Bloom filter, a compact set that can answer "definitely not present" without a lookup.
+
+        A value is added by setting `hashes` bits chosen by hashing it. A value whose bits are not all set was never
+        added. A value whose bits are all set probably was, with a false positive rate of about `error_rate` while
+        no more than `capacity` values have been added. Values cannot be removed.
+
+        Args:
+            capacity (int): The number of values the filter is sized for.
+            error_rate (float): The false positive rate at capacity.
+
+        Returns:
+            None
+        """
+        self.capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, value: str) -> list:
+        """
+        Returns the bit positions of a value, derived from two halves of one hash by double hashing.
+
+        Args:
+            value (str): The value.
+
+        Returns:
+            list: The bit positions.
+        """
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        size = self.size
+        return [(first + i * second) % size for i in range(self.hashes)]
+
+    def add(self, value: str) -> None:
+        """
+        Adds a value to the filter.
+
+        Args:
+            value (str): The value.
+
+        Returns:
+            None
+        """
+        bits = self.bits
+        for position in self.positions(value):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value: str) -> bool:
+        bits = self.bits
+        for position in self.positions(value):
+            if not bits[position >> 3] >> (position & 7) & 1:
+                return False
+        return True
+
+    def full(self) -> bool:
+        """
+        Returns whether more values than the capacity were added, so the false positive rate is above `error_rate`.
+
+        Returns:
+            bool: True if the filter is over capacity, False otherwise.
+        """
+        return self.count > self.capacity
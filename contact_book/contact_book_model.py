@@ -1,23 +1,259 @@
 import sqlalchemy
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, Integer, String
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import Column, Integer, String, Index, func, or_, and_, text
+from sqlalchemy.orm import sessionmaker, validates, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
 from dotenv import load_dotenv
+from trigramindex import TrigramIndex
+from bloomfilter import BloomFilter
+from contactcache import ContactCache
+from functools import lru_cache
 import os
+import re
 from typing import Union, List
 
 load_dotenv()
 
 Base = declarative_base()
+Session = sessionmaker()
+
+# SQLite FTS5 index over the searchable columns, an external-content table that reads the text from `contacts`
+SEARCH_TABLE = 'contacts_fts'
+SEARCH_COLUMNS = ('name', 'phone', 'email', 'address')
+# one-row table whose flag stops the insert trigger while `ContactBook.insert_many` fills the search table in bulk
+SEARCH_BULK_TABLE = 'contacts_fts_bulk'
+# sorts after any other character, so lower(name) < prefix || PREFIX_END covers every name starting with prefix
+PREFIX_END = '\U0010ffff'
+
+# process-wide fuzzy index over names and emails, loaded on first use by `get_trigram_index`
+trigram_index = TrigramIndex()
+# process-wide filter of normalized phone numbers, loaded on first use by `get_phone_filter`
+phone_filter = None
+
+def normalize_phone(phone: Union[str, None]) -> Union[str, None]:
+    """
+    Returns the digits of a phone number, so differently formatted copies of a number compare equal.
+
+    Args:
+        phone (Union[str, None]): The phone number as entered.
+
+    Returns:
+        Union[str, None]: The digits, without a leading `00` international prefix, or None if there are no digits.
+
+    For example "+1 555-0100", "001 555 0100" and "15550100" all normalize to "15550100".
+    """
+    phone = (phone or '').strip()
+    digits = re.sub(r'\D', '', phone)
+    if phone.startswith('00'):
+        digits = digits[2:]
+    return digits or None
+
+def add_phone_normalized_column(engine: sqlalchemy.engine.Engine, batch_size: int = 10000) -> None:
+    """
+    Adds and fills the `phone_normalized` column in a contacts table created before it existed.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): The engine of the database.
+        batch_size (int): The number of contacts updated per statement.
+
+    Returns:
+        None
+
+    The unique index on the column is created afterwards by `get_engine`, which only succeeds if the table has no
+    duplicate phone numbers. Otherwise `ContactBook.merge_duplicate_phones` merges them and creates it.
+    """
+    columns = {column['name'] for column in sqlalchemy.inspect(engine).get_columns(ContactModel.__tablename__)}
+    if 'phone_normalized' in columns:
+        return
+    with engine.begin() as connection:
+        connection.execute(text('ALTER TABLE contacts ADD COLUMN phone_normalized VARCHAR'))
+        rows = connection.execute(text('SELECT id, phone FROM contacts')).all()
+        for start in range(0, len(rows), batch_size):
+            connection.execute(text('UPDATE contacts SET phone_normalized = :phone_normalized WHERE id = :id'),
+                               [{'id': contact_id, 'phone_normalized': normalize_phone(phone)} for contact_id, phone in rows[start:start + batch_size]])
+
+def create_search_index(engine: sqlalchemy.engine.Engine) -> None:
+    """
+    Creates the FTS5 search table and the triggers that keep it in sync with the contacts table.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): The engine of an SQLite database.
+
+    Returns:
+        None
+
+    The triggers update the search table on every insert, update and delete, including ones made outside `ContactBook`.
+    When the search table is new, it is filled from the contacts that already exist. The insert trigger is skipped
+    while the flag in the bulk table is set, which `ContactBook.insert_many` does inside its own transaction.
+    """
+    columns = ', '.join(SEARCH_COLUMNS)
+    new_values = ', '.join(f'new.{column}' for column in SEARCH_COLUMNS)
+    old_values = ', '.join(f'old.{column}' for column in SEARCH_COLUMNS)
+    insert = f"INSERT INTO {SEARCH_TABLE}(rowid, {columns}) VALUES (new.id, {new_values});"
+    delete = f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, {columns}) VALUES ('delete', old.id, {old_values});"
+    with engine.begin() as connection:
+        inspector = sqlalchemy.inspect(connection)
+        if not inspector.has_table(SEARCH_TABLE):
+            connection.execute(text(f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5({columns}, content='contacts', content_rowid='id')"))
+            connection.execute(text(f"CREATE TRIGGER {SEARCH_TABLE}_delete AFTER DELETE ON contacts BEGIN {delete} END"))
+            connection.execute(text(f"CREATE TRIGGER {SEARCH_TABLE}_update AFTER UPDATE ON contacts BEGIN {delete} {insert} END"))
+            connection.execute(text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')"))
+        if not inspector.has_table(SEARCH_BULK_TABLE):
+            # databases from before bulk inserts have an unconditional insert trigger, replace it
+            connection.execute(text(f"CREATE TABLE {SEARCH_BULK_TABLE} (active INTEGER NOT NULL)"))
+            connection.execute(text(f"INSERT INTO {SEARCH_BULK_TABLE} (active) VALUES (0)"))
+            connection.execute(text(f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_insert"))
+            connection.execute(text(
+                f"CREATE TRIGGER {SEARCH_TABLE}_insert AFTER INSERT ON contacts "
+                f"WHEN (SELECT active FROM {SEARCH_BULK_TABLE}) = 0 BEGIN {insert} END"
+            ))
+
+def engine_options() -> dict:
+    """
+    Returns the connection pool options of the database engines, read from the environment.
+
+    Returns:
+        dict: The keyword arguments for `create_engine`:
+            - `DATABASE_POOL_SIZE`: the number of connections kept open in the pool.
+            - `DATABASE_POOL_RECYCLE`: the number of seconds after which a connection is replaced.
+            - `DATABASE_POOL_PRE_PING`: `true` to test connections before handing them out. Defaults to `true`.
+    """
+    options = {'pool_pre_ping': os.getenv('DATABASE_POOL_PRE_PING', 'true').lower() == 'true'}
+    if os.getenv('DATABASE_POOL_SIZE'):
+        options['pool_size'] = int(os.getenv('DATABASE_POOL_SIZE'))
+    if os.getenv('DATABASE_POOL_RECYCLE'):
+        options['pool_recycle'] = int(os.getenv('DATABASE_POOL_RECYCLE'))
+    return options
+
+@lru_cache(maxsize=None)
+def get_engine() -> sqlalchemy.engine.Engine:
+    """
+    Returns the process-wide database engine, creating it and the schema on first use.
+
+    Returns:
+        sqlalchemy.engine.Engine: The shared engine.
+
+    The engine's connection pool is configured from the environment, see `engine_options`.
+
+    Every `ContactBook` shares this engine and its pool, and the module-level `Session` factory is bound to it, so
+    creating a `ContactBook` only opens a session instead of connecting and checking the schema again.
+    On SQLite the FTS5 search table used by `search_contacts` is created too.
+    """
+    engine = sqlalchemy.create_engine(os.getenv('DATABASE_URL'), **engine_options())
+    existing_table = sqlalchemy.inspect(engine).has_table(ContactModel.__tablename__)
+    Base.metadata.create_all(engine)
+    if existing_table:
+        # create_all skips tables that already exist, so add columns and indexes introduced later to older databases
+        add_phone_normalized_column(engine)
+        for index in ContactModel.__table__.indexes:
+            try:
+                index.create(engine)
+            except sqlalchemy.exc.DBAPIError:
+                pass  # the index already exists, or duplicate phone numbers prevent a unique index
+    if engine.dialect.name == 'sqlite':
+        create_search_index(engine)
+    Session.configure(bind=engine)
+    return engine
+
+def get_trigram_index(contact_book: Union['ContactBook', None] = None) -> TrigramIndex:
+    """
+    Returns the process-wide trigram index, loading every contact into it on first use.
+
+    Args:
+        contact_book (Union[ContactBook, None], optional): The contact book to load the contacts with. Defaults to
+            None, which opens a new one.
+
+    Returns:
+        TrigramIndex: The loaded index.
+
+    Once loaded, the index is kept up to date by `ContactBook.add_contact`, `update_contact` and `delete_contact`.
+    Changes made by other processes are not seen until the index is loaded again.
+    """
+    if not trigram_index.loaded:
+        if contact_book is not None:
+            trigram_index.load(contact_book)
+        else:
+            with ContactBook() as contact_book:
+                trigram_index.load(contact_book)
+    return trigram_index
+
+@lru_cache(maxsize=None)
+def get_contact_cache() -> Union[ContactCache, None]:
+    """
+    Returns the process-wide contact cache, creating it on first use, or None if caching is disabled.
+
+    Returns:
+        Union[ContactCache, None]: The shared cache.
+
+    The cache is configured from the environment:
+        - `CONTACT_CACHE_SIZE`: the number of contacts cached. Caching is disabled when it is unset or 0.
+        - `CONTACT_CACHE_TTL`: the number of seconds a cached contact is used for. Defaults to 60.
+        - `CONTACT_CACHE_WRITE_DELAY`: the number of seconds edits may wait to be written together. When unset, every
+          edit is written immediately.
+
+    Only `ContactBook.get_contact` and `get_contact_by_phone` read from the cache. Edits waiting to be written are
+    not seen by searches and listings, and are lost if the process dies before writing them.
+    """
+    size = int(os.getenv('CONTACT_CACHE_SIZE') or 0)
+    if size <= 0:
+        return None
+    write_delay = os.getenv('CONTACT_CACHE_WRITE_DELAY')
+    return ContactCache(
+        max_size=size,
+        ttl=float(os.getenv('CONTACT_CACHE_TTL') or 60),
+        write_delay=float(write_delay) if write_delay else None,
+    )
+
+def get_phone_filter(contact_book: Union['ContactBook', None] = None) -> BloomFilter:
+    """
+    Returns the process-wide Bloom filter of normalized phone numbers, loading it on first use.
+
+    Args:
+        contact_book (Union[ContactBook, None], optional): The contact book to read the numbers with. Defaults to
+            None, which opens a new one.
+
+    Returns:
+        BloomFilter: The filter.
+
+    The filter is sized for twice the contacts at load time and reloaded once it is over capacity. `ContactBook`
+    adds the numbers it writes. Deleted and changed numbers stay in the filter and only cost a lookup when they
+    are added again.
+    """
+    global phone_filter
+    if phone_filter is None or phone_filter.full():
+        if contact_book is None:
+            with ContactBook() as contact_book:
+                return get_phone_filter(contact_book)
+        phones = BloomFilter(max(2 * contact_book.count_contacts(), 1024))
+        for (phone,) in contact_book.session.query(ContactModel.phone_normalized).yield_per(10000):
+            if phone is not None:
+                phones.add(phone)
+        phone_filter = phones
+    return phone_filter
 
 class ContactModel(Base):
     __tablename__ = 'contacts'
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
     phone = Column(String, nullable=False, unique=True)
+    phone_normalized = Column(String)
     email = Column(String)
     address = Column(String)
 
+    __table_args__ = (
+        Index('ix_contacts_name_lower', func.lower(name), 'id'),
+        Index('ix_contacts_phone_normalized', phone_normalized, unique=True),
+    )
+
+    @validates('phone')
+    def validate_phone(self, key: str, phone: str) -> str:
+        """
+        Keeps `phone_normalized` in step with every phone number written through the ORM.
+        """
+        self.phone_normalized = normalize_phone(phone)
+        return phone
+
     def __repr__(self):
         """
         Returns a string representation of the Contact object.
@@ -42,18 +278,50 @@ class ContactModel(Base):
             'address': self.address
         }
 
+    def column_values(self) -> dict:
+        """
+        Returns the values of every column of the contact, as cached by `ContactCache`.
+
+        Returns:
+            dict: The column values, keyed by column name.
+        """
+        return {column.name: getattr(self, column.name) for column in self.__table__.columns}
+
 class ContactBook:
-    def __init__(self)->None:
+    def __init__(self, session: Union[sqlalchemy.orm.Session, None] = None)->None:
         """
-        Initializes the class instance by setting up the database engine, creating all tables, and setting up a session for database interactions.
+        Initializes the class instance by opening a session on the shared database engine.
+
+        Args:
+            session (Union[sqlalchemy.orm.Session, None], optional): A session to use instead, such as the one
+                `AsyncContactBook` runs these methods in. Defaults to None.
 
         Returns:
             None
         """
-        self.engine = sqlalchemy.create_engine(os.getenv('DATABASE_URL'))
-        Base.metadata.create_all(self.engine)
-        self.session = sessionmaker(bind=self.engine)
-        self.session = self.session()
+        self.engine = get_engine()
+        self.session = session if session is not None else Session()
+
+    def __enter__(self) -> 'ContactBook':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Writes the edits waiting in the contact cache, then closes the session and returns its connection to the pool.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If some edits could not be written, see `write_pending`.
+        """
+        try:
+            self.write_pending()
+        finally:
+            self.session.close()
 
     def add_contact(self, name: str, phone: str, email: Union[str, None] = None, address: Union[str, None] = None) -> ContactModel:
         """
@@ -71,8 +339,10 @@ class ContactBook:
         Raises:
             ValueError: If a contact with the same phone number already exists in the database.
 
-        This function creates a new `ContactModel` object with the given name, email, phone, and address. It then adds the contact to the session and attempts to commit the changes to the database. If a `sqlalchemy.exc.IntegrityError` is raised, indicating a duplicate phone number, the session is rolled back and a `ValueError` is raised. Otherwise, the newly created contact object is returned.
+        This function first checks with `phone_in_use` whether the phone number, compared after normalization, is already taken, and raises a `ValueError` before writing anything if it is. Otherwise it creates a new `ContactModel` object with the given name, email, phone, and address, adds the contact to the session and commits the changes to the database. If a `sqlalchemy.exc.IntegrityError` is still raised, because another process added the number in the meantime, the session is rolled back and a `ValueError` is raised. Otherwise, the newly created contact object is returned.
         """
+        if self.phone_in_use(phone):
+            raise ValueError("A contact with this phone number already exists.")
         contact = ContactModel(name=name, email=email, phone=phone, address=address)
         self.session.add(contact)
         try:
@@ -80,8 +350,72 @@ class ContactBook:
         except sqlalchemy.exc.IntegrityError:
             self.session.rollback()
             raise ValueError("A contact with this phone number already exists.")
+        if contact.phone_normalized is not None:
+            get_phone_filter(self).add(contact.phone_normalized)
+        if trigram_index.loaded:
+            trigram_index.add(contact.id, contact.name, contact.email)
         return contact
 
+    def phone_in_use(self, phone: str, contact_id: Union[int, None] = None) -> bool:
+        """
+        Returns whether another contact already has a phone number, compared after normalization.
+
+        Args:
+            phone (str): The phone number.
+            contact_id (Union[int, None], optional): The contact the number is for, which is not counted. Defaults to None.
+
+        Returns:
+            bool: True if another contact has the number, False otherwise.
+
+        Numbers the phone Bloom filter has never seen are new without asking the database. Only numbers it may have
+        seen are looked up, through the unique index on `phone_normalized`.
+        """
+        phone_normalized = normalize_phone(phone)
+        if phone_normalized is None or phone_normalized not in get_phone_filter(self):
+            return False
+        query = self.session.query(ContactModel.id).filter(ContactModel.phone_normalized == phone_normalized)
+        if contact_id is not None:
+            query = query.filter(ContactModel.id != contact_id)
+        return self.session.query(query.exists()).scalar()
+
+    def insert_many(self, rows: List[dict]) -> None:
+        """
+        Inserts many contacts in the current transaction, without committing it.
+
+        Args:
+            rows (List[dict]): The name, phone, phone_normalized, email and address of each contact.
+
+        Returns:
+            None
+
+        Raises:
+            sqlalchemy.exc.IntegrityError: If a phone number is already taken. The caller rolls back.
+
+        The rows are inserted with one executemany. On SQLite, indexing every row through the insert trigger costs
+        more than the insert itself, so the trigger is switched off for the transaction and the new rows are added to
+        the search table with a single INSERT ... SELECT. The switch is part of the transaction, so other connections
+        never see it and a rollback undoes it.
+        """
+        session = self.session
+        table = ContactModel.__table__
+        if session.get_bind().dialect.name != 'sqlite':
+            session.execute(table.insert(), rows)
+            return
+        columns = ', '.join(SEARCH_COLUMNS)
+        session.execute(text(f"UPDATE {SEARCH_BULK_TABLE} SET active = 1"))
+        last_id = session.query(func.max(ContactModel.id)).scalar() or 0
+        fields = ('name', 'phone', 'phone_normalized', 'email', 'address')
+        # skip the per-row parameter processing of a Core insert, the values are plain strings already
+        session.connection().exec_driver_sql(
+            f"INSERT INTO {table.name} ({', '.join(fields)}) VALUES ({', '.join('?' * len(fields))})",
+            [tuple(row.get(field) for field in fields) for row in rows],
+        )
+        session.execute(
+            text(f"INSERT INTO {SEARCH_TABLE}(rowid, {columns}) SELECT id, {columns} FROM {table.name} WHERE id > :last_id"),
+            {'last_id': last_id},
+        )
+        session.execute(text(f"UPDATE {SEARCH_BULK_TABLE} SET active = 0"))
+
     def get_contact(self, contact_id: int) -> ContactModel:
         """
         Returns a contact from the database.
@@ -92,9 +426,70 @@ class ContactBook:
         Returns:
             ContactModel: contact object.
 
-        This function returns a `ContactModel` object in the session with the given `contact_id`.
+        This function returns a `ContactModel` object in the session with the given `contact_id`. When the contact
+        cache is enabled, a cached contact is returned without querying the database, and a contact read from the
+        database is cached.
+        """
+        cache = get_contact_cache()
+        if cache is None:
+            return self.session.query(ContactModel).filter_by(id=contact_id).first()
+        values = cache.get(contact_id)
+        if values is not None:
+            return self.cached_contact(values)
+        contact = self.session.query(ContactModel).filter_by(id=contact_id).first()
+        if contact is not None:
+            cache.put(contact.column_values())
+        return contact
+
+    def get_contact_by_phone(self, phone: str) -> Union[ContactModel, None]:
         """
-        return self.session.query(ContactModel).filter_by(id=contact_id).first()
+        Returns the contact with a phone number, compared after normalization.
+
+        Args:
+            phone (str): The phone number.
+
+        Returns:
+            Union[ContactModel, None]: The contact, or None if no contact has the number.
+        """
+        phone_normalized = normalize_phone(phone)
+        if phone_normalized is None:
+            return None
+        query = self.session.query(ContactModel).filter(ContactModel.phone_normalized == phone_normalized)
+        cache = get_contact_cache()
+        if cache is None:
+            return query.first()
+        values = cache.get_by_phone(phone_normalized)
+        if values is not None:
+            return self.cached_contact(values)
+        contact = query.first()
+        if contact is not None:
+            cache.put(contact.column_values())
+        return contact
+
+    def cached_contact(self, values: dict) -> ContactModel:
+        """
+        Returns a contact of this session built from cached column values, without querying the database.
+
+        Args:
+            values (dict): The column values of the contact.
+
+        Returns:
+            ContactModel: The contact. It is tracked by the session like a contact read from the database, so changes
+            to it are written on commit.
+
+        A contact the session already holds is given the cached values as its loaded state, since the cache is
+        shared by every session of the process and may hold an edit another session staged. Changes made to it in
+        this session that are not committed yet are kept.
+        """
+        contact = self.session.identity_map.get(identity_key(ContactModel, values['id']))
+        if contact is None:
+            contact = ContactModel(**values)
+            make_transient_to_detached(contact)
+            self.session.add(contact)
+        elif not self.session.is_modified(contact):
+            for name, value in values.items():
+                set_committed_value(contact, name, value)
+        return contact
 
     def get_all_contacts(self) -> List[ContactModel]:
         """
@@ -107,6 +502,186 @@ class ContactBook:
         """
         return self.session.query(ContactModel).all()
 
+    def get_contacts_page(self, after_id: Union[int, None] = None, limit: int = 100) -> List[ContactModel]:
+        """
+        Returns one page of contacts ordered by id.
+
+        Args:
+            after_id (Union[int, None], optional): The id of the last contact of the previous page. Defaults to None for the first page.
+            limit (int, optional): The maximum number of contacts in the page. Defaults to 100.
+
+        Returns:
+            list[ContactModel]: The contacts of the page.
+
+        This function uses keyset pagination on the primary key: the page starts right after `after_id`, so the database seeks straight to it through the primary key index instead of skipping rows like OFFSET does.
+        """
+        query = self.session.query(ContactModel)
+        if after_id is not None:
+            query = query.filter(ContactModel.id > after_id)
+        return query.order_by(ContactModel.id).limit(limit).all()
+
+    def iter_contacts(self, page_size: int = 100):
+        """
+        Iterates over all contacts in the database page by page.
+
+        Args:
+            page_size (int, optional): The number of contacts per page. Defaults to 100.
+
+        Yields:
+            list[ContactModel]: The contacts of each page.
+
+        This function fetches one page at a time with `get_contacts_page`, so only one page of contacts is held in memory.
+        """
+        after_id = None
+        while True:
+            page = self.get_contacts_page(after_id, page_size)
+            if not page:
+                return
+            yield page
+            if len(page) < page_size:
+                return
+            after_id = page[-1].id
+
+    def iter_contact_names(self, page_size: int = 10000):
+        """
+        Iterates over the id, name and email of every contact.
+
+        Args:
+            page_size (int, optional): The number of rows fetched from the database at a time. Defaults to 10000.
+
+        Yields:
+            tuple: The id, name and email of each contact.
+
+        This function reads the three columns only, without building `ContactModel` objects, for loading indexes quickly.
+        """
+        query = self.session.query(ContactModel.id, ContactModel.name, ContactModel.email)
+        yield from query.yield_per(page_size)
+
+    def count_contacts(self) -> int:
+        """
+        Returns the number of contacts in the database.
+
+        Returns:
+            int: The number of contacts.
+        """
+        return self.session.query(func.count(ContactModel.id)).scalar()
+
+    def get_contacts_by_name(self, limit: int, offset: int = 0, after: Union[ContactModel, None] = None) -> List[ContactModel]:
+        """
+        Returns a slice of the contacts sorted case-insensitively by name.
+
+        Args:
+            limit (int): The maximum number of contacts to return.
+            offset (int, optional): The number of contacts to skip. Defaults to 0.
+            after (Union[ContactModel, None], optional): Return the contacts sorted after this one instead of using `offset`. Defaults to None.
+
+        Returns:
+            list[ContactModel]: The contacts of the slice.
+
+        The sort follows the `ix_contacts_name_lower` index on (lower(name), id). Passing `after` seeks through that index
+        from the given contact (keyset pagination), which stays fast deep into the list, while `offset` is for jumping
+        to an arbitrary position.
+        """
+        name_lower = func.lower(ContactModel.name)
+        query = self.session.query(ContactModel).order_by(name_lower, ContactModel.id)
+        if after is not None:
+            # lowercase in SQL too, so the key matches the index even where SQL and Python disagree on case folding
+            after_name = func.lower(after.name)
+            query = query.filter(or_(name_lower > after_name, and_(name_lower == after_name, ContactModel.id > after.id)))
+        else:
+            query = query.offset(offset)
+        return query.limit(limit).all()
+
+    def search_by_name_prefix(self, prefix: str, limit: int = 20) -> List[ContactModel]:
+        """
+        Returns the contacts whose name starts with a prefix, ignoring case.
+
+        Args:
+            prefix (str): The start of the name.
+            limit (int, optional): The maximum number of contacts to return. Defaults to 20.
+
+        Returns:
+            list[ContactModel]: The matching contacts sorted by name.
+
+        The prefix is turned into a range on lower(name), so the database seeks through the `ix_contacts_name_lower`
+        index instead of scanning the table like `LIKE 'prefix%'` would.
+        """
+        name_lower = func.lower(ContactModel.name)
+        start = func.lower(prefix)
+        query = self.session.query(ContactModel).filter(name_lower >= start, name_lower < start.concat(PREFIX_END))
+        return query.order_by(name_lower, ContactModel.id).limit(limit).all()
+
+    def search_by_tokens(self, query: str, limit: int = 20) -> List[ContactModel]:
+        """
+        Returns the contacts that contain every word of a query in their name, phone, email or address.
+
+        Args:
+            query (str): The words to search for. The last word may be incomplete.
+            limit (int, optional): The maximum number of contacts to return. Defaults to 20.
+
+        Returns:
+            list[ContactModel]: The matching contacts sorted by name.
+
+        On SQLite every word is matched as a token prefix through the FTS5 search table. The matches are taken in the
+        table's rowid order, so the search stops after `limit` of them instead of ranking every match of a common word.
+        Other databases fall back to unindexed case-insensitive substring matching.
+        """
+        tokens = re.findall(r'\w+', query.lower())
+        if not tokens:
+            return []
+        if self.session.get_bind().dialect.name != 'sqlite':
+            columns = [getattr(ContactModel, column) for column in SEARCH_COLUMNS]
+            conditions = [or_(*(column.ilike(f'%{token}%') for column in columns)) for token in tokens]
+            return self.session.query(ContactModel).filter(*conditions).order_by(ContactModel.name).limit(limit).all()
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        ids = self.session.execute(
+            text(f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match LIMIT :limit"),
+            {'match': match, 'limit': limit},
+        ).scalars().all()
+        return self.session.query(ContactModel).filter(ContactModel.id.in_(ids)).order_by(func.lower(ContactModel.name), ContactModel.id).all()
+
+    def search_contacts(self, query: str, limit: int = 20) -> List[ContactModel]:
+        """
+        Searches the contacts by name prefix and by the words of their name, phone, email and address.
+
+        Args:
+            query (str): The search text.
+            limit (int, optional): The maximum number of contacts to return. Defaults to 20.
+
+        Returns:
+            list[ContactModel]: The matching contacts, those whose name starts with the query first.
+
+        This function combines `search_by_name_prefix` and `search_by_tokens`, so it is fast enough to run as the user types.
+        """
+        query = query.strip()
+        if not query:
+            return []
+        contacts = self.search_by_name_prefix(query, limit)
+        if len(contacts) < limit:
+            found = {contact.id for contact in contacts}
+            contacts += [contact for contact in self.search_by_tokens(query, limit) if contact.id not in found][:limit - len(contacts)]
+        return contacts
+
+    def fuzzy_search_contacts(self, query: str, limit: int = 10) -> List[ContactModel]:
+        """
+        Returns the contacts whose name or email is most similar to a possibly misspelled query.
+
+        Args:
+            query (str): The name or email to look up.
+            limit (int, optional): The maximum number of contacts to return. Defaults to 10.
+
+        Returns:
+            list[ContactModel]: The matching contacts, most similar first.
+
+        The matches come from the in-memory trigram index returned by `get_trigram_index`, and only the matching
+        contacts are read from the database.
+        """
+        matches = get_trigram_index(self).search(query, limit)
+        if not matches:
+            return []
+        contacts = {contact.id: contact for contact in self.session.query(ContactModel).filter(ContactModel.id.in_([contact_id for contact_id, score in matches]))}
+        return [contacts[contact_id] for contact_id, score in matches if contact_id in contacts]
+
     def update_contact(self, contact_id: int, name: str, email: Union[str, None] = None, phone: Union[str, None] = None, address: Union[str, None] = None) -> None:
         """
         Updates a contact in the database with the given contact ID.
@@ -122,17 +697,86 @@ class ContactBook:
             None: This function does not return anything.
 
         Raises:
-            None
+            ValueError: If another contact already has the new phone number.
 
-        This function retrieves a contact from the database with the given contact ID. If the contact exists, it updates the contact's name, email, phone, and address with the provided values. It then commits the changes to the database.
+        This function retrieves a contact from the database with the given contact ID. If the contact exists, it updates the contact's name, email, phone, and address with the provided values. It then commits the changes to the database and drops the contact from the contact cache. When the cache writes behind, the edit is held in the cache instead, replacing an earlier edit of the same contact, and written with other edits by `write_pending` once they are due.
         """
         contact = self.get_contact(contact_id)
         if contact:
+            if self.phone_in_use(phone, contact_id):
+                raise ValueError("A contact with this phone number already exists.")
+            cache = get_contact_cache()
+            if cache is not None and cache.write_delay is not None:
+                values = contact.column_values()
+                values.update(name=name, email=email, phone=phone, phone_normalized=normalize_phone(phone), address=address)
+                owner = cache.phones.get(values['phone_normalized'])
+                if owner is not None and owner != contact_id and owner in cache.pending:
+                    raise ValueError("A contact with this phone number already exists.")
+                # the session copy keeps the old values, reads go to the cache until the edit is written
+                self.session.expunge(contact)
+                cache.stage(values)
+                if cache.write_due():
+                    self.write_pending()
+                return
             contact.name = name
             contact.email = email
             contact.phone = phone
             contact.address = address
+            try:
+                self.session.commit()
+            except sqlalchemy.exc.IntegrityError:
+                self.session.rollback()
+                raise ValueError("A contact with this phone number already exists.")
+            if contact.phone_normalized is not None:
+                get_phone_filter(self).add(contact.phone_normalized)
+            if trigram_index.loaded:
+                trigram_index.update(contact_id, name, email)
+            if cache is not None:
+                cache.invalidate(contact_id)
+
+    def write_pending(self) -> None:
+        """
+        Writes the edits waiting in the contact cache, in one transaction.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If another process took the phone number of an edited contact meanwhile. The other edits are
+            still written, and the contacts whose edits were dropped are removed from the cache.
+
+        The edits are written with one UPDATE statement executed for every contact. If it fails, the edits are written
+        one at a time in savepoints, so only the conflicting ones are dropped.
+        """
+        cache = get_contact_cache()
+        if cache is None or not cache.pending:
+            return
+        pending = cache.take_pending()
+        failed = []
+        try:
+            self.session.execute(sqlalchemy.update(ContactModel), pending)
+            self.session.commit()
+        except sqlalchemy.exc.IntegrityError:
+            self.session.rollback()
+            for values in pending:
+                try:
+                    with self.session.begin_nested():
+                        self.session.execute(sqlalchemy.update(ContactModel), [values])
+                except sqlalchemy.exc.IntegrityError:
+                    cache.invalidate(values['id'])
+                    failed.append(values)
             self.session.commit()
+        failed_ids = {values['id'] for values in failed}
+        for values in pending:
+            if values['id'] in failed_ids:
+                continue
+            if values['phone_normalized'] is not None:
+                get_phone_filter(self).add(values['phone_normalized'])
+            if trigram_index.loaded:
+                trigram_index.update(values['id'], values['name'], values['email'])
+        if failed:
+            names = ', '.join(values['name'] for values in failed)
+            raise ValueError(f"Could not save {names}: a contact with this phone number already exists.")
 
     def delete_contact(self, contact_id: int) -> None:
         """
@@ -145,7 +789,84 @@ class ContactBook:
             None
 
         This function deletes a `ContactModel` object in the session with the given `contact_id`. It then commits
-        the changes to the database.
+        the changes to the database. The contact is dropped from the contact cache, with any edit of it that is not
+        written yet.
         """
+        cache = get_contact_cache()
+        if cache is not None:
+            cache.discard(contact_id)
         self.session.query(ContactModel).filter_by(id=contact_id).delete()
-        self.session.commit()
\ No newline at end of file
+        self.session.commit()
+        if trigram_index.loaded:
+            trigram_index.remove(contact_id)
+
+    def merge_duplicate_phones(self, batch_size: int = 10000) -> int:
+        """
+        Merges contacts whose phone numbers are equal after normalization, then makes `phone_normalized` unique.
+
+        Args:
+            batch_size (int, optional): The number of rows fetched and changed per statement. Defaults to 10000.
+
+        Returns:
+            int: The number of duplicate contacts merged away.
+
+        The contacts are read in one streaming scan ordered by normalized phone number, so duplicates arrive next to
+        each other and only the current group is held in memory. Each group keeps its oldest contact, and the email
+        and address it is missing are taken from the newest duplicate that has them. The other contacts of the group
+        are deleted. Finally the unique index on `phone_normalized` is created if duplicates had prevented it.
+        Edits waiting in the contact cache are written first, and the cache is cleared afterwards.
+        """
+        self.write_pending()
+        columns = (ContactModel.id, ContactModel.phone_normalized, ContactModel.email, ContactModel.address)
+        rows = self.session.query(*columns).filter(ContactModel.phone_normalized.isnot(None))
+        rows = rows.order_by(ContactModel.phone_normalized, ContactModel.id).yield_per(batch_size)
+        updates = []
+        duplicates = []
+        group = []
+
+        def merge(group):
+            keeper = group[0]
+            email, address = keeper.email, keeper.address
+            for row in group[1:]:
+                duplicates.append(row.id)
+                if not keeper.email and row.email:
+                    email = row.email
+                if not keeper.address and row.address:
+                    address = row.address
+            if (email, address) != (keeper.email, keeper.address):
+                updates.append({'contact_id': keeper.id, 'email': email, 'address': address})
+
+        for row in rows:
+            if group and row.phone_normalized != group[0].phone_normalized:
+                if len(group) > 1:
+                    merge(group)
+                group = []
+            group.append(row)
+        if len(group) > 1:
+            merge(group)
+
+        table = ContactModel.__table__
+        for start in range(0, len(updates), batch_size):
+            self.session.execute(
+                table.update().where(table.c.id == sqlalchemy.bindparam('contact_id')).values(email=sqlalchemy.bindparam('email'), address=sqlalchemy.bindparam('address')),
+                updates[start:start + batch_size],
+            )
+        for start in range(0, len(duplicates), batch_size):
+            self.session.execute(table.delete().where(table.c.id.in_(duplicates[start:start + batch_size])))
+        self.session.commit()
+
+        for index in table.indexes:
+            if index.name == 'ix_contacts_phone_normalized':
+                try:
+                    index.create(self.session.get_bind())
+                except sqlalchemy.exc.DBAPIError:
+                    pass  # the index already exists
+        if get_contact_cache() is not None:
+            get_contact_cache().clear()
+        if trigram_index.loaded:
+            for contact_id in duplicates:
+                trigram_index.remove(contact_id)
+            for update in updates:
+                contact = self.get_contact(update['contact_id'])
+                trigram_index.update(contact.id, contact.name, contact.email)
+        return len(duplicates)
@@ -0,0 +1,234 @@
+from collections import OrderedDict
+import time
+
+class ContactCache:
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0, write_delay: float = None, write_batch: int = 100, clock=time.monotonic):
+        """
+        Initializes an empty read-through cache of contacts, keyed by id and by normalized phone number.
+
+        Contacts are kept as dicts of their column values, not as model objects, so a cached contact can be handed to
+        any session. The least recently used contact is evicted once `max_size` are cached, and a contact is read
+        from the database again once it is older than `ttl` seconds, which bounds how long changes made by other
+        processes go unseen.
+
+        With a `write_delay`, the cache also holds edits that are not written yet (write-behind). Repeated edits of a
+        contact replace each other, and the edits are written together once `write_delay` seconds passed since the
+        oldest one or `write_batch` contacts have edits.
+
+        Args:
+            max_size (int): The maximum number of cached contacts.
+            ttl (float): The number of seconds a cached contact is used for.
+            write_delay (float, optional): The number of seconds edits may wait to be written. Defaults to None,
+                which writes every edit immediately.
+            write_batch (int): The number of edited contacts that are written without waiting for `write_delay`.
+            clock (callable): Returns the current time in seconds.
+
+        Returns:
+            None
+        """
+        self.max_size = max(max_size, 1)
+        self.ttl = ttl
+        self.write_delay = write_delay
+        self.write_batch = write_batch
+        self.clock = clock
+        # id -> (time cached, values), least recently used first
+        self.entries = OrderedDict()
+        # normalized phone -> id
+        self.phones = {}
+        # id -> values of edits not written yet, oldest first
+        self.pending = {}
+        self.pending_since = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, contact_id: int):
+        """
+        Returns a cached contact.
+
+        Args:
+            contact_id (int): The id of the contact.
+
+        Returns:
+            Union[dict, None]: The column values of the contact, or None if it is not cached or expired.
+        """
+        values = self.pending.get(contact_id)
+        if values is not None:
+            self.hits += 1
+            return values
+        entry = self.entries.get(contact_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        if self.clock() - entry[0] > self.ttl:
+            self.invalidate(contact_id)
+            self.misses += 1
+            return None
+        self.entries.move_to_end(contact_id)
+        self.hits += 1
+        return entry[1]
+
+    def get_by_phone(self, phone_normalized: str):
+        """
+        Returns the cached contact with a phone number.
+
+        Args:
+            phone_normalized (str): The normalized phone number.
+
+        Returns:
+            Union[dict, None]: The column values of the contact, or None if it is not cached or expired.
+        """
+        contact_id = self.phones.get(phone_normalized)
+        if contact_id is None:
+            self.misses += 1
+            return None
+        return self.get(contact_id)
+
+    def put(self, values: dict) -> None:
+        """
+        Caches a contact read from the database, evicting the least recently used one if the cache is full.
+
+        Args:
+            values (dict): The column values of the contact, including its id.
+
+        Returns:
+            None
+        """
+        contact_id = values['id']
+        self.invalidate(contact_id)
+        self.entries[contact_id] = (self.clock(), values)
+        if values['phone_normalized'] is not None:
+            self.phones[values['phone_normalized']] = contact_id
+        while len(self.entries) > self.max_size:
+            old_id, (cached, old_values) = self.entries.popitem(last=False)
+            self.forget_phone(old_id, old_values)
+            self.evictions += 1
+
+    def invalidate(self, contact_id: int) -> None:
+        """
+        Drops a cached contact, for example after it was updated or deleted.
+
+        Args:
+            contact_id (int): The id of the contact.
+
+        Returns:
+            None
+        """
+        entry = self.entries.pop(contact_id, None)
+        if entry is not None:
+            self.forget_phone(contact_id, entry[1])
+
+    def forget_phone(self, contact_id: int, values: dict) -> None:
+        """
+        Drops the phone number key of a contact that is no longer cached.
+
+        Args:
+            contact_id (int): The id of the contact.
+            values (dict): The column values the contact was cached with.
+
+        Returns:
+            None
+        """
+        if self.phones.get(values['phone_normalized']) == contact_id:
+            del self.phones[values['phone_normalized']]
+
+    def clear(self) -> None:
+        """
+        Drops every cached contact, for changes that touch many contacts. Edits not written yet are kept.
+
+        Returns:
+            None
+        """
+        self.entries.clear()
+        self.phones = {values['phone_normalized']: contact_id for contact_id, values in self.pending.items()
+                       if values['phone_normalized'] is not None}
+
+    def stage(self, values: dict) -> None:
+        """
+        Holds an edit of a contact to be written later, replacing an earlier edit of the same contact.
+
+        Args:
+            values (dict): The new column values of the contact, including its id.
+
+        Returns:
+            None
+        """
+        self.invalidate(values['id'])
+        previous = self.pending.get(values['id'])
+        if previous is not None:
+            self.forget_phone(values['id'], previous)
+        if not self.pending:
+            self.pending_since = self.clock()
+        self.pending[values['id']] = values
+        if values['phone_normalized'] is not None:
+            self.phones[values['phone_normalized']] = values['id']
+
+    def discard(self, contact_id: int) -> None:
+        """
+        Drops a contact from the cache together with an edit of it that is not written yet, for example after it was
+        deleted.
+
+        Args:
+            contact_id (int): The id of the contact.
+
+        Returns:
+            None
+        """
+        values = self.pending.pop(contact_id, None)
+        if values is not None:
+            self.forget_phone(contact_id, values)
+        self.invalidate(contact_id)
+
+    def write_due(self) -> bool:
+        """
+        Returns whether the edits waiting to be written should be written now.
+
+        Returns:
+            bool: True if `write_batch` contacts have edits or the oldest edit waited `write_delay` seconds.
+        """
+        if not self.pending:
+            return False
+        return len(self.pending) >= self.write_batch or self.clock() - self.pending_since >= self.write_delay
+
+    def time_to_write(self):
+        """
+        Returns the number of seconds until the edits waiting to be written are due.
+
+        Returns:
+            Union[float, None]: The number of seconds, 0 if they are due, or None if there are no edits.
+        """
+        if not self.pending:
+            return None
+        return max(0.0, self.write_delay - (self.clock() - self.pending_since))
+
+    def take_pending(self) -> list:
+        """
+        Removes and returns the edits waiting to be written. Each contact is cached again as it was edited.
+
+        Returns:
+            list: The column values of each edited contact, oldest edit first.
+        """
+        pending = list(self.pending.values())
+        self.pending = {}
+        self.pending_since = None
+        for values in pending:
+            self.put(values)
+        return pending
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: The number of hits, misses and evictions, the number of cached contacts and of edits not written yet.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self.entries),
+            'pending': len(self.pending),
+        }
@@ -0,0 +1,194 @@
+from contact_book_model import ContactBook, get_contact_cache
+import itertools
+import queue
+import threading
+
+class DatabaseWorker:
+    def __init__(self, master, on_busy=None, poll_interval: int = 20):
+        """
+        Initializes a worker thread that runs `ContactBook` operations off the Tk main loop.
+
+        The worker thread owns its own `ContactBook` and session. Tasks are queued with `submit`, run one at a time on the
+        worker thread, and their results are handed back to the main loop by polling with `after()`, so callbacks can
+        safely update widgets.
+
+        Parameters:
+            master: The Tk widget whose `after()` is used to deliver results.
+            on_busy (callable): Called with True when the worker starts having pending tasks and False when it is idle.
+            poll_interval (int): The number of milliseconds between checks for finished tasks.
+
+        Returns:
+            None
+        """
+        self.master = master
+        self.on_busy = on_busy
+        self.poll_interval = poll_interval
+        self.tasks = queue.Queue()
+        self.results = queue.Queue()
+        self.tickets = itertools.count(1)
+        # key -> ticket of the newest task submitted with that key, older tasks with the key are stale
+        self.latest = {}
+        self.pending = 0
+        self.busy = False
+
+        self.thread = threading.Thread(target=self.run, name="contact-book-db", daemon=True)
+        self.thread.start()
+        self.after_id = self.master.after(self.poll_interval, self.poll)
+
+    def submit(self, task, on_done=None, on_error=None, key=None) -> int:
+        """
+        Queues a task to run on the worker thread.
+
+        A task submitted with a `key` supersedes every earlier task with the same key: if an earlier one has not started
+        it is skipped, and if it already ran its result is dropped.
+
+        Parameters:
+            task (callable): Called with the worker's `ContactBook`, its return value is the result.
+            on_done (callable): Called on the main loop with the result.
+            on_error (callable): Called on the main loop with the exception if the task raised one. By default the
+                exception is reported like any other Tk callback error.
+            key (hashable): Identifies requests for the same data, for cancelling stale ones.
+
+        Returns:
+            int: The ticket of the task.
+        """
+        ticket = next(self.tickets)
+        if key is not None:
+            self.latest[key] = ticket
+        self.pending += 1
+        self.set_busy(True)
+        self.tasks.put((ticket, key, task, on_done, on_error))
+        return ticket
+
+    def set_busy(self, busy: bool) -> None:
+        """
+        Notifies `on_busy` when the worker switches between having pending tasks and being idle.
+
+        Parameters:
+            busy (bool): Whether there are pending tasks.
+
+        Returns:
+            None
+        """
+        if busy != self.busy:
+            self.busy = busy
+            if self.on_busy:
+                self.on_busy(busy)
+
+    def cancel(self, key) -> None:
+        """
+        Cancels the pending task submitted with a key, if any.
+
+        Parameters:
+            key (hashable): The key of the task.
+
+        Returns:
+            None
+        """
+        self.latest.pop(key, None)
+
+    def is_stale(self, ticket: int, key) -> bool:
+        """
+        Returns whether a task was superseded or cancelled.
+
+        Parameters:
+            ticket (int): The ticket of the task.
+            key (hashable): The key of the task.
+
+        Returns:
+            bool: True if the task is stale, False otherwise.
+        """
+        return key is not None and self.latest.get(key) != ticket
+
+    def run(self) -> None:
+        """
+        Runs queued tasks until `close` is called. This is the body of the worker thread.
+
+        When the contact cache writes behind, edits waiting in it are written once they are due even if no further task
+        arrives, and an error writing them is reported like one from a task without `on_error`.
+
+        Returns:
+            None
+        """
+        contact_book = ContactBook()
+        # results are read on the main thread, so they must never be expired and lazily reloaded from this session
+        contact_book.session.expire_on_commit = False
+        cache = get_contact_cache()
+        try:
+            while True:
+                try:
+                    item = self.tasks.get(timeout=cache.time_to_write() if cache is not None else None)
+                except queue.Empty:
+                    try:
+                        contact_book.write_pending()
+                    except Exception as e:
+                        contact_book.session.rollback()
+                        self.results.put((None, None, self.report_error, e))
+                    finally:
+                        contact_book.session.expunge_all()
+                    continue
+                if item is None:
+                    return
+                ticket, key, task, on_done, on_error = item
+                if self.is_stale(ticket, key):
+                    self.results.put((ticket, key, None, None))
+                    continue
+                try:
+                    result = task(contact_book)
+                    self.results.put((ticket, key, on_done, result))
+                except Exception as e:
+                    contact_book.session.rollback()
+                    self.results.put((ticket, key, on_error or self.report_error, e))
+                finally:
+                    contact_book.session.expunge_all()
+        finally:
+            contact_book.close()
+
+    def report_error(self, error: Exception) -> None:
+        """
+        Reports an exception from a task that has no `on_error` callback.
+
+        Parameters:
+            error (Exception): The exception.
+
+        Returns:
+            None
+        """
+        self.master.report_callback_exception(type(error), error, error.__traceback__)
+
+    def poll(self) -> None:
+        """
+        Delivers the results of finished tasks on the main loop and schedules the next check.
+
+        Returns:
+            None
+        """
+        try:
+            while True:
+                ticket, key, callback, value = self.results.get_nowait()
+                if ticket is not None:
+                    # results without a ticket come from the worker itself, not from a submitted task
+                    self.pending -= 1
+                if self.is_stale(ticket, key):
+                    continue
+                if key is not None:
+                    del self.latest[key]
+                if callback:
+                    callback(value)
+        except queue.Empty:
+            pass
+        finally:
+            if not self.pending:
+                self.set_busy(False)
+            self.after_id = self.master.after(self.poll_interval, self.poll)
+
+    def close(self) -> None:
+        """
+        Stops polling and lets the worker thread finish its current task and close its session.
+
+        Returns:
+            None
+        """
+        self.master.after_cancel(self.after_id)
+        self.tasks.put(None)
+        self.thread.join(timeout=5)
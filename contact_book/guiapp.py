@@ -1,7 +1,9 @@
 #!/usr/bin/env python
 
 import customtkinter as ctk
-from contact_book_model import ContactBook
+from dbworker import DatabaseWorker
+from contact_book_model import get_trigram_index
+from virtuallist import VirtualContactList
 import tkinter.messagebox
 
 class ContactBookApp(ctk.CTk):
@@ -11,6 +13,8 @@ class ContactBookApp(ctk.CTk):
 
         This function sets up the initial state of the application by calling the parent class's `__init__` method.
         It also sets the title and geometry of the application window.
+        Database operations run on a `DatabaseWorker` thread so a slow database never freezes the window, and a
+        status label shows while they are running.
 
         Parameters:
             None
@@ -23,23 +27,31 @@ class ContactBookApp(ctk.CTk):
         self.title("Contact Book")
         self.geometry("500x400")
 
-        self.contact_book = ContactBook()
+        self.page_frame = None
+        self.protocol("WM_DELETE_WINDOW", self.exit_app)
+
+        self.status_label = ctk.CTkLabel(self, text="")
+        self.status_label.pack(side="bottom", pady=5)
+        self.worker = DatabaseWorker(self, on_busy=self.show_busy)
 
         self.create_widgets()
+        # load the fuzzy search index in the background after the contact list, before the first search needs it
+        self.worker.submit(lambda contact_book: get_trigram_index(contact_book))
 
     def create_widgets(self):
         """
         Creates the widgets for the ContactBook application.
 
-        This function creates the widgets for the ContactBook application, including the heading, button frame, scrollable frame, and other UI elements.
+        This function creates the widgets for the ContactBook application, including the heading, button frame, contact list, and other UI elements.
+        The widgets are created once inside `main_frame`, which is hidden while another page is open and shown again afterwards.
         The widgets created include:
             - A label for the heading of the application.
             - A button frame for the application.
             - A button for add contact.
             - A button for refreshing the contacts.
             - A button for exiting the application.
-            - A canvas for displaying the contacts.
-            - A scrollbar for scrolling the contacts.
+            - A search box that shows matching contacts as the user types.
+            - A frame for displaying the contacts.
             - A label for displaying the number of contacts.
 
         Parameters:
@@ -48,14 +60,15 @@ class ContactBookApp(ctk.CTk):
         Returns:
             None
         """
-        self.clear_frame()
+        self.main_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.main_frame.pack(fill="both", expand=True)
 
         # Heading
-        self.label = ctk.CTkLabel(self, text="Contact Book Application", font=("Arial", 20))
+        self.label = ctk.CTkLabel(self.main_frame, text="Contact Book Application", font=("Arial", 20))
         self.label.pack(pady=20)
 
         # Button Frame
-        self.button_frame = ctk.CTkFrame(self)
+        self.button_frame = ctk.CTkFrame(self.main_frame)
         self.button_frame.pack(pady=10)
 
         # Add Contact Button
@@ -63,33 +76,24 @@ class ContactBookApp(ctk.CTk):
         self.add_contact_button.grid(row=0, column=0, padx=10)
 
         # Refresh Button
-        self.refresh_button = ctk.CTkButton(self.button_frame, text="Refresh", command=self.create_widgets)
+        self.refresh_button = ctk.CTkButton(self.button_frame, text="Refresh", command=self.refresh_contacts)
         self.refresh_button.grid(row=0, column=1, padx=10)
 
         # Exit Button
         self.exit_button = ctk.CTkButton(self.button_frame, text="Exit", command=self.exit_app)
         self.exit_button.grid(row=0, column=2, padx=10)
 
-        # Scrollable Frame for Contacts
-        self.contacts_frame = ctk.CTkFrame(self)
-        self.contacts_frame.pack(fill="both", expand=True, padx=20, pady=10)
-
-        self.canvas = ctk.CTkCanvas(self.contacts_frame)
-        self.scrollbar = ctk.CTkScrollbar(self.contacts_frame, orientation="vertical", command=self.canvas.yview)
-        self.scrollable_frame = ctk.CTkFrame(self.canvas)
+        # Search Box
+        self.search_var = ctk.StringVar()
+        self.search_var.trace_add("write", lambda *args: self.schedule_search())
+        self.search_after_id = None
+        self.search_entry = ctk.CTkEntry(self.main_frame, textvariable=self.search_var, placeholder_text="Search contacts", width=300)
+        self.search_entry.pack(pady=5)
+        self.search_frame = ctk.CTkScrollableFrame(self.main_frame)
 
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(
-                scrollregion=self.canvas.bbox("all")
-            )
-        )
-
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
-
-        self.canvas.pack(side="left", fill="both", expand=True)
-        self.scrollbar.pack(side="right", fill="y")
+        # Frame for Contacts
+        self.contacts_frame = ctk.CTkFrame(self.main_frame)
+        self.contacts_frame.pack(fill="both", expand=True, padx=20, pady=10)
 
         # Fetch and display contacts
         self.display_contacts()
@@ -98,12 +102,11 @@ class ContactBookApp(ctk.CTk):
         """
         Displays the contacts in the ContactBook application.
 
-        This function retrieves all the contacts from the ContactBook and displays the contact count and the contacts in the scrollable frame.
-        If there are no contacts, it displays a message indicating that there are no contacts available.
+        This function creates the contact count label, the message shown when there are no contacts, and a virtualized list of the contacts.
         The contacts are sorted by name in ascending order.
         The contact count is displayed using the label `contact_count_label`.
-        The contacts are displayed in the scrollable frame using a for loop.
-        The contacts are displayed as contact frames with labels and buttons.
+        The contacts are displayed in a `VirtualContactList`, which only creates row widgets for the visible contacts
+        and fetches contacts from the ContactBook as the user scrolls. After a change, only the affected rows are updated.
 
         Parameters:
             None
@@ -111,31 +114,144 @@ class ContactBookApp(ctk.CTk):
         Returns:
             None
         """
+        self.contact_count_label = ctk.CTkLabel(self.contacts_frame, text="Loading contacts...")
+        self.contact_count_label.pack(pady=10)
+
+        self.no_contacts_label = ctk.CTkLabel(self.contacts_frame, text="No contacts available.")
+        self.no_contacts_add_button = ctk.CTkButton(self.contacts_frame, text="Add Contact", command=self.add_new_contact)
+        self.contact_list = VirtualContactList(self.contacts_frame, self.worker, on_view=self.view_contact, on_count=lambda total: self.update_contact_count())
+
+    def update_contact_count(self):
+        """
+        Updates the contact count label and switches between the contact list and the "No contacts" message.
 
-        contacts = self.contact_book.get_all_contacts()
-        contact_count = len(contacts)
+        Parameters:
+            None
 
-        # Display contact count
+        Returns:
+            None
+        """
+        contact_count = self.contact_list.total
         contact_name = "Contact" if contact_count == 1 else "Contacts"
-        self.contact_count_label = ctk.CTkLabel(self.scrollable_frame, text=f"{contact_name}: {contact_count}")
-        self.contact_count_label.pack(pady=10)
+        self.contact_count_label.configure(text=f"{contact_name}: {contact_count}")
 
-        if not contacts:
-            self.no_contacts_label = ctk.CTkLabel(self.scrollable_frame, text="No contacts available.")
+        if not contact_count:
+            self.contact_list.pack_forget()
             self.no_contacts_label.pack(pady=10)
-            self.add_contact_button = ctk.CTkButton(self.scrollable_frame, text="Add Contact", command=self.add_new_contact)
-            self.add_contact_button.pack(pady=10)
+            self.no_contacts_add_button.pack(pady=10)
         else:
-            sorted_contacts = sorted(contacts, key=lambda contact: contact.name.lower())
-            for contact in sorted_contacts:
-                contact_frame = ctk.CTkFrame(self.scrollable_frame)
-                contact_frame.pack(fill="x", pady=2)
+            self.no_contacts_label.pack_forget()
+            self.no_contacts_add_button.pack_forget()
+            self.contact_list.pack(fill="both", expand=True)
+
+    def refresh_contacts(self):
+        """
+        Reloads the contacts from the ContactBook, updating only the rows that changed.
+
+        The contact count is updated once the contacts have been counted.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        self.contact_list.refresh()
 
-                contact_label = ctk.CTkLabel(contact_frame, text=f"{contact.name} - {contact.phone}")
-                contact_label.pack(side="left", padx=5)
+    def schedule_search(self):
+        """
+        Runs the search shortly after the user stops typing in the search box.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        if self.search_after_id is not None:
+            self.after_cancel(self.search_after_id)
+        self.search_after_id = self.after(150, self.search)
+
+    def search(self):
+        """
+        Searches the contacts for the text in the search box on the worker thread.
 
-                view_button = ctk.CTkButton(contact_frame, text="View", command=lambda c=contact: self.view_contact(c))
-                view_button.pack(side="right", padx=5)
+        An empty search box shows the full contact list again. When the indexed search finds fewer than five contacts,
+        the closest fuzzy matches are added, so misspelled names are still found. Each search supersedes the previous
+        one, so results of searches for text the user has already typed past are dropped.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        self.search_after_id = None
+        query = self.search_var.get().strip()
+        if not query:
+            self.worker.cancel("search")
+            self.search_frame.pack_forget()
+            self.contacts_frame.pack(fill="both", expand=True, padx=20, pady=10)
+            return
+        def find(contact_book):
+            contacts = contact_book.search_contacts(query, limit=50)
+            if len(contacts) < 5:
+                # few exact or prefix matches, the name may be misspelled
+                found = {contact.id for contact in contacts}
+                contacts += [contact for contact in contact_book.fuzzy_search_contacts(query) if contact.id not in found]
+            return contacts
+
+        self.worker.submit(find, on_done=self.show_search_results, key="search")
+
+    def show_search_results(self, contacts):
+        """
+        Shows the contacts found by a search in place of the contact list.
+
+        Parameters:
+            contacts (list[ContactModel]): The matching contacts.
+
+        Returns:
+            None
+        """
+        self.contacts_frame.pack_forget()
+        self.search_frame.pack(fill="both", expand=True, padx=20, pady=10)
+        for widget in self.search_frame.winfo_children():
+            widget.destroy()
+
+        if not contacts:
+            ctk.CTkLabel(self.search_frame, text="No matching contacts.").pack(pady=10)
+        for contact in contacts:
+            row = ctk.CTkFrame(self.search_frame)
+            row.pack(fill="x", pady=2)
+            ctk.CTkLabel(row, text=f"{contact.name} - {contact.phone}", anchor="w").pack(side="left", padx=5, fill="x", expand=True)
+            ctk.CTkButton(row, text="View", width=60, command=lambda c=contact: self.view_contact(c)).pack(side="right", padx=5)
+
+    def show_busy(self, busy):
+        """
+        Shows or hides the loading status while database operations are running.
+
+        Parameters:
+            busy (bool): Whether database operations are running.
+
+        Returns:
+            None
+        """
+        self.status_label.configure(text="Loading..." if busy else "")
+
+    def show_error(self, error, button=None):
+        """
+        Shows an error raised by a database operation and enables the button that started it again.
+
+        Parameters:
+            error (Exception): The error.
+            button (ctk.CTkButton): The button that was disabled while the operation was running.
+
+        Returns:
+            None
+        """
+        if button is not None and button.winfo_exists():
+            button.configure(state="normal")
+        tkinter.messagebox.showerror("Error", str(error))
 
     def view_contact(self, contact):
         """
@@ -147,33 +263,33 @@ class ContactBookApp(ctk.CTk):
         Returns:
             None
 
-        This method clears the current frame and creates a new label and buttons to view the contact.
+        This method hides the contact list, opens a new page and creates a label and buttons to view the contact.
         The contact details are displayed in a label and the buttons allow the user to update or delete the contact.
         The 'Back' button returns to the main application.
 
         """
-        self.clear_frame()
-        self.label = ctk.CTkLabel(self, text="View Contact", font=("Arial", 20))
+        page = self.new_page()
+        self.label = ctk.CTkLabel(page, text="View Contact", font=("Arial", 20))
         self.label.pack(pady=20)
 
         contact_details = f"Name: {contact.name}\nPhone: {contact.phone}\nEmail: {contact.email}\nAddress: {contact.address}"
-        self.contact_label = ctk.CTkLabel(self, text=contact_details)
+        self.contact_label = ctk.CTkLabel(page, text=contact_details)
         self.contact_label.pack(pady=10)
 
-        self.update_button = ctk.CTkButton(self, text="Update", command=lambda: self.update_contact(contact))
+        self.update_button = ctk.CTkButton(page, text="Update", command=lambda: self.update_contact(contact))
         self.update_button.pack(pady=10)
 
-        self.delete_button = ctk.CTkButton(self, text="Delete", command=lambda: self.delete_contact(contact.id))
+        self.delete_button = ctk.CTkButton(page, text="Delete", command=lambda: self.delete_contact(contact.id))
         self.delete_button.pack(pady=10)
 
-        self.back_button = ctk.CTkButton(self, text="Back", command=self.create_widgets)
+        self.back_button = ctk.CTkButton(page, text="Back", command=self.show_main)
         self.back_button.pack(pady=10)
 
     def update_contact(self, contact):
         """
         Updates the contact information in the ContactBook application.
 
-        This function clears the current frame, displays a label indicating that the contact is being updated,
+        This function opens a new page, displays a label indicating that the contact is being updated,
         and creates entry fields for the contact's name, phone, email, and address. The initial values of the entry
         fields are set to the corresponding values of the provided contact object. The user can then modify the
         values and save the updated contact.
@@ -184,8 +300,8 @@ class ContactBookApp(ctk.CTk):
         Returns:
             None
         """
-        self.clear_frame()
-        self.label = ctk.CTkLabel(self, text="Update Contact", font=("Arial", 20))
+        page = self.new_page()
+        self.label = ctk.CTkLabel(page, text="Update Contact", font=("Arial", 20))
         self.label.pack(pady=20)
 
         # Use StringVar to set initial values
@@ -194,19 +310,19 @@ class ContactBookApp(ctk.CTk):
         self.email_var = ctk.StringVar(value=contact.email)
         self.address_var = ctk.StringVar(value=contact.address)
 
-        self.name_entry = ctk.CTkEntry(self, textvariable=self.name_var, placeholder_text="Name")
+        self.name_entry = ctk.CTkEntry(page, textvariable=self.name_var, placeholder_text="Name")
         self.name_entry.pack(pady=5)
-        self.phone_entry = ctk.CTkEntry(self, textvariable=self.phone_var, placeholder_text="Phone")
+        self.phone_entry = ctk.CTkEntry(page, textvariable=self.phone_var, placeholder_text="Phone")
         self.phone_entry.pack(pady=5)
-        self.email_entry = ctk.CTkEntry(self, textvariable=self.email_var, placeholder_text="Email")
+        self.email_entry = ctk.CTkEntry(page, textvariable=self.email_var, placeholder_text="Email")
         self.email_entry.pack(pady=5)
-        self.address_entry = ctk.CTkEntry(self, textvariable=self.address_var, placeholder_text="Address")
+        self.address_entry = ctk.CTkEntry(page, textvariable=self.address_var, placeholder_text="Address")
         self.address_entry.pack(pady=5)
 
-        self.save_button = ctk.CTkButton(self, text="Save Contact", command=lambda: self.save_updated_contact(contact.id))
+        self.save_button = ctk.CTkButton(page, text="Save Contact", command=lambda: self.save_updated_contact(contact.id))
         self.save_button.pack(pady=20)
 
-        self.back_button = ctk.CTkButton(self, text="Back", command=lambda: self.view_contact(contact))
+        self.back_button = ctk.CTkButton(page, text="Back", command=lambda: self.view_contact(contact))
         self.back_button.pack(pady=10)
 
     def save_updated_contact(self, contact_id):
@@ -215,9 +331,10 @@ class ContactBookApp(ctk.CTk):
 
         This function retrieves the updated contact information from the GUI and updates the contact in the ContactBook.
         The contact is identified by the provided `contact_id`. The function takes the updated name, phone, email, and address
-        from the GUI and updates the contact in the ContactBook. After the update is successful, a message box is displayed
-        to inform the user of the success. Finally, the function calls `create_widgets()` to refresh the GUI with the updated
-        contact information.
+        from the GUI and updates the contact in the ContactBook on the worker thread, with the save button disabled until
+        it finishes. After the update is successful, a message box is displayed
+        to inform the user of the success. Finally, only the row of the updated contact is refreshed in the contact list
+        and the list is shown again.
 
         Parameters:
             contact_id (int): The ID of the contact to be updated.
@@ -230,9 +347,17 @@ class ContactBookApp(ctk.CTk):
         email = self.email_var.get()
         address = self.address_var.get()
 
-        self.contact_book.update_contact(contact_id, name=name, phone=phone, email=email, address=address)
-        tkinter.messagebox.showinfo("Success", "Contact updated successfully!")
-        self.create_widgets()
+        def update(contact_book):
+            contact_book.update_contact(contact_id, name=name, phone=phone, email=email, address=address)
+            return contact_book.get_contact(contact_id)
+
+        def updated(contact):
+            self.contact_list.contact_updated(contact)
+            tkinter.messagebox.showinfo("Success", "Contact updated successfully!")
+            self.show_main()
+
+        self.save_button.configure(state="disabled")
+        self.worker.submit(update, on_done=updated, on_error=lambda e, button=self.save_button: self.show_error(e, button))
 
     def delete_contact(self, contact_id):
         """
@@ -244,19 +369,24 @@ class ContactBookApp(ctk.CTk):
         Returns:
             None
 
-        This function prompts the user to confirm the deletion of a contact. If the user confirms, the contact is deleted from the contact book and a success message is displayed. Finally, the widgets are recreated to reflect the updated contact list.
+        This function prompts the user to confirm the deletion of a contact. If the user confirms, the contact is deleted from the contact book on the worker thread and a success message is displayed. Finally, the contact is removed from the contact list and the list is shown again.
         """
         confirm = tkinter.messagebox.askyesno("Confirm", "Are you sure you want to delete this contact?")
         if confirm:
-            self.contact_book.delete_contact(contact_id)
-            tkinter.messagebox.showinfo("Success", "Contact deleted successfully!")
-            self.create_widgets()
+            def deleted(result):
+                self.contact_list.contact_removed(contact_id)
+                self.update_contact_count()
+                tkinter.messagebox.showinfo("Success", "Contact deleted successfully!")
+                self.show_main()
+
+            self.delete_button.configure(state="disabled")
+            self.worker.submit(lambda contact_book: contact_book.delete_contact(contact_id), on_done=deleted, on_error=lambda e, button=self.delete_button: self.show_error(e, button))
 
     def add_new_contact(self):
         """
         Adds a new contact to the ContactBook application.
 
-        This function clears the current frame and creates entry fields for the contact's name, phone, email, and address.
+        This function opens a new page and creates entry fields for the contact's name, phone, email, and address.
         The initial values of the entry fields are set to the corresponding values of the provided contact object.
         The user can then modify the values and save the updated contact.
 
@@ -266,23 +396,23 @@ class ContactBookApp(ctk.CTk):
         Returns:
             None
         """
-        self.clear_frame()
-        self.label = ctk.CTkLabel(self, text="Add New Contact", font=("Arial", 20))
+        page = self.new_page()
+        self.label = ctk.CTkLabel(page, text="Add New Contact", font=("Arial", 20))
         self.label.pack(pady=20)
 
-        self.name_entry = ctk.CTkEntry(self, placeholder_text="Name")
+        self.name_entry = ctk.CTkEntry(page, placeholder_text="Name")
         self.name_entry.pack(pady=5)
-        self.phone_entry = ctk.CTkEntry(self, placeholder_text="Phone")
+        self.phone_entry = ctk.CTkEntry(page, placeholder_text="Phone")
         self.phone_entry.pack(pady=5)
-        self.email_entry = ctk.CTkEntry(self, placeholder_text="Email")
+        self.email_entry = ctk.CTkEntry(page, placeholder_text="Email")
         self.email_entry.pack(pady=5)
-        self.address_entry = ctk.CTkEntry(self, placeholder_text="Address")
+        self.address_entry = ctk.CTkEntry(page, placeholder_text="Address")
         self.address_entry.pack(pady=5)
 
-        self.save_button = ctk.CTkButton(self, text="Save Contact", command=self.save_contact)
+        self.save_button = ctk.CTkButton(page, text="Save Contact", command=self.save_contact)
         self.save_button.pack(pady=20)
 
-        self.back_button = ctk.CTkButton(self, text="Back", command=self.create_widgets)
+        self.back_button = ctk.CTkButton(page, text="Back", command=self.show_main)
         self.back_button.pack(pady=10)
 
     def save_contact(self):
@@ -290,9 +420,9 @@ class ContactBookApp(ctk.CTk):
         Saves a new contact to the ContactBook application.
 
         This function retrieves the name, phone, email, and address from the GUI entry fields and attempts to add a new contact
-        to the ContactBook using the `add_contact` method of the `contact_book` object. If the contact is successfully added,
-        a message box is displayed to inform the user of the success. After the contact is added, the `create_widgets` method
-        is called to refresh the GUI with the updated contact list.
+        to the ContactBook using the `add_contact` method on the worker thread. If the contact is successfully added,
+        a message box is displayed to inform the user of the success. After the contact is added, it is inserted into the
+        contact list and the list is shown again.
 
         If a `ValueError` is raised during the addition of the contact, indicating a duplicate phone number, a message box
         is displayed to inform the user of the error.
@@ -308,18 +438,20 @@ class ContactBookApp(ctk.CTk):
         email = self.email_entry.get()
         address = self.address_entry.get()
 
-        try:
-            self.contact_book.add_contact(name=name, phone=phone, email=email, address=address)
+        def added(new_contact):
+            self.contact_list.contact_inserted(new_contact)
+            self.update_contact_count()
             tkinter.messagebox.showinfo("Success", "Contact added successfully!")
-            self.create_widgets()
-        except ValueError as e:
-            tkinter.messagebox.showerror("Error", str(e))
+            self.show_main()
+
+        self.save_button.configure(state="disabled")
+        self.worker.submit(lambda contact_book: contact_book.add_contact(name=name, phone=phone, email=email, address=address), on_done=added, on_error=lambda e, button=self.save_button: self.show_error(e, button))
 
     def clear_frame(self):
         """
-        Clears the current frame by destroying all child widgets.
+        Clears the current page by destroying it and all of its child widgets.
 
-        This function iterates over all the children of the frame and destroys each child widget, effectively clearing the frame of all widgets.
+        The contact list screen is kept alive and only hidden, so it is not rebuilt when the user returns to it.
 
         Parameters:
             None
@@ -327,18 +459,53 @@ class ContactBookApp(ctk.CTk):
         Returns:
             None
         """
-        for widget in self.winfo_children():
-            widget.destroy()
+        if self.page_frame is not None:
+            self.page_frame.destroy()
+            self.page_frame = None
+
+    def new_page(self):
+        """
+        Hides the contact list screen and returns an empty frame for a new page.
+
+        Parameters:
+            None
+
+        Returns:
+            ctk.CTkFrame: The frame of the new page.
+        """
+        self.clear_frame()
+        self.main_frame.pack_forget()
+        self.page_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.page_frame.pack(fill="both", expand=True)
+        return self.page_frame
+
+    def show_main(self):
+        """
+        Closes the current page and shows the contact list screen again.
+
+        If a search is active it is run again, since the contact may have been changed or deleted.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        self.clear_frame()
+        self.main_frame.pack(fill="both", expand=True)
+        if self.search_var.get().strip():
+            self.search()
 
     def exit_app(self):
         """
-        Exits the application by destroying the root window.
+        Exits the application by stopping the database worker and destroying the root window.
 
-        This function destroys the application by calling the `destroy` method on the root window. It does not take any arguments or return any values.
+        This function stops the worker thread, which closes its session, and then calls the `destroy` method on the root window. It does not take any arguments or return any values.
 
         Returns:
             None
         """
+        self.worker.close()
         self.destroy()
 
 if __name__ == "__main__":
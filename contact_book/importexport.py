@@ -0,0 +1,388 @@
+from contact_book_model import ContactModel, normalize_phone, trigram_index
+import contact_book_model
+import sqlalchemy
+import csv
+import os
+import re
+from itertools import islice
+from typing import Iterable, Iterator, TextIO
+
+FIELDS = ('name', 'phone', 'email', 'address')
+
+class ImportReport:
+    def __init__(self) -> None:
+        """
+        Initializes the outcome of an import: the number of contacts imported and the rows that were skipped.
+
+        Returns:
+            None
+        """
+        self.imported = 0
+        self.conflicts = []
+
+    def conflict(self, row: int, phone: str, reason: str) -> None:
+        """
+        Records a row that was not imported.
+
+        Args:
+            row (int): The number of the record in the input, starting at 1.
+            phone (str): The phone number of the record.
+            reason (str): Why the record was skipped.
+
+        Returns:
+            None
+        """
+        self.conflicts.append((row, phone, reason))
+
+    def __repr__(self) -> str:
+        return f'ImportReport(imported={self.imported}, conflicts={len(self.conflicts)})'
+
+def read_csv(file: TextIO) -> Iterator[dict]:
+    """
+    Lazily reads contacts from a CSV file with a header row.
+
+    Args:
+        file (TextIO): The open file.
+
+    Yields:
+        dict: The name, phone, email and address of each contact. Header names are matched case-insensitively and
+        other columns are ignored.
+    """
+    reader = csv.reader(file)
+    header = [column.strip().lower() for column in next(reader, [])]
+    positions = [(field, header.index(field)) for field in FIELDS if field in header]
+    for row in reader:
+        if row:
+            yield {field: row[position] if position < len(row) else '' for field, position in positions}
+
+def unescape_vcard(value: str) -> str:
+    """
+    Undoes the backslash escaping of a vCard text value.
+
+    Args:
+        value (str): The escaped value.
+
+    Returns:
+        str: The value.
+    """
+    if '\\' not in value:
+        return value
+    # one pass, so an escaped backslash is never read as the start of another escape
+    return re.sub(r'\\(.)', lambda match: '\n' if match.group(1) in 'nN' else match.group(1), value)
+
+def split_vcard(value: str) -> list:
+    """
+    Splits a structured vCard value, such as ADR, at the semicolons that are not escaped.
+
+    Args:
+        value (str): The escaped value.
+
+    Returns:
+        list: The parts, still escaped.
+    """
+    parts = ['']
+    for token in re.findall(r'\\.?|;|[^\\;]+', value):
+        if token == ';':
+            parts.append('')
+        else:
+            parts[-1] += token
+    return parts
+
+def escape_vcard(value: str) -> str:
+    """
+    Escapes a text value for a vCard.
+
+    Args:
+        value (str): The value.
+
+    Returns:
+        str: The escaped value.
+    """
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace(',', '\\,').replace(';', '\\;')
+
+def unfold_lines(file: TextIO) -> Iterator[str]:
+    """
+    Lazily joins the folded lines of a vCard file, where a line starting with a space or tab continues the previous one.
+
+    Args:
+        file (TextIO): The open file.
+
+    Yields:
+        str: The unfolded lines.
+    """
+    current = None
+    for line in file:
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+def read_vcards(file: TextIO) -> Iterator[dict]:
+    """
+    Lazily reads contacts from a vCard 3.0 or 4.0 file.
+
+    Args:
+        file (TextIO): The open file.
+
+    Yields:
+        dict: The name, phone, email and address of each card. The first FN, TEL, EMAIL and ADR of a card are used,
+        with the parts of a structured ADR joined by commas.
+    """
+    card = None
+    for line in unfold_lines(file):
+        name, _, value = line.partition(':')
+        # drop the group prefix (item1.TEL) and the parameters (TEL;TYPE=cell)
+        name = name.split(';', 1)[0].rpartition('.')[2].upper()
+        if name == 'BEGIN' and value.upper() == 'VCARD':
+            card = {}
+        elif name == 'END' and value.upper() == 'VCARD':
+            if card is not None:
+                yield card
+            card = None
+        elif card is not None:
+            if name == 'FN' and 'name' not in card:
+                card['name'] = unescape_vcard(value)
+            elif name == 'TEL' and 'phone' not in card:
+                card['phone'] = value[4:] if value.lower().startswith('tel:') else unescape_vcard(value)
+            elif name == 'EMAIL' and 'email' not in card:
+                card['email'] = unescape_vcard(value)
+            elif name == 'ADR' and 'address' not in card:
+                parts = [unescape_vcard(part).strip() for part in split_vcard(value)]
+                card['address'] = ', '.join(part for part in parts if part)
+
+def read_contacts(path: str) -> Iterator[dict]:
+    """
+    Lazily reads contacts from a CSV (.csv) or vCard (.vcf, .vcard) file.
+
+    Args:
+        path (str): The path of the file.
+
+    Yields:
+        dict: The name, phone, email and address of each contact.
+
+    Raises:
+        ValueError: If the file extension is not supported.
+    """
+    reader = reader_for(path)
+    with open(path, newline='', encoding='utf-8') as file:
+        yield from reader(file)
+
+def reader_for(path: str):
+    """
+    Returns the reader for the format of a file, chosen by its extension.
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        callable: `read_csv` or `read_vcards`.
+
+    Raises:
+        ValueError: If the file extension is not supported.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return read_csv
+    if extension in ('.vcf', '.vcard'):
+        return read_vcards
+    raise ValueError(f'Unsupported file type "{extension}", use .csv or .vcf')
+
+def import_contacts(contact_book, records: Iterable[dict], batch_size: int = 10000) -> ImportReport:
+    """
+    Inserts contacts in batches, one transaction per batch, skipping and reporting rows that cannot be imported.
+
+    Args:
+        contact_book (ContactBook): The contact book to import into.
+        records (Iterable[dict]): The contacts, with name, phone, email and address keys, for example from `read_contacts`.
+        batch_size (int, optional): The number of contacts inserted per transaction. Defaults to 10000.
+
+    Returns:
+        ImportReport: The number of contacts imported and the skipped rows with the reason.
+
+    Records are consumed lazily, so only one batch is in memory, along with the normalized phone numbers imported so
+    far. A record is skipped when its name or phone is missing, or when its phone number, compared after
+    normalization, is already taken by an existing contact or by an earlier record. Existing numbers are looked up
+    through the unique index on `phone_normalized`, a few hundred per query. If another process inserts a conflicting
+    number meanwhile, the batch falls back to inserting row by row in savepoints, so only the conflicting rows are
+    skipped.
+    """
+    report = ImportReport()
+    seen = set()
+    records = enumerate(records, start=1)
+    while True:
+        batch = []
+        read = 0
+        for row, record in islice(records, batch_size):
+            read += 1
+            name = (record.get('name') or '').strip()
+            phone = (record.get('phone') or '').strip()
+            phone_normalized = normalize_phone(phone)
+            if not name:
+                report.conflict(row, phone, 'missing name')
+            elif phone_normalized is None:
+                report.conflict(row, phone, 'missing phone number')
+            elif phone_normalized in seen:
+                report.conflict(row, phone, 'phone number repeated in the import')
+            else:
+                seen.add(phone_normalized)
+                batch.append((row, {
+                    'name': name,
+                    'phone': phone,
+                    'phone_normalized': phone_normalized,
+                    'email': (record.get('email') or '').strip() or None,
+                    'address': (record.get('address') or '').strip() or None,
+                }))
+        if not read:
+            break
+        # a slice of records that were all skipped is not the end of the input
+        if batch:
+            insert_batch(contact_book, batch, report)
+
+    if report.imported and trigram_index.loaded:
+        # the inserted ids are not known here, reload the fuzzy index on its next use
+        trigram_index.loaded = False
+    return report
+
+def insert_batch(contact_book, batch: list, report: ImportReport) -> None:
+    """
+    Inserts one batch of contacts in a transaction, skipping the ones whose phone number is taken.
+
+    Args:
+        contact_book (ContactBook): The contact book to import into.
+        batch (list): (row number, contact values) tuples.
+        report (ImportReport): The report to add the outcome to.
+
+    Returns:
+        None
+
+    For a whole batch, probing the index is cheaper than hashing every number through the phone Bloom filter, so the
+    filter is only updated, and only if it is already loaded.
+    """
+    session = contact_book.session
+    phones = [values['phone_normalized'] for row, values in batch]
+    taken = set()
+    for start in range(0, len(phones), 500):
+        taken.update(session.execute(
+            sqlalchemy.select(ContactModel.phone_normalized).where(ContactModel.phone_normalized.in_(phones[start:start + 500]))
+        ).scalars())
+    rows = []
+    for row, values in batch:
+        if values['phone_normalized'] in taken:
+            report.conflict(row, values['phone'], 'a contact with this phone number already exists')
+        else:
+            rows.append((row, values))
+    if not rows:
+        return
+
+    table = ContactModel.__table__
+    try:
+        contact_book.insert_many([values for row, values in rows])
+        session.commit()
+    except sqlalchemy.exc.IntegrityError:
+        session.rollback()
+        inserted = []
+        for row, values in rows:
+            try:
+                with session.begin_nested():
+                    session.execute(table.insert(), values)
+                inserted.append((row, values))
+            except sqlalchemy.exc.IntegrityError:
+                report.conflict(row, values['phone'], 'a contact with this phone number already exists')
+        session.commit()
+        rows = inserted
+    phone_filter = contact_book_model.phone_filter
+    if phone_filter is not None:
+        for row, values in rows:
+            phone_filter.add(values['phone_normalized'])
+    report.imported += len(rows)
+
+def iter_export_rows(contact_book, batch_size: int = 10000) -> Iterator[dict]:
+    """
+    Streams every contact out of the database in id order.
+
+    Args:
+        contact_book (ContactBook): The contact book to export.
+        batch_size (int, optional): The number of rows fetched at a time. Defaults to 10000.
+
+    Yields:
+        dict: The name, phone, email and address of each contact.
+
+    The query runs on a server-side cursor where the database supports one, so neither the database driver nor
+    Python holds the whole table.
+    """
+    query = sqlalchemy.select(*(getattr(ContactModel, field) for field in FIELDS)).order_by(ContactModel.id)
+    result = contact_book.session.execute(query.execution_options(stream_results=True, yield_per=batch_size))
+    for row in result:
+        yield row._asdict()
+
+def write_csv(rows: Iterable[dict], file: TextIO) -> int:
+    """
+    Writes contacts to a CSV file with a header row.
+
+    Args:
+        rows (Iterable[dict]): The contacts.
+        file (TextIO): The open file.
+
+    Returns:
+        int: The number of contacts written.
+    """
+    writer = csv.writer(file)
+    writer.writerow(FIELDS)
+    count = 0
+    for row in rows:
+        writer.writerow([row[field] or '' for field in FIELDS])
+        count += 1
+    return count
+
+def write_vcards(rows: Iterable[dict], file: TextIO, version: str = '4.0') -> int:
+    """
+    Writes contacts to a vCard file.
+
+    Args:
+        rows (Iterable[dict]): The contacts.
+        file (TextIO): The open file.
+        version (str, optional): The vCard version, "3.0" or "4.0". Defaults to "4.0".
+
+    Returns:
+        int: The number of contacts written.
+
+    The address is written as the street part of ADR, since contacts store it as a single line.
+    """
+    count = 0
+    for row in rows:
+        lines = ['BEGIN:VCARD', f'VERSION:{version}', f'FN:{escape_vcard(row["name"])}']
+        if version == '3.0':
+            lines.append(f'N:{escape_vcard(row["name"])};;;;')
+        lines.append(f'TEL;TYPE=cell:{row["phone"]}' if version == '3.0' else f'TEL;VALUE=uri;TYPE=cell:tel:{row["phone"]}')
+        if row['email']:
+            lines.append(f'EMAIL:{escape_vcard(row["email"])}')
+        if row['address']:
+            lines.append(f'ADR:;;{escape_vcard(row["address"])};;;;')
+        lines.append('END:VCARD')
+        file.write('\r\n'.join(lines) + '\r\n')
+        count += 1
+    return count
+
+def export_contacts(contact_book, path: str, batch_size: int = 10000) -> int:
+    """
+    Streams every contact to a CSV (.csv) or vCard (.vcf, .vcard) file.
+
+    Args:
+        contact_book (ContactBook): The contact book to export.
+        path (str): The path of the file, its extension chooses the format.
+        batch_size (int, optional): The number of rows fetched at a time. Defaults to 10000.
+
+    Returns:
+        int: The number of contacts written.
+
+    Raises:
+        ValueError: If the file extension is not supported.
+    """
+    writer = write_csv if reader_for(path) is read_csv else write_vcards
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        return writer(iter_export_rows(contact_book, batch_size), file)
@@ -0,0 +1,37 @@
+import sys
+import os
+import pytest
+
+# the modules of this project are imported by their plain names, as app.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import contact_book_model
+from contact_book_model import ContactBook, get_engine, get_contact_cache
+from trigramindex import TrigramIndex
+
+@pytest.fixture
+def database(request, tmp_path, monkeypatch):
+    """
+    A fresh SQLite database with the contact cache on, writing every edit immediately unless the test is
+    parametrized with a write delay in seconds, such as `@pytest.mark.parametrize('database', ['60'], indirect=True)`.
+    """
+    write_delay = getattr(request, 'param', None)
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{tmp_path / "contacts.db"}')
+    monkeypatch.setenv('CONTACT_CACHE_SIZE', '100')
+    if write_delay is None:
+        monkeypatch.delenv('CONTACT_CACHE_WRITE_DELAY', raising=False)
+    else:
+        monkeypatch.setenv('CONTACT_CACHE_WRITE_DELAY', write_delay)
+    # the process-wide indexes belong to the database they were loaded from
+    monkeypatch.setattr(contact_book_model, 'phone_filter', None)
+    monkeypatch.setattr(contact_book_model, 'trigram_index', TrigramIndex())
+    get_engine.cache_clear()
+    get_contact_cache.cache_clear()
+    yield
+    cache = get_contact_cache()
+    if cache is not None and cache.pending:
+        with ContactBook() as contact_book:
+            contact_book.write_pending()
+    get_engine().dispose()
+    get_engine.cache_clear()
+    get_contact_cache.cache_clear()
@@ -0,0 +1,15 @@
+from contact_book_model import ContactBook
+import app
+import pytest
+
+@pytest.mark.parametrize('database', [None, '60'], ids=['write-through', 'write-behind'], indirect=True)
+def test_edit_contact_prints_new_values(database, monkeypatch, capsys):
+    with ContactBook() as contact_book:
+        contact_id = contact_book.add_contact('Ann', '555-0100', 'ann@example.com', 'Main Street').id
+    answers = iter([str(contact_id), 'Ann2', '', '', ''])
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(answers))
+    app.edit_contact()
+    updated = capsys.readouterr().out.splitlines()[-1]
+    assert updated.startswith('Updated contact:')
+    assert "'name': 'Ann2'" in updated
+    assert "'phone': '555-0100'" in updated
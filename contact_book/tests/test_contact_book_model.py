@@ -0,0 +1,69 @@
+from contact_book_model import ContactBook, ContactModel, get_contact_cache
+import pytest
+
+write_behind = pytest.mark.parametrize('database', ['60'], indirect=True)
+
+@write_behind
+def test_edit_staged_by_another_session_is_seen(database):
+    with ContactBook() as setup:
+        contact_id = setup.add_contact('Old', '555-0100').id
+    with ContactBook() as a, ContactBook() as b:
+        # the session keeps the contacts of a page only while they are referenced
+        page = a.get_contacts_page()
+        assert [contact.name for contact in page] == ['Old']
+        b.update_contact(contact_id, 'New', 'new@example.com', '555-0100')
+        assert b.get_contact(contact_id).name == 'New'
+        contact = a.get_contact(contact_id)
+        assert contact is page[0] and (contact.name, contact.email) == ('New', 'new@example.com')
+        assert not a.session.is_modified(contact)
+    with ContactBook() as c:
+        c.session.expire_all()
+        assert c.get_contacts_page()[0].name == 'New'
+
+@write_behind
+def test_edits_are_written_together(database):
+    with ContactBook() as contact_book:
+        ids = [contact_book.add_contact(f'Name {index}', f'555-010{index}').id for index in range(3)]
+        for contact_id in ids:
+            contact_book.update_contact(contact_id, 'Edited', None, f'555-020{contact_id}')
+        assert len(get_contact_cache().pending) == 3
+        assert {contact.name for contact in contact_book.get_contacts_page()} == {'Name 0', 'Name 1', 'Name 2'}
+        contact_book.write_pending()
+        contact_book.session.expire_all()
+        assert {contact.name for contact in contact_book.get_contacts_page()} == {'Edited'}
+        assert contact_book.get_contact_by_phone('5550201').id == ids[0]
+
+@write_behind
+def test_pending_edits_reserve_their_phone(database):
+    with ContactBook() as contact_book:
+        first = contact_book.add_contact('First', '555-0100').id
+        second = contact_book.add_contact('Second', '555-0101').id
+        contact_book.update_contact(first, 'First', None, '555-0199')
+        with pytest.raises(ValueError):
+            contact_book.update_contact(second, 'Second', None, '555 0199')
+
+@write_behind
+def test_conflicting_edit_is_dropped_and_others_written(database):
+    with ContactBook() as contact_book:
+        first = contact_book.add_contact('First', '555-0100').id
+        second = contact_book.add_contact('Second', '555-0101').id
+        contact_book.update_contact(first, 'First edited', None, '555-0100')
+        contact_book.update_contact(second, 'Second edited', None, '555-0150')
+        # another process takes the number of the second edit before it is written
+        with ContactBook().session as other:
+            other.execute(ContactModel.__table__.insert(), [{'name': 'Other', 'phone': '555-0150', 'phone_normalized': '5550150'}])
+            other.commit()
+        with pytest.raises(ValueError, match='Second edited'):
+            contact_book.write_pending()
+        contact_book.session.expire_all()
+        assert contact_book.get_contact(first).name == 'First edited'
+        assert contact_book.get_contact(second).name == 'Second'
+
+@write_behind
+def test_delete_discards_the_pending_edit(database):
+    with ContactBook() as contact_book:
+        contact_id = contact_book.add_contact('Ann', '555-0100').id
+        contact_book.update_contact(contact_id, 'Ann2', None, '555-0100')
+        contact_book.delete_contact(contact_id)
+        assert get_contact_cache().pending == {}
+        assert contact_book.get_contact(contact_id) is None
@@ -0,0 +1,81 @@
+from contactcache import ContactCache
+import pytest
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def contact(contact_id: int, phone: str = None, name: str = 'Ann') -> dict:
+    return {'id': contact_id, 'name': name, 'phone': phone, 'phone_normalized': phone, 'email': None, 'address': None}
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+def test_least_recently_used_is_evicted(clock):
+    cache = ContactCache(max_size=2, clock=clock)
+    cache.put(contact(1, '1'))
+    cache.put(contact(2, '2'))
+    assert cache.get(1)['id'] == 1
+    cache.put(contact(3, '3'))
+    assert cache.get(2) is None and cache.get_by_phone('2') is None
+    assert cache.get(1)['id'] == 1 and cache.get(3)['id'] == 3
+    assert cache.stats() == {'hits': 3, 'misses': 2, 'evictions': 1, 'size': 2, 'pending': 0}
+
+def test_entries_expire_after_ttl(clock):
+    cache = ContactCache(ttl=10, clock=clock)
+    cache.put(contact(1, '1'))
+    clock.now = 10
+    assert cache.get(1) is not None
+    clock.now = 10.5
+    assert cache.get(1) is None
+    assert len(cache) == 0 and cache.get_by_phone('1') is None
+
+def test_phone_key_follows_the_contact(clock):
+    cache = ContactCache(clock=clock)
+    cache.put(contact(1, '111'))
+    assert cache.get_by_phone('111')['id'] == 1
+    cache.put(contact(1, '222'))
+    assert cache.get_by_phone('111') is None and cache.get_by_phone('222')['id'] == 1
+    # another contact took the number, dropping the first must keep its key
+    cache.put(contact(2, '222'))
+    cache.invalidate(1)
+    assert cache.get_by_phone('222')['id'] == 2
+    cache.put(contact(3))
+    assert cache.get(3)['phone_normalized'] is None
+
+def test_staged_edits_are_read_until_taken(clock):
+    cache = ContactCache(write_delay=5, write_batch=3, clock=clock)
+    cache.put(contact(1, '111'))
+    assert not cache.write_due() and cache.time_to_write() is None
+    cache.stage(contact(1, '222', 'Ann2'))
+    clock.now = 2
+    cache.stage(contact(1, '333', 'Ann3'))
+    assert cache.get(1)['name'] == 'Ann3' and cache.get_by_phone('333')['id'] == 1
+    assert cache.get_by_phone('111') is None and cache.get_by_phone('222') is None
+    assert cache.time_to_write() == 3 and not cache.write_due()
+    cache.clear()
+    assert cache.get_by_phone('333')['name'] == 'Ann3'
+    clock.now = 5
+    assert cache.write_due()
+    assert cache.take_pending() == [contact(1, '333', 'Ann3')]
+    assert cache.pending == {} and cache.get(1)['name'] == 'Ann3'
+    assert not cache.write_due()
+
+def test_write_batch_makes_edits_due(clock):
+    cache = ContactCache(write_delay=60, write_batch=2, clock=clock)
+    cache.stage(contact(1, '1'))
+    assert not cache.write_due()
+    cache.stage(contact(2, '2'))
+    assert cache.write_due()
+    assert [values['id'] for values in cache.take_pending()] == [1, 2]
+
+def test_discard_drops_the_pending_edit(clock):
+    cache = ContactCache(write_delay=60, clock=clock)
+    cache.put(contact(1, '1'))
+    cache.stage(contact(1, '2'))
+    cache.discard(1)
+    assert cache.get(1) is None and cache.get_by_phone('2') is None and cache.take_pending() == []
@@ -0,0 +1,96 @@
+from contact_book_model import ContactBook, ContactModel
+from importexport import read_contacts, read_vcards, import_contacts, export_contacts, write_vcards
+import io
+import pytest
+
+CONTACTS = [
+    {'name': 'Ann', 'phone': '+1 555-0100', 'email': 'ann@example.com', 'address': 'Flat 2; 10 Main St, Springfield'},
+    {'name': 'Bob, Jr.', 'phone': '555-0101', 'email': None, 'address': 'C:\\new\\ ; back\\slash;'},
+    {'name': 'Cid "Cy"', 'phone': '555-0102', 'email': 'cid@example.com', 'address': 'Line one\nLine two'},
+    {'name': 'Dee', 'phone': '555-0103', 'email': None, 'address': None},
+]
+
+def contact_values(contact_book) -> list:
+    return [{field: getattr(contact, field) for field in ('name', 'phone', 'email', 'address')}
+            for contact in contact_book.get_all_contacts()]
+
+@pytest.mark.parametrize('extension', ['csv', 'vcf'])
+def test_round_trip(database, tmp_path, extension):
+    path = str(tmp_path / f'contacts.{extension}')
+    with ContactBook() as contact_book:
+        for contact in CONTACTS:
+            contact_book.add_contact(**contact)
+        assert export_contacts(contact_book, path, batch_size=3) == len(CONTACTS)
+        for contact_id in [contact.id for contact in contact_book.get_all_contacts()]:
+            contact_book.delete_contact(contact_id)
+        report = import_contacts(contact_book, read_contacts(path), batch_size=3)
+        assert (report.imported, report.conflicts) == (len(CONTACTS), [])
+        assert contact_values(contact_book) == CONTACTS
+
+def test_vcard_3_round_trip(database):
+    file = io.StringIO()
+    assert write_vcards(CONTACTS, file, version='3.0') == len(CONTACTS)
+    file.seek(0)
+    assert list(read_vcards(file)) == [{field: value for field, value in contact.items() if value is not None} for contact in CONTACTS]
+
+def test_read_vcards_unfolds_lines_and_reads_structured_addresses():
+    file = io.StringIO(
+        'BEGIN:VCARD\r\nVERSION:3.0\r\nFN:Ann\r\n  Smith\r\nitem1.TEL;TYPE=cell:555-0100\r\nTEL:555-0199\r\n'
+        'ADR;TYPE=home:;Apt 1;12 Elm St\\, Suite 3;Town;;12345;\r\nEND:VCARD\r\n'
+        'BEGIN:VCARD\r\nVERSION:4.0\r\nTEL;VALUE=uri:tel:555-0101\r\nEND:VCARD\r\n'
+    )
+    assert list(read_vcards(file)) == [
+        {'name': 'Ann Smith', 'phone': '555-0100', 'address': 'Apt 1, 12 Elm St, Suite 3, Town, 12345'},
+        {'phone': '555-0101'},
+    ]
+
+def test_import_skips_and_reports_rows(database, tmp_path):
+    path = tmp_path / 'contacts.csv'
+    path.write_text(
+        'Phone,NAME,Notes,email\n'
+        '555-0100,Ann,,ann@example.com\n'
+        '555-0101,,no name,\n'
+        '5550100,Ann again,repeated in the file,\n'
+        ',No phone,,\n'
+        '(555) 0199,Taken,,\n'
+        '\n'
+        '555-0102,Bob\n',
+        encoding='utf-8',
+    )
+    with ContactBook() as contact_book:
+        contact_book.add_contact('Existing', '555-0199')
+        report = import_contacts(contact_book, read_contacts(str(path)), batch_size=2)
+        assert report.imported == 2
+        assert report.conflicts == [
+            (2, '555-0101', 'missing name'),
+            (3, '5550100', 'phone number repeated in the import'),
+            (4, '', 'missing phone number'),
+            (5, '(555) 0199', 'a contact with this phone number already exists'),
+        ]
+        assert [(contact['name'], contact['email']) for contact in contact_values(contact_book)] == [
+            ('Existing', None), ('Ann', 'ann@example.com'), ('Bob', None)]
+
+def test_batch_falls_back_to_rows_when_a_number_is_taken_meanwhile(database, monkeypatch):
+    records = [{'name': f'Name {index}', 'phone': f'555-010{index}'} for index in range(4)]
+    with ContactBook() as contact_book:
+        insert_many = contact_book.insert_many
+
+        def racing_insert_many(rows):
+            # another process takes a number of the batch after it was checked
+            with ContactBook().session as other:
+                other.execute(ContactModel.__table__.insert(), [{'name': 'Other', 'phone': '555 0102', 'phone_normalized': '5550102'}])
+                other.commit()
+            monkeypatch.setattr(contact_book, 'insert_many', insert_many)
+            insert_many(rows)
+
+        monkeypatch.setattr(contact_book, 'insert_many', racing_insert_many)
+        report = import_contacts(contact_book, records)
+        assert report.imported == 3
+        assert report.conflicts == [(3, '555-0102', 'a contact with this phone number already exists')]
+        assert [contact['name'] for contact in contact_values(contact_book)] == ['Other', 'Name 0', 'Name 1', 'Name 3']
+
+def test_unsupported_extension(database, tmp_path):
+    with pytest.raises(ValueError):
+        list(read_contacts(str(tmp_path / 'contacts.txt')))
+    with ContactBook() as contact_book, pytest.raises(ValueError):
+        export_contacts(contact_book, str(tmp_path / 'contacts.txt'))
@@ -0,0 +1,97 @@
+from contact_book_model import ContactBook, ContactModel, normalize_phone, get_engine
+import sqlalchemy
+import sqlite3
+import pytest
+
+@pytest.mark.parametrize('phone, normalized', [
+    ('+1 555-0100', '15550100'),
+    ('001 555 0100', '15550100'),
+    ('15550100', '15550100'),
+    ('  (555) 010-0  ', '5550100'),
+    ('0044 20 7946', '44207946'),
+    ('0 20 7946', '0207946'),
+    ('00', None),
+    ('ext.', None),
+    ('', None),
+    (None, None),
+])
+def test_normalize_phone(phone, normalized):
+    assert normalize_phone(phone) == normalized
+
+def test_add_rejects_a_number_taken_in_another_format(database):
+    with ContactBook() as contact_book:
+        contact_book.add_contact('Ann', '+1 555-0100')
+        assert contact_book.phone_in_use('001 555 0100')
+        assert not contact_book.phone_in_use('555-0199')
+        with pytest.raises(ValueError):
+            contact_book.add_contact('Bob', '1 (555) 0100')
+        assert contact_book.count_contacts() == 1
+
+def test_add_rejects_a_number_the_filter_has_not_seen(database):
+    with ContactBook() as contact_book:
+        contact_book.add_contact('Ann', '555-0100')
+        # another process adds a number, which the filter of this process does not know about
+        with ContactBook().session as other:
+            other.execute(ContactModel.__table__.insert(), [{'name': 'Other', 'phone': '555-0150', 'phone_normalized': '5550150'}])
+            other.commit()
+        with pytest.raises(ValueError):
+            contact_book.add_contact('Bob', '555 0150')
+        assert contact_book.add_contact('Bob', '555-0151').phone_normalized == '5550151'
+
+@pytest.mark.parametrize('database', [None, '60'], ids=['write-through', 'write-behind'], indirect=True)
+def test_update_rejects_a_number_of_another_contact(database):
+    with ContactBook() as contact_book:
+        ann = contact_book.add_contact('Ann', '555-0100').id
+        bob = contact_book.add_contact('Bob', '555-0101').id
+        with pytest.raises(ValueError):
+            contact_book.update_contact(bob, 'Bob', None, '(555) 0100')
+        # a contact keeps its own number in another format
+        contact_book.update_contact(ann, 'Ann', None, '555 0100')
+        contact_book.write_pending()
+        contact_book.session.expire_all()
+        assert contact_book.get_contact(ann).phone == '555 0100'
+        assert contact_book.get_contact(bob).phone == '555-0101'
+
+def create_legacy_table(filename: str, rows: list) -> None:
+    # the contacts table as it was before phone numbers were normalized
+    with sqlite3.connect(filename) as connection:
+        connection.execute('CREATE TABLE contacts (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, '
+                           'phone VARCHAR NOT NULL UNIQUE, email VARCHAR, address VARCHAR)')
+        connection.executemany('INSERT INTO contacts (name, phone, email, address) VALUES (?, ?, ?, ?)', rows)
+    connection.close()
+
+def phone_index_exists() -> bool:
+    with get_engine().connect() as connection:
+        return connection.execute(sqlalchemy.text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'ix_contacts_phone_normalized'")).first() is not None
+
+def test_add_phone_normalized_column(database, tmp_path):
+    create_legacy_table(str(tmp_path / 'contacts.db'), [('Ann', '+1 555-0100', None, None), ('Bob', '555-0101', None, None)])
+    assert phone_index_exists()
+    with ContactBook() as contact_book:
+        assert [(contact.name, contact.phone_normalized) for contact in contact_book.get_contacts_page()] == [
+            ('Ann', '15550100'), ('Bob', '5550101')]
+        with pytest.raises(ValueError):
+            contact_book.add_contact('Cid', '001 555 0100')
+
+def test_merge_duplicate_phones(database, tmp_path):
+    create_legacy_table(str(tmp_path / 'contacts.db'), [
+        ('Ann', '555-0100', None, None),
+        ('Ann again', '555 0100', 'ann@example.com', None),
+        ('Bob', '555-0101', 'bob@example.com', None),
+        ('Ann once more', '(555) 0100', 'ann2@example.com', '1 Main St'),
+        ('Bob again', '5550101', 'bob2@example.com', '2 Side St'),
+        ('Cid', '555-0102', None, None),
+    ])
+    # the duplicates keep the unique index from being created
+    assert not phone_index_exists()
+    with ContactBook() as contact_book:
+        assert contact_book.merge_duplicate_phones(batch_size=2) == 3
+        contacts = contact_book.get_contacts_page()
+        assert [(contact.name, contact.email, contact.address) for contact in contacts] == [
+            ('Ann', 'ann2@example.com', '1 Main St'),
+            ('Bob', 'bob@example.com', '2 Side St'),
+            ('Cid', None, None),
+        ]
+        assert phone_index_exists()
+        assert contact_book.merge_duplicate_phones() == 0
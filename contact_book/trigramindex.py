@@ -0,0 +1,257 @@
+from array import array
+from collections import Counter
+from functools import lru_cache
+from itertools import islice
+import heapq
+import math
+import re
+
+WORD = re.compile(r'\w+')
+
+@lru_cache(maxsize=65536)
+def word_grams(word: str) -> frozenset:
+    """
+    Returns the trigrams of a lowercase word.
+
+    The word is padded with two spaces in front and one behind, like PostgreSQL's pg_trgm, so the start of a word
+    weighs more than its end and single-letter typos still leave most trigrams intact. Names repeat a lot, so the
+    trigrams of recent words are cached.
+
+    Args:
+        word (str): The word.
+
+    Returns:
+        frozenset: The trigrams.
+    """
+    padded = f'  {word} '
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+def trigrams(text: str) -> frozenset:
+    """
+    Returns the trigrams of the words of a text, ignoring case.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        frozenset: The trigrams.
+    """
+    return frozenset().union(*map(word_grams, WORD.findall((text or '').lower())))
+
+def word_trigrams(text: str) -> list:
+    """
+    Returns the trigram sets of a whole text and of each of its words, when it has more than one.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        list: The trigram sets, the whole text first.
+    """
+    parts = list(map(word_grams, WORD.findall((text or '').lower())))
+    if len(parts) > 1:
+        parts.insert(0, frozenset().union(*parts))
+    return parts
+
+class TrigramIndex:
+    def __init__(self, threshold: float = 0.3, read_budget: int = 20000, score_budget: int = 20):
+        """
+        Initializes an empty in-memory trigram index over contact names and emails, for fuzzy lookup.
+
+        Every trigram of a contact's name and of the local part of its email has a posting list of the ids of the
+        contacts containing it, and the name and email themselves are kept to score candidates. Removed and updated
+        contacts leave stale ids in the posting lists, which searches skip and `compact` drops once they outweigh the
+        live ones.
+
+        Args:
+            threshold (float): The minimum similarity of a match.
+            read_budget (int): The number of posting list entries after which a search stops reading more lists.
+            score_budget (int): The number of candidates a search scores.
+
+        Returns:
+            None
+        """
+        self.threshold = threshold
+        self.read_budget = read_budget
+        self.score_budget = score_budget
+        self.entries = {}
+        self.postings = {}
+        self.live = 0
+        self.stale = 0
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def load(self, contact_book, page_size: int = 10000) -> None:
+        """
+        Indexes every contact of a contact book, replacing the current contents.
+
+        Args:
+            contact_book (ContactBook): The contact book to read the contacts from.
+            page_size (int): The number of contacts read from the database at a time.
+
+        Returns:
+            None
+        """
+        self.entries = {}
+        self.postings = {}
+        self.live = self.stale = 0
+        for contact_id, name, email in contact_book.iter_contact_names(page_size):
+            self.add(contact_id, name, email)
+        self.loaded = True
+
+    def add(self, contact_id: int, name: str, email: str = None) -> None:
+        """
+        Indexes a contact.
+
+        Args:
+            contact_id (int): The id of the contact.
+            name (str): The name of the contact.
+            email (str): The email of the contact, only the part before the @ is indexed.
+
+        Returns:
+            None
+        """
+        if contact_id in self.entries:
+            self.remove(contact_id)
+        entry = (name or '', (email or '').partition('@')[0])
+        self.entries[contact_id] = entry
+        self.post(contact_id, entry)
+
+    def post(self, contact_id: int, entry: tuple) -> None:
+        """
+        Appends a contact id to the posting list of every trigram of its name and email.
+
+        Args:
+            contact_id (int): The id of the contact.
+            entry (tuple): The name and the local part of the email of the contact.
+
+        Returns:
+            None
+        """
+        grams = trigrams(entry[0]) | trigrams(entry[1])
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = array('I')
+            posting.append(contact_id)
+        self.live += len(grams)
+
+    def update(self, contact_id: int, name: str, email: str = None) -> None:
+        """
+        Re-indexes a contact whose name or email changed.
+
+        Args:
+            contact_id (int): The id of the contact.
+            name (str): The new name of the contact.
+            email (str): The new email of the contact.
+
+        Returns:
+            None
+        """
+        self.add(contact_id, name, email)
+
+    def remove(self, contact_id: int) -> None:
+        """
+        Removes a contact from the index.
+
+        Args:
+            contact_id (int): The id of the contact.
+
+        Returns:
+            None
+        """
+        entry = self.entries.pop(contact_id, None)
+        if entry is None:
+            return
+        count = len(trigrams(entry[0]) | trigrams(entry[1]))
+        self.live -= count
+        self.stale += count
+        if self.stale > self.live:
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Rebuilds the posting lists without the ids of removed contacts and outdated trigrams.
+
+        Returns:
+            None
+        """
+        self.postings = {}
+        self.live = self.stale = 0
+        for contact_id, entry in self.entries.items():
+            self.post(contact_id, entry)
+
+    def score(self, query_grams: frozenset, entry: tuple) -> float:
+        """
+        Returns the similarity of a query to the best matching of a contact's name, the words of its name and its email.
+
+        Scoring single words too lets a misspelled first or last name match a full name.
+
+        Args:
+            query_grams (frozenset): The trigrams of the query.
+            entry (tuple): The name and the local part of the email of the contact.
+
+        Returns:
+            float: The similarity, from 0 to 1.
+        """
+        best = 0.0
+        for text in entry:
+            for grams in word_trigrams(text):
+                shared = len(query_grams & grams)
+                if shared:
+                    best = max(best, shared / (len(query_grams) + len(grams) - shared))
+        return best
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """
+        Returns the contacts whose name or email is most similar to a query.
+
+        A contact whose similarity reaches the threshold shares at least `threshold * len(query trigrams)` trigrams
+        with the query, so it appears in one of the rarest `len(query trigrams) - that + 1` posting lists. Those lists
+        are read rarest first, and how often each contact occurs in them is counted. Reading stops early once
+        `read_budget` ids have been counted: common trigrams say little about which contact is meant, like stop words.
+        The `score_budget` contacts with the highest counts are then scored exactly.
+
+        The budgets bound the work per search regardless of the number of contacts, at the cost of occasionally
+        missing a match that only shares common trigrams with the query.
+
+        Args:
+            query (str): The possibly misspelled name or email.
+            limit (int): The maximum number of matches to return.
+
+        Returns:
+            list: (contact id, similarity) tuples, most similar first.
+        """
+        query_grams = trigrams(query)
+        if not query_grams or limit <= 0:
+            return []
+        lists = sorted((self.postings.get(gram, ()) for gram in query_grams), key=len)
+        counts = Counter()
+        read = 0
+        for posting in lists[:len(lists) - math.ceil(self.threshold * len(lists)) + 1]:
+            if read >= self.read_budget:
+                break
+            counts.update(posting)
+            read += len(posting)
+
+        # counts are small, so find the lowest count that still keeps score_budget candidates from their histogram
+        budget = max(self.score_budget, limit)
+        cutoff = 0
+        above = 0
+        for count, number in sorted(Counter(counts.values()).items(), reverse=True):
+            cutoff = count
+            if above + number >= budget:
+                break
+            above += number
+        candidates = [contact_id for contact_id, count in counts.items() if count > cutoff]
+        candidates += islice((contact_id for contact_id, count in counts.items() if count == cutoff), budget - above)
+        matches = []
+        for contact_id in candidates:
+            entry = self.entries.get(contact_id)
+            if entry is not None:
+                score = self.score(query_grams, entry)
+                if score >= self.threshold:
+                    matches.append((score, contact_id))
+        return [(contact_id, score) for score, contact_id in heapq.nlargest(limit, matches)]
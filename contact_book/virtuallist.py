@@ -0,0 +1,356 @@
+import customtkinter as ctk
+from collections import OrderedDict
+import math
+
+class VirtualContactList(ctk.CTkFrame):
+    def __init__(self, master, worker, on_view, on_count=None, row_height: int = 36, overscan: int = 3, block_size: int = 100, cached_blocks: int = 20):
+        """
+        Initializes a virtualized, scrollable list of contacts sorted by name.
+
+        Only the rows in the visible viewport plus `overscan` rows above and below are created. When the list
+        scrolls, the same row widgets are moved and relabelled instead of creating new ones, and the contacts are
+        fetched from the `ContactBook` in blocks of `block_size` rows as they come into view. The fetches run on the
+        `DatabaseWorker` thread, and rows show a loading placeholder until their block arrives.
+
+        Parameters:
+            master: The parent widget.
+            worker (DatabaseWorker): The worker that runs the database queries.
+            on_view (callable): Called with a contact when its "View" button is pressed.
+            on_count (callable): Called with the number of contacts whenever they have been counted.
+            row_height (int): The height of a row in pixels.
+            overscan (int): The number of extra rows rendered above and below the viewport.
+            block_size (int): The number of contacts fetched per query.
+            cached_blocks (int): The number of fetched blocks kept in memory.
+
+        Returns:
+            None
+        """
+        super().__init__(master)
+        self.worker = worker
+        self.on_view = on_view
+        self.on_count = on_count
+        self.row_height = row_height
+        self.overscan = overscan
+        self.block_size = block_size
+        self.cached_blocks = cached_blocks
+        self.blocks = OrderedDict()
+        # id -> (block number, name) of every cached contact, the model of what the list can display
+        self.cached_ids = {}
+        # block numbers being fetched by the worker
+        self.pending_blocks = set()
+        self.rows = []
+        self.total = 0
+        self.top = 0
+
+        self.scrollbar = ctk.CTkScrollbar(self, orientation="vertical", command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.pack(side="left", fill="both", expand=True)
+        self.body.bind("<Configure>", lambda e: self.render())
+        self.bind_wheel(self.body)
+
+        self.refresh()
+
+    def bind_wheel(self, widget) -> None:
+        """
+        Scrolls the list with the mouse wheel while the pointer is over the given widget.
+
+        Parameters:
+            widget: The widget to bind.
+
+        Returns:
+            None
+        """
+        widget.bind("<MouseWheel>", lambda e: self.scroll_by(-e.delta // 120 * 3 if abs(e.delta) >= 120 else -e.delta))
+        widget.bind("<Button-4>", lambda e: self.scroll_by(-3))
+        widget.bind("<Button-5>", lambda e: self.scroll_by(3))
+
+    def refresh(self) -> None:
+        """
+        Drops the cached contacts, recounts them and redraws the rows whose contact changed.
+
+        The count runs on the worker thread, a newer refresh supersedes one that is still running.
+
+        Returns:
+            None
+        """
+        self.drop_blocks()
+        self.worker.submit(lambda contact_book: contact_book.count_contacts(), on_done=self.count_loaded, key=(id(self), "count"))
+
+    def count_loaded(self, total: int) -> None:
+        """
+        Shows the contacts once they have been counted.
+
+        Parameters:
+            total (int): The number of contacts.
+
+        Returns:
+            None
+        """
+        self.total = total
+        self.scroll_to(self.top)
+        if self.on_count:
+            self.on_count(total)
+
+    def drop_blocks(self, first_block: int = 0) -> None:
+        """
+        Drops the cached blocks from a block number onwards, so they are fetched again when they come into view.
+        Fetches of those blocks that are still running are cancelled, since they may return outdated contacts.
+
+        Parameters:
+            first_block (int): The first block number to drop.
+
+        Returns:
+            None
+        """
+        for block_number in [number for number in self.blocks if number >= first_block]:
+            for contact in self.blocks.pop(block_number):
+                self.cached_ids.pop(contact.id, None)
+        for block_number in [number for number in self.pending_blocks if number >= first_block]:
+            self.cancel_block(block_number)
+
+    def contact_inserted(self, contact) -> None:
+        """
+        Shows a newly added contact.
+
+        Its position in the sorted list is only known to the database, so the cached blocks are dropped and only the
+        visible block is fetched again. Rows that still show the same contact are not touched.
+
+        Parameters:
+            contact (ContactModel): The new contact.
+
+        Returns:
+            None
+        """
+        self.total += 1
+        self.drop_blocks()
+        self.render()
+
+    def contact_updated(self, contact) -> None:
+        """
+        Shows the new details of an updated contact.
+
+        If the name did not change, the contact keeps its position and only the row showing it is relabelled.
+        Otherwise it moves like a removal followed by an insertion.
+
+        Parameters:
+            contact (ContactModel): The updated contact.
+
+        Returns:
+            None
+        """
+        cached = self.cached_ids.get(contact.id)
+        if cached is None:
+            return
+        block_number, name = cached
+        if contact.name != name:
+            self.drop_blocks()
+        else:
+            block = self.blocks[block_number]
+            block[[cached_contact.id for cached_contact in block].index(contact.id)] = contact
+        self.render()
+
+    def contact_removed(self, contact_id: int) -> None:
+        """
+        Removes a deleted contact from the list.
+
+        Blocks before the contact keep their positions, the block holding it and the ones after it shift up by one
+        and are dropped.
+
+        Parameters:
+            contact_id (int): The id of the deleted contact.
+
+        Returns:
+            None
+        """
+        self.total -= 1
+        cached = self.cached_ids.get(contact_id)
+        self.drop_blocks(cached[0] if cached is not None else 0)
+        self.scroll_to(self.top)
+
+    def contact_at(self, index: int):
+        """
+        Returns the contact at a position of the sorted list, starting to fetch its block if it is not cached.
+
+        Parameters:
+            index (int): The position of the contact.
+
+        Returns:
+            ContactModel: The contact, or None if its block is still being fetched or the position is past the end of the list.
+        """
+        block_number, offset = divmod(index, self.block_size)
+        block = self.blocks.get(block_number)
+        if block is None:
+            self.fetch_block(block_number)
+            return None
+        self.blocks.move_to_end(block_number)
+        return block[offset] if offset < len(block) else None
+
+    def fetch_block(self, block_number: int) -> None:
+        """
+        Starts fetching a block of contacts on the worker thread, unless it is already being fetched.
+
+        A block that directly follows a cached block is fetched with keyset pagination from that block's last
+        contact, other blocks (after jumping with the scrollbar) are fetched by offset.
+
+        Parameters:
+            block_number (int): The block number.
+
+        Returns:
+            None
+        """
+        if block_number in self.pending_blocks:
+            return
+        self.pending_blocks.add(block_number)
+        previous = self.blocks.get(block_number - 1)
+        if previous is not None and len(previous) == self.block_size:
+            after = previous[-1]
+            task = lambda contact_book: contact_book.get_contacts_by_name(self.block_size, after=after)
+        else:
+            offset = block_number * self.block_size
+            task = lambda contact_book: contact_book.get_contacts_by_name(self.block_size, offset=offset)
+        self.worker.submit(task, on_done=lambda block: self.block_loaded(block_number, block), key=(id(self), block_number))
+
+    def cancel_block(self, block_number: int) -> None:
+        """
+        Cancels the fetch of a block, so its result is ignored.
+
+        Parameters:
+            block_number (int): The block number.
+
+        Returns:
+            None
+        """
+        self.pending_blocks.discard(block_number)
+        self.worker.cancel((id(self), block_number))
+
+    def block_loaded(self, block_number: int, block: list) -> None:
+        """
+        Caches a fetched block and shows its contacts.
+
+        Parameters:
+            block_number (int): The block number.
+            block (list): The contacts of the block.
+
+        Returns:
+            None
+        """
+        self.pending_blocks.discard(block_number)
+        self.blocks[block_number] = block
+        for contact in block:
+            self.cached_ids[contact.id] = (block_number, contact.name)
+        while len(self.blocks) > self.cached_blocks:
+            for contact in self.blocks.popitem(last=False)[1]:
+                self.cached_ids.pop(contact.id, None)
+        self.render()
+
+    def viewport_height(self) -> float:
+        """
+        Returns the height of the viewport in unscaled pixels, the unit of `row_height` and `place`.
+
+        Returns:
+            float: The viewport height.
+        """
+        return max(self.body.winfo_height(), 1) / ctk.ScalingTracker.get_widget_scaling(self)
+
+    def scroll_to(self, top: int) -> None:
+        """
+        Scrolls the list so the given pixel offset is at the top of the viewport.
+
+        Parameters:
+            top (int): The pixel offset into the full list.
+
+        Returns:
+            None
+        """
+        height = self.viewport_height()
+        self.top = max(0, min(int(top), int(self.total * self.row_height - height)))
+        self.render()
+
+    def scroll_by(self, rows: int) -> None:
+        """
+        Scrolls the list by a number of rows.
+
+        Parameters:
+            rows (int): The number of rows to scroll, negative to scroll up.
+
+        Returns:
+            None
+        """
+        self.scroll_to(self.top + rows * self.row_height)
+
+    def on_scrollbar(self, action: str, amount, unit: str = None) -> None:
+        """
+        Handles the scrollbar's `moveto` and `scroll` commands.
+
+        Returns:
+            None
+        """
+        if action == "moveto":
+            self.scroll_to(float(amount) * self.total * self.row_height)
+        elif unit == "pages":
+            self.scroll_by(int(amount) * max(1, int(self.viewport_height() // self.row_height)))
+        else:
+            self.scroll_by(int(amount))
+
+    def make_row(self):
+        """
+        Creates one reusable row widget with a label and a "View" button.
+
+        Returns:
+            ctk.CTkFrame: The row.
+        """
+        row = ctk.CTkFrame(self.body, height=self.row_height - 2)
+        row.pack_propagate(False)
+        row.label = ctk.CTkLabel(row, text="", anchor="w")
+        row.label.pack(side="left", padx=5, fill="x", expand=True)
+        row.button = ctk.CTkButton(row, text="View", width=60)
+        row.button.pack(side="right", padx=5)
+        row.contact_key = None
+        for widget in (row, row.label):
+            self.bind_wheel(widget)
+        return row
+
+    def render(self) -> None:
+        """
+        Positions and labels the pooled rows for the current scroll offset.
+
+        The pool grows to fit the viewport plus overscan, and rows that already show the right contact are not relabelled.
+        Fetches of blocks that were scrolled out of view before they arrived are cancelled.
+
+        Returns:
+            None
+        """
+        height = self.viewport_height()
+        pool_size = math.ceil(height / self.row_height) + 1 + 2 * self.overscan
+        while len(self.rows) < pool_size:
+            self.rows.append(self.make_row())
+
+        first = self.top // self.row_height - self.overscan
+        visible_blocks = set()
+        for slot, row in enumerate(self.rows):
+            index = first + slot
+            if not (0 <= index < self.total and slot < pool_size):
+                row.place_forget()
+                row.contact_key = None
+                continue
+            visible_blocks.add(index // self.block_size)
+            contact = self.contact_at(index)
+            if contact is None:
+                if row.contact_key != "loading":
+                    row.contact_key = "loading"
+                    row.label.configure(text="Loading...")
+                    row.button.configure(state="disabled")
+            else:
+                contact_key = (contact.id, contact.name, contact.phone)
+                if row.contact_key != contact_key:
+                    row.contact_key = contact_key
+                    row.label.configure(text=f"{contact.name} - {contact.phone}")
+                    row.button.configure(state="normal", command=lambda c=contact: self.on_view(c))
+            row.place(x=0, y=index * self.row_height - self.top, relwidth=1)
+
+        for block_number in self.pending_blocks - visible_blocks:
+            self.cancel_block(block_number)
+
+        full_height = max(self.total * self.row_height, 1)
+        self.scrollbar.set(self.top / full_height, min(1, (self.top + height) / full_height))
@@ -2,6 +2,7 @@
 from todolist import TodoList
 from filetodolist import FileTodoList
 from dbtodolist import DbTodoList
+from journaltodolist import JournalTodoList
 from dotenv import load_dotenv
 import os
 
@@ -20,23 +21,44 @@ def terminate() -> None:
     print('Goodbye!')
     exit()
 
+def create_todo_list(todo_list_option: str, filename: str = None):
+    """
+    Creates the todo list selected by a `TODO_LIST_OPTION` value.
+
+    Parameters:
+    todo_list_option (str): in_memory, file, journal or database.
+    filename (str): The file of a file or journal list. Defaults to `TODO_LIST_FILE`.
+
+    Returns:
+    TodoList: The todo list, or None if the option is not one of the above.
+    """
+    filename = filename or os.getenv('TODO_LIST_FILE')
+    if todo_list_option == 'in_memory':
+        return TodoList(columnar=os.getenv('TODO_LIST_COLUMNAR', 'false').lower() == 'true')
+    if todo_list_option == 'file':
+        return FileTodoList(filename, streaming=os.getenv('TODO_LIST_STREAMING', 'false').lower() == 'true',
+                            shared=os.getenv('TODO_LIST_SHARED', 'false').lower() == 'true',
+                            columnar=os.getenv('TODO_LIST_COLUMNAR', 'false').lower() == 'true',
+                            file_format=os.getenv('TODO_LIST_FORMAT') or None)
+    if todo_list_option == 'journal':
+        return JournalTodoList(filename)
+    if todo_list_option == 'database':
+        return DbTodoList()
+    return None
+
 def main() -> None:
     todo_list_option = os.getenv('TODO_LIST_OPTION')
 
-    if todo_list_option == 'in_memory':
-        todo_list = TodoList()
-    elif todo_list_option == 'file':
-        filename = os.getenv('TODO_LIST_FILE')
-        if filename is None:
-            filename = input('Enter a filename: ')
-        todo_list = FileTodoList(filename)
-    elif todo_list_option == 'database':
-        todo_list = DbTodoList()
-    else:
+    filename = None
+    if todo_list_option in ('file', 'journal') and os.getenv('TODO_LIST_FILE') is None:
+        filename = input('Enter a filename: ')
+    todo_list = create_todo_list(todo_list_option, filename)
+    if todo_list is None:
         print('Choose a todo list option:')
         print('  1. In-memory list')
         print('  2. File list')
         print('  3. Database list')
+        print('  4. Journaled file list')
         option = input('Enter an option: ')
 
         if option == '1':
@@ -46,6 +68,9 @@ def main() -> None:
             todo_list = FileTodoList(filename)
         elif option == '3':
             todo_list = DbTodoList()
+        elif option == '4':
+            filename = input('Enter a filename: ')
+            todo_list = JournalTodoList(filename)
         else:
             print('Invalid option. Exiting.')
             return
@@ -0,0 +1,200 @@
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.engine import make_url
+from dbtodolist import DbTodoList, TodoModel, create_schema
+from functools import lru_cache
+import os
+
+# the asyncio driver used for each database backend of DATABASE_URL
+ASYNC_DRIVERS = {'sqlite': 'aiosqlite', 'postgresql': 'asyncpg', 'mysql': 'aiomysql'}
+
+AsyncSession = async_sessionmaker(expire_on_commit=False)
+
+def async_url(url: str) -> str:
+    """
+    Returns the URL of a database with its driver replaced by the asyncio driver of the same backend.
+
+    Args:
+        url (str): The database URL, such as "sqlite:///todos.db".
+
+    Returns:
+        str: The URL with an asyncio driver, such as "sqlite+aiosqlite:///todos.db". URLs that already name an
+        asyncio driver are returned unchanged.
+
+    Raises:
+        ValueError: If there is no asyncio driver for the backend.
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f'No asyncio driver for "{backend}" databases, set ASYNC_DATABASE_URL')
+    if url.get_driver_name() in ASYNC_DRIVERS.values():
+        return url.render_as_string(hide_password=False)
+    return url.set(drivername=f'{backend}+{ASYNC_DRIVERS[backend]}').render_as_string(hide_password=False)
+
+@lru_cache(maxsize=None)
+def get_async_engine():
+    """
+    Returns the process-wide asyncio database engine, creating it and the schema on first use.
+
+    The engine connects to `ASYNC_DATABASE_URL`, or to `DATABASE_URL` through the asyncio driver of its backend
+    (aiosqlite for SQLite). The schema is created once with a short-lived sync engine, which blocks only on first use.
+
+    Returns:
+        AsyncEngine: The shared engine.
+    """
+    sync_engine = create_engine(os.getenv('DATABASE_URL'))
+    create_schema(sync_engine)
+    sync_engine.dispose()
+    engine = create_async_engine(os.getenv('ASYNC_DATABASE_URL') or async_url(os.getenv('DATABASE_URL')))
+    AsyncSession.configure(bind=engine)
+    return engine
+
+class AsyncDbTodoList:
+    def __init__(self):
+        """
+        Initializes the class instance with an asyncio session on the shared asyncio engine.
+
+        Every method has the same arguments and results as the `DbTodoList` method of the same name, and runs that
+        method on this session's connection with `AsyncSession.run_sync`: its queries wait on the database without
+        blocking the event loop, and no threads are used. Unlike `DbTodoList`, instances share one engine and its
+        pool, so many can be open at once, one per request.
+
+        Nothing prompts with `input()`, which would block the event loop: edits take their values as arguments with
+        `edit_todo` instead of `update_todo`, and deletions are confirmed by being awaited, so the list's
+        confirmation prompt is replaced by one that always agrees, as `server.TodoService` does.
+        """
+        self.engine = get_async_engine()
+        self.session = AsyncSession()
+        self.todo_list = DbTodoList(self.session.sync_session)
+        self.todo_list.confirm = lambda prompt: True
+
+    async def __aenter__(self) -> 'AsyncDbTodoList':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def run(self, method, *args, **kwargs):
+        """
+        Runs a `DbTodoList` method on this session's connection.
+
+        Args:
+            method (callable): The bound method of `self.todo_list`.
+            *args: The positional arguments of the method.
+            **kwargs: The keyword arguments of the method.
+
+        Returns:
+            The result of the method.
+        """
+        return await self.session.run_sync(lambda session: method(*args, **kwargs))
+
+    async def count(self) -> int:
+        """
+        Returns the number of todo items. See `DbTodoList.count`.
+        """
+        return await self.run(self.todo_list.count)
+
+    async def get_todo_model(self, todo_index: int) -> TodoModel:
+        """
+        Returns the todo item at the given index. See `DbTodoList.get_todo_model`.
+        """
+        return await self.run(self.todo_list.get_todo_model, todo_index)
+
+    async def get_todo_models(self, positions: list, chunk_size: int = 500) -> list:
+        """
+        Returns the todo items at the given positions. See `DbTodoList.get_todo_models`.
+        """
+        return await self.run(self.todo_list.get_todo_models, positions, chunk_size)
+
+    async def add_todo(self, title: str, description: str) -> None:
+        """
+        Adds a new todo item to the database. See `DbTodoList.add_todo`.
+        """
+        await self.run(self.todo_list.add_todo, title, description)
+
+    async def mark_as_done(self, todo_index: int) -> None:
+        """
+        Marks a todo item as done. See `DbTodoList.mark_as_done`.
+        """
+        await self.run(self.todo_list.mark_as_done, todo_index)
+
+    async def iter_pages(self, page_size: int = 100, **filters):
+        """
+        Iterates over the todo items page by page, in position order. See `DbTodoList.iter_pages`.
+
+        Yields:
+            list: The todo items of each page.
+        """
+        pages = self.todo_list.iter_pages(page_size, **filters)
+        while True:
+            page = await self.run(next, pages, None)
+            if page is None:
+                return
+            yield page
+
+    async def load(self) -> None:
+        """
+        Retrieves all todo items from the database. See `DbTodoList.load`.
+        """
+        await self.run(self.todo_list.load)
+
+    async def all(self) -> None:
+        """
+        Prints the index, title and description of each todo item. See `DbTodoList.all`.
+        """
+        await self.run(self.todo_list.all)
+
+    async def edit_todo(self, todo_index: int, title: str, description: str) -> TodoModel:
+        """
+        Sets the title and description of a todo item. See `DbTodoList.edit_todo`.
+        """
+        return await self.run(self.todo_list.edit_todo, todo_index, title, description)
+
+    async def delete_todo(self, todo_index: int) -> None:
+        """
+        Deletes a todo item without a confirmation prompt. See `DbTodoList.delete_todo`.
+        """
+        await self.run(self.todo_list.delete_todo, todo_index)
+
+    async def view_todo(self, todo_index: int) -> None:
+        """
+        Prints the details of a todo item. See `DbTodoList.view_todo`.
+        """
+        await self.run(self.todo_list.view_todo, todo_index)
+
+    async def view_completed_todos(self) -> None:
+        """
+        Prints the completed todo items. See `DbTodoList.view_completed_todos`.
+        """
+        await self.run(self.todo_list.view_completed_todos)
+
+    async def view_uncompleted_todos(self) -> None:
+        """
+        Prints the uncompleted todo items. See `DbTodoList.view_uncompleted_todos`.
+        """
+        await self.run(self.todo_list.view_uncompleted_todos)
+
+    async def add_many(self, items: list) -> list:
+        """
+        Adds many todo items with a single bulk insert. See `DbTodoList.add_many`.
+        """
+        return await self.run(self.todo_list.add_many, items)
+
+    async def mark_many_done(self, todo_indexes: list) -> list:
+        """
+        Marks many todo items as done with a single bulk update. See `DbTodoList.mark_many_done`.
+        """
+        return await self.run(self.todo_list.mark_many_done, todo_indexes)
+
+    async def delete_many(self, todo_indexes: list, chunk_size: int = 500) -> list:
+        """
+        Deletes many todo items without a confirmation prompt. See `DbTodoList.delete_many`.
+        """
+        return await self.run(self.todo_list.delete_many, todo_indexes, chunk_size)
+
+    async def close(self) -> None:
+        """
+        Closes the session and returns its connection to the pool.
+        """
+        await self.session.close()
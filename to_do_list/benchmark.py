@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""todo list benchmarks
+
+Run all benchmarks with `./benchmark.py` or a single one with `./benchmark.py journal`.
+"""
+from contextlib import redirect_stdout
+from filetodolist import FileTodoList
+from journaltodolist import JournalTodoList
+from dbtodolist import DbTodoList
+from asyncdbtodolist import AsyncDbTodoList, get_async_engine
+from concurrent.futures import ThreadPoolExecutor
+from columnartodos import ColumnarTodos
+from serializers import SERIALIZERS, BINARY_HEADER, BINARY_MAGIC, BINARY_VERSION
+from todolist import TodoList, Todo
+from array import array
+import multiprocessing
+import tracemalloc
+import threading
+import asyncio
+import random
+import tempfile
+import uuid
+import time
+import json
+import sys
+import io
+import os
+
+def timed(function) -> float:
+    """
+    Runs a function with its output silenced and returns the elapsed time in seconds.
+
+    Args:
+        function (callable): The function to run.
+
+    Returns:
+        float: The elapsed time in seconds.
+    """
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        function()
+    return time.perf_counter() - start
+
+def write_todos(filename: str, count: int) -> None:
+    """
+    Writes a JSON todo file with `count` todo items.
+
+    Args:
+        filename (str): The file to write.
+        count (int): The number of todo items.
+
+    Returns:
+        None
+    """
+    data = []
+    for index in range(count):
+        todo = Todo(f'title {index}', f'description {index}')
+        data.append({'id': todo.id, 'title': todo.title, 'description': todo.description, 'done': index % 2 == 0})
+    with open(filename, 'w') as f:
+        json.dump(data, f)
+
+def bench_journal(count: int = 200000, mutations: int = 50) -> None:
+    """
+    Compares the cost of a mutation in `FileTodoList` (full rewrite) and `JournalTodoList` (journal append).
+
+    Args:
+        count (int): The number of todo items already in the list.
+        mutations (int): The number of todo items added while timing.
+
+    Returns:
+        None
+    """
+    print(f'journal: {mutations} adds on a list of {count} todos')
+    with tempfile.TemporaryDirectory() as directory:
+        for name, cls in (('full rewrite', FileTodoList), ('journal', JournalTodoList)):
+            filename = os.path.join(directory, f'{cls.__name__}.json')
+            write_todos(filename, count)
+            todo_list = cls(filename)
+            elapsed = timed(lambda: [todo_list.add_todo('title', 'description') for _ in range(mutations)])
+            print(f'  {name:<14} {elapsed / mutations * 1000:10.3f} ms/op')
+            if isinstance(todo_list, JournalTodoList):
+                todo_list.close()
+
+def bench_streaming(count: int = 500000, page: int = 20) -> None:
+    """
+    Compares the time to the first page of todos and the peak memory of a full and a streaming `FileTodoList` load.
+
+    Args:
+        count (int): The number of todo items in the file.
+        page (int): The number of todo items in the first page.
+
+    Returns:
+        None
+    """
+    print(f'streaming: first {page} todos of a file with {count} todos')
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'todos.json')
+        write_todos(filename, count)
+        for name, streaming in (('full load', False), ('streaming', True)):
+            def first_page():
+                todo_list = FileTodoList(filename, streaming=streaming)
+                for index, todo in enumerate(todo_list.todos):
+                    if index == page:
+                        break
+            elapsed = timed(first_page)
+            tracemalloc.start()
+            timed(first_page)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f'  {name:<14} {elapsed * 1000:10.3f} ms {peak / 1024 / 1024:10.1f} MiB peak')
+
+class DictTodo:
+    def __init__(self, title: str, description: str):
+        """
+        The original `Todo` layout, with a per-instance `__dict__`, for comparison.
+        """
+        self.id = str(uuid.uuid4())
+        self.title = title
+        self.description = description
+        self.done = False
+
+def bench_memory(count: int = 200000) -> None:
+    """
+    Reports the bytes per todo of a list of `__dict__` todos, a list of `__slots__` todos and a `ColumnarTodos` store.
+
+    Args:
+        count (int): The number of todo items.
+
+    Returns:
+        None
+    """
+    print(f'memory: bytes per todo for {count} todos')
+    layouts = (
+        ('__dict__ list', list, DictTodo),
+        ('__slots__ list', list, Todo),
+        ('columnar', ColumnarTodos, Todo),
+    )
+    for name, container, cls in layouts:
+        tracemalloc.start()
+        todos = container()
+        for index in range(count):
+            todo = cls(f'title {index}', f'description {index}')
+            todo.done = index % 2 == 0
+            todos.append(todo)
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del todos
+        print(f'  {name:<14} {size / count:10.1f} bytes/todo')
+
+def bench_batch(count: int = 2000) -> None:
+    """
+    Compares the throughput of `add_many` with a loop of `add_todo` calls on every backend.
+
+    Args:
+        count (int): The number of todo items to add.
+
+    Returns:
+        None
+    """
+    print(f'batch: adding {count} todos')
+    items = [(f'title {index}', f'description {index}') for index in range(count)]
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(directory, 'todos.db')
+        backends = (
+            ('in memory', lambda name: TodoList()),
+            ('file', lambda name: FileTodoList(os.path.join(directory, name + '.json'))),
+            ('journal', lambda name: JournalTodoList(os.path.join(directory, name + '.json'))),
+            ('database', lambda name: DbTodoList()),
+        )
+        for name, backend in backends:
+            single = backend(name + '-single')
+            looped = timed(lambda: [single.add_todo(title, description) for title, description in items])
+            batch = backend(name + '-batch')
+            batched = timed(lambda: batch.add_many(items))
+            print(f'  {name:<14} {count / looped:12.0f} todos/s single {count / batched:12.0f} todos/s batch')
+            for todo_list in (single, batch):
+                if hasattr(todo_list, 'close'):
+                    todo_list.close()
+
+def bench_async(count: int = 10000, requests: int = 2000, concurrency: int = 100) -> None:
+    """
+    Compares the throughput of concurrent requests served by `AsyncDbTodoList` on one event loop with `DbTodoList`
+    driven from a thread pool. Each request counts the todos and reads one by index.
+
+    `DbTodoList` has no shared engine, so each thread keeps one list for all its requests, like a worker would.
+
+    Args:
+        count (int): The number of todo items in the database.
+        requests (int): The number of requests.
+        concurrency (int): The number of requests in flight at once, and the number of threads.
+
+    Returns:
+        None
+    """
+    print(f'async: {requests} requests, {concurrency} at a time, {count} todos in the database')
+    generator = random.Random(5)
+    picks = [generator.randrange(count) for _ in range(requests)]
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(directory, 'todos.db')
+        setup = DbTodoList()
+        timed(lambda: setup.add_many([(f'title {index}', f'description {index}') for index in range(count)]))
+        setup.close()
+        get_async_engine.cache_clear()
+        get_async_engine()
+
+        lists = {}
+        def sync_request(position):
+            todo_list = lists.get(threading.get_ident())
+            if todo_list is None:
+                todo_list = lists[threading.get_ident()] = DbTodoList()
+            todo_list.count()
+            todo_list.get_todo_model(position)
+            todo_list.session.commit()
+
+        def threads():
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                list(executor.map(sync_request, picks))
+
+        async def async_request(position, slots):
+            async with slots:
+                async with AsyncDbTodoList() as todo_list:
+                    await todo_list.count()
+                    await todo_list.get_todo_model(position)
+
+        async def event_loop():
+            slots = asyncio.Semaphore(concurrency)
+            await asyncio.gather(*(async_request(position, slots) for position in picks))
+            # pooled connections belong to this event loop
+            await get_async_engine().dispose()
+
+        for name, run in (('thread pool', threads), ('asyncio', lambda: asyncio.run(event_loop()))):
+            print(f'  {name:<14} {requests / timed(run):12.0f} requests/s')
+        for todo_list in lists.values():
+            todo_list.close()
+
+def shared_writer(filename: str, shared: bool, writes: int, number: int, rotate_size: int = None) -> None:
+    """
+    Adds `writes` todo items to a todo file and marks every second one as done, as one of many writer processes.
+
+    Args:
+        filename (str): The todo file.
+        shared (bool): Whether to open the file as a shared `FileTodoList`.
+        writes (int): The number of todo items to add.
+        number (int): The number of the writer, used in the titles.
+        rotate_size (int, optional): The size after which the change log is started afresh. Defaults to None, for
+            `FileTodoList.changes_rotate_size`.
+
+    Returns:
+        None
+    """
+    with redirect_stdout(io.StringIO()):
+        todo_list = FileTodoList(filename, shared=shared)
+        if rotate_size:
+            todo_list.changes_rotate_size = rotate_size
+        for index in range(writes):
+            todo_list.add_todo(f'writer {number} todo {index}', 'stress test')
+            if index % 2:
+                todo = todo_list.todos[-1]
+                todo_list.mark_as_done(todo_list.indexes().position(todo.id))
+
+def bench_shared(writers: int = 8, writes: int = 100, count: int = 1000, rotate_size: int = 4096) -> None:
+    """
+    Runs concurrent writer processes on one todo file, with and without `shared=True`, and counts the lost updates.
+    The shared list is run a second time with a change log small enough to be started afresh many times.
+
+    Every writer adds `writes` todo items and marks half of them as done, so no update is lost if the file ends up
+    with all of them, and the expected number of them done.
+
+    Args:
+        writers (int): The number of writer processes.
+        writes (int): The number of todo items each writer adds.
+        count (int): The number of todo items already in the file.
+        rotate_size (int): The size after which the change log is started afresh in the second shared run.
+
+    Returns:
+        None
+    """
+    print(f'shared: {writers} writer processes x {writes} adds and {writes // 2} completions, {count} todos in the file')
+    with tempfile.TemporaryDirectory() as directory:
+        for name, shared, rotate in (('unshared', False, None), ('shared', True, None),
+                                     (f'shared, {rotate_size} B log', True, rotate_size)):
+            filename = os.path.join(directory, f'{name}.json')
+            write_todos(filename, count)
+            processes = [multiprocessing.Process(target=shared_writer, args=(filename, shared, writes, number, rotate))
+                         for number in range(writers)]
+            start = time.perf_counter()
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+            elapsed = time.perf_counter() - start
+            with redirect_stdout(io.StringIO()):
+                todos = [todo for todo in FileTodoList(filename).todos if todo.description == 'stress test']
+            operations = writers * (writes + writes // 2)
+            lost = operations - len(todos) - sum(1 for todo in todos if todo.done)
+            print(f'  {name:<20} {operations / elapsed:10.0f} ops/s {lost:8} lost updates')
+
+def write_binary_todos(filename: str, count: int) -> None:
+    """
+    Writes a binary todo file with `count` todo items, without building them first.
+
+    Args:
+        filename (str): The file to write.
+        count (int): The number of todo items.
+
+    Returns:
+        None
+    """
+    text = bytearray()
+    lengths = array('I')
+    for index in range(count):
+        title, description = b'title %d' % index, b'description %d' % index
+        text += title
+        text += description
+        lengths.append(len(title))
+        lengths.append(len(description))
+    if sys.byteorder == 'big':
+        lengths.byteswap()
+    with open(filename, 'wb') as f:
+        f.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, 0, count))
+        f.write(random.Random(7).randbytes(16 * count))
+        f.write(b'\x55' * ((count + 7) >> 3))
+        f.write(lengths.tobytes())
+        f.write(text)
+
+def bench_formats(counts: tuple = (10000, 1000000, 10000000), list_limit: int = 1000000) -> None:
+    """
+    Compares the save time, load time and file size of each todo file format.
+
+    The todos are saved from and loaded into a `ColumnarTodos` store, which holds 10 million todos in memory, and
+    loaded as a list of `Todo` objects too for up to `list_limit` todos.
+
+    Args:
+        counts (tuple): The numbers of todo items to compare at.
+        list_limit (int): The largest number of todo items that is also loaded as a list.
+
+    Returns:
+        None
+    """
+    print('formats: save and load time and file size')
+    with tempfile.TemporaryDirectory() as directory:
+        for count in counts:
+            source = os.path.join(directory, 'source.todos')
+            write_binary_todos(source, count)
+            todos = SERIALIZERS['binary'].load(source, columnar=True)
+            os.remove(source)
+            for name, serializer in SERIALIZERS.items():
+                filename = os.path.join(directory, 'todos' + serializer.extensions[0])
+                def save(todos):
+                    with open(filename, 'wb') as f:
+                        serializer.dump(todos, f)
+                saved = timed(lambda: save(todos))
+                loaded = timed(lambda: serializer.load(filename, columnar=True))
+                line = (f'  {count:>10} {name:<8} {os.path.getsize(filename) / 1024 / 1024:9.1f} MiB'
+                        f' {saved:8.2f} s save {loaded:8.2f} s load')
+                if count <= list_limit:
+                    todo_list = serializer.load(filename)
+                    line += f' {timed(lambda: save(todo_list)):8.2f} s list save {timed(lambda: serializer.load(filename)):8.2f} s list load'
+                    del todo_list
+                print(line)
+                os.remove(filename)
+            del todos
+
+benchmarks = {
+    'journal': bench_journal,
+    'streaming': bench_streaming,
+    'memory': bench_memory,
+    'batch': bench_batch,
+    'async': bench_async,
+    'shared': bench_shared,
+    'formats': bench_formats,
+}
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or benchmarks:
+        benchmarks[name]()
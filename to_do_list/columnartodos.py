@@ -0,0 +1,330 @@
+from collections.abc import MutableSequence
+from todo import Todo
+from array import array
+import uuid
+
+class ColumnarTodo:
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store: 'ColumnarTodos', index: int):
+        """
+        Initializes a lightweight view of the todo item at an index of a `ColumnarTodos` store.
+
+        The view reads and writes the store directly, so it is only valid until todos before it are deleted.
+
+        Args:
+            store (ColumnarTodos): The store holding the todo item.
+            index (int): The index of the todo item.
+
+        Returns:
+            None
+        """
+        self.store = store
+        self.index = index
+
+    @property
+    def id(self) -> str:
+        return str(uuid.UUID(bytes=self.store.id_bytes(self.index)))
+
+    @property
+    def title(self) -> str:
+        return self.store.read(self.store.title_spans, self.index)
+
+    @title.setter
+    def title(self, value: str) -> None:
+        self.store.write(self.store.title_spans, self.index, value)
+
+    @property
+    def description(self) -> str:
+        return self.store.read(self.store.description_spans, self.index)
+
+    @description.setter
+    def description(self, value: str) -> None:
+        self.store.write(self.store.description_spans, self.index, value)
+
+    @property
+    def done(self) -> bool:
+        return self.store.get_done(self.index)
+
+    @done.setter
+    def done(self, value: bool) -> None:
+        self.store.set_done(self.index, value)
+
+    def completed(self) -> None:
+        """
+        Marks the todo item as completed.
+        """
+        self.done = True
+
+    def to_dict(self) -> dict:
+        """
+        Returns a dictionary representation of the todo item.
+
+        Returns:
+            dict: A dictionary with the id, title, description, and done status of the todo item.
+        """
+        return {
+            'id': self.id,
+            'title': self.title,
+            'description': self.description,
+            'done': self.done
+        }
+
+    def __repr__(self) -> str:
+        return f'Todo({self.title}, {self.description}, done={self.done})'
+
+class ColumnarTodos(MutableSequence):
+    def __init__(self):
+        """
+        Initializes an empty column-oriented list of todos.
+
+        Instead of one object per todo, the todos are kept in a few parallel columns:
+            - `ids`: 16-byte binary UUIDs, back to back.
+            - `text`: UTF-8 encoded titles and descriptions, back to back.
+            - `title_spans` and `description_spans`: the (offset, length) of each string in `text`.
+            - `done_bits`: a bitset with bit `i` set when todo `i` is done.
+
+        Indexing returns a `ColumnarTodo` view instead of a `Todo` object.
+
+        Returns:
+            None
+        """
+        self.ids = bytearray()
+        self.text = bytearray()
+        self.title_spans = array('Q')
+        self.description_spans = array('Q')
+        self.done_bits = bytearray()
+        self.garbage = 0
+
+    @classmethod
+    def from_columns(cls, ids: bytes, text: bytes, title_spans: array, description_spans: array, done_bits: bytes) -> 'ColumnarTodos':
+        """
+        Creates a store from ready-made columns, such as the ones read from a binary todo file.
+
+        Args:
+            ids (bytes): The 16-byte binary UUIDs, back to back.
+            text (bytes): The UTF-8 encoded titles and descriptions.
+            title_spans (array): The (offset, length) in `text` of each title, as an array of type 'Q'.
+            description_spans (array): The (offset, length) in `text` of each description, as an array of type 'Q'.
+            done_bits (bytes): The bitset of done todos.
+
+        Returns:
+            ColumnarTodos: The store.
+        """
+        store = cls()
+        store.ids = bytearray(ids)
+        store.text = bytearray(text)
+        store.title_spans = title_spans
+        store.description_spans = description_spans
+        store.done_bits = bytearray(done_bits)
+        return store
+
+    def id_bytes(self, index: int) -> bytes:
+        """
+        Returns the binary UUID of the todo at an index.
+
+        Args:
+            index (int): The index of the todo.
+
+        Returns:
+            bytes: The 16-byte UUID.
+        """
+        return bytes(self.ids[index * 16:index * 16 + 16])
+
+    def get_done(self, index: int) -> bool:
+        """
+        Returns whether the todo at an index is done.
+
+        Args:
+            index (int): The index of the todo.
+
+        Returns:
+            bool: True if the todo is done, False otherwise.
+        """
+        return bool(self.done_bits[index >> 3] >> (index & 7) & 1)
+
+    def set_done(self, index: int, done: bool) -> None:
+        """
+        Sets or clears the done bit of the todo at an index.
+
+        Args:
+            index (int): The index of the todo.
+            done (bool): The new done status.
+
+        Returns:
+            None
+        """
+        if done:
+            self.done_bits[index >> 3] |= 1 << (index & 7)
+        else:
+            self.done_bits[index >> 3] &= ~(1 << (index & 7)) & 0xff
+
+    def shift_done_bits(self, index: int, shift: int) -> None:
+        """
+        Shifts the done bits from an index onwards by one position, to open or close a gap at that index.
+
+        Args:
+            index (int): The first index to shift.
+            shift (int): 1 to open a gap for an insert, -1 to close it after a delete.
+
+        Returns:
+            None
+        """
+        start = index >> 3
+        tail = int.from_bytes(self.done_bits[start:], 'little')
+        low_bits = index & 7
+        low = tail & ((1 << low_bits) - 1)
+        high = tail >> low_bits
+        high = high << 1 if shift > 0 else high >> 1
+        tail = low | (high << low_bits)
+        size = (len(self) + 7 >> 3) - start
+        self.done_bits[start:] = tail.to_bytes(size, 'little')
+
+    def read(self, spans: array, index: int) -> str:
+        """
+        Decodes the string at an index of a span column.
+
+        Args:
+            spans (array): The title or description spans.
+            index (int): The index of the todo.
+
+        Returns:
+            str: The decoded string.
+        """
+        offset, length = spans[2 * index], spans[2 * index + 1]
+        return self.text[offset:offset + length].decode('utf-8')
+
+    def write(self, spans: array, index: int, value: str) -> None:
+        """
+        Stores a new string at an index of a span column.
+
+        The new string is appended to `text` and the old bytes are counted as garbage,
+        which is reclaimed by `compact` once it outweighs the live text.
+
+        Args:
+            spans (array): The title or description spans.
+            index (int): The index of the todo.
+            value (str): The new string.
+
+        Returns:
+            None
+        """
+        self.garbage += spans[2 * index + 1]
+        spans[2 * index], spans[2 * index + 1] = self.store_text(value)
+        if self.garbage > len(self.text) // 2:
+            self.compact()
+
+    def store_text(self, value: str) -> tuple:
+        """
+        Appends a string to `text`.
+
+        Args:
+            value (str): The string to append.
+
+        Returns:
+            tuple: The offset and length of the encoded string.
+        """
+        data = value.encode('utf-8')
+        offset = len(self.text)
+        self.text += data
+        return offset, len(data)
+
+    def compact(self) -> None:
+        """
+        Rewrites `text` without the bytes of updated or deleted strings.
+
+        Returns:
+            None
+        """
+        text = bytearray()
+        for spans in (self.title_spans, self.description_spans):
+            for position in range(0, len(spans), 2):
+                offset, length = spans[position], spans[position + 1]
+                spans[position] = len(text)
+                text += self.text[offset:offset + length]
+        self.text = text
+        self.garbage = 0
+
+    def check_index(self, index: int) -> int:
+        """
+        Normalizes a negative index and checks that it is in range.
+
+        Args:
+            index (int): The index to check.
+
+        Returns:
+            int: The normalized index.
+
+        Raises:
+            IndexError: If the index is out of range.
+        """
+        index = int(index)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('todo index out of range')
+        return index
+
+    def __len__(self) -> int:
+        return len(self.title_spans) // 2
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return ColumnarTodo(self, self.check_index(index))
+
+    def __setitem__(self, index: int, todo: Todo) -> None:
+        index = self.check_index(index)
+        if isinstance(todo, ColumnarTodo) and todo.store is self and todo.index == index:
+            # a view assigned back to its own index, which already holds its changes
+            return
+        self.ids[index * 16:index * 16 + 16] = uuid.UUID(todo.id).bytes
+        view = ColumnarTodo(self, index)
+        view.title = todo.title
+        view.description = todo.description
+        view.done = todo.done
+
+    def __delitem__(self, index: int) -> None:
+        index = self.check_index(index)
+        self.garbage += self.title_spans[2 * index + 1] + self.description_spans[2 * index + 1]
+        del self.ids[index * 16:index * 16 + 16]
+        del self.title_spans[2 * index:2 * index + 2]
+        del self.description_spans[2 * index:2 * index + 2]
+        self.shift_done_bits(index, -1)
+        if self.garbage > len(self.text) // 2:
+            self.compact()
+
+    def insert(self, index: int, todo: Todo) -> None:
+        size = len(self)
+        if index < 0:
+            index += size
+        index = max(0, min(index, size))
+        self.ids[index * 16:index * 16] = uuid.UUID(todo.id).bytes
+        self.title_spans[2 * index:2 * index] = array('Q', self.store_text(todo.title))
+        self.description_spans[2 * index:2 * index] = array('Q', self.store_text(todo.description))
+        if index < size:
+            self.shift_done_bits(index, 1)
+        elif len(self.done_bits) * 8 <= index:
+            self.done_bits.append(0)
+        self.set_done(index, todo.done)
+
+    def pop(self, index: int = -1) -> Todo:
+        """
+        Removes the todo at an index and returns it as a standalone `Todo`, since a view would point at its successor.
+
+        Args:
+            index (int): The index of the todo to remove.
+
+        Returns:
+            Todo: The removed todo item.
+        """
+        view = self[index]
+        todo = Todo(view.title, view.description)
+        todo.id = view.id
+        todo.done = view.done
+        del self[view.index]
+        return todo
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield ColumnarTodo(self, index)
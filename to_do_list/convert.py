@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""todo file converter
+
+Converts a todo file between the JSON and binary formats, which are chosen by the file extensions (.json, or .todos
+or .bin for binary) unless a target format is given:
+
+    ./convert.py todos.json todos.todos
+    ./convert.py todos.todos todos.json
+    ./convert.py todos.json todos.dat binary
+"""
+from serializers import convert
+import time
+import sys
+import os
+
+def main() -> None:
+    if len(sys.argv) not in (3, 4):
+        print('Usage: ./convert.py SOURCE TARGET [json|binary]')
+        return
+    source, target = sys.argv[1], sys.argv[2]
+    start = time.perf_counter()
+    try:
+        count = convert(source, target, target_format=sys.argv[3] if len(sys.argv) == 4 else None)
+    except (OSError, ValueError) as error:
+        print(error)
+        return
+    print(f'{count} todos converted in {time.perf_counter() - start:.2f} s: '
+          f'{os.path.getsize(source) / 1024 / 1024:.1f} MiB -> {os.path.getsize(target) / 1024 / 1024:.1f} MiB')
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy import Column, Integer, String, create_engine, insert, update, delete, inspect, text, func, select, literal
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from todolist import TodoList, Todo
@@ -12,6 +12,7 @@ class TodoModel(Base):
     title = Column(String, nullable=False)
     description = Column(String)
     done = Column(Integer, default=0)
+    position = Column(Integer, index=True)
 
     def completed(self) -> None:
         """
@@ -27,16 +28,219 @@ class TodoModel(Base):
         """
         return f'TodoModel(id={self.id}, title={self.title}, description={self.description}, done={self.done})'
 
+def create_schema(engine) -> None:
+    """
+    Creates the todos table, or adds the columns introduced later to an existing one.
+
+    Args:
+        engine (Engine): The engine of the database.
+
+    Returns:
+        None
+    """
+    Base.metadata.create_all(engine)
+    add_position_column(engine)
+
+def add_position_column(engine) -> None:
+    """
+    Adds and fills the `position` column in a todos table created before it existed.
+
+    Existing todos are numbered in the order the database returns them, which is the order `all()` used to show.
+
+    Args:
+        engine (Engine): The engine of the database.
+
+    Returns:
+        None
+    """
+    columns = {column['name'] for column in inspect(engine).get_columns(TodoModel.__tablename__)}
+    if 'position' in columns:
+        return
+    with engine.begin() as connection:
+        connection.execute(text('ALTER TABLE todos ADD COLUMN position INTEGER'))
+        ids = connection.execute(text('SELECT id FROM todos')).scalars().all()
+        if ids:
+            connection.execute(text('UPDATE todos SET position = :position WHERE id = :id'),
+                               [{'id': todo_id, 'position': position} for position, todo_id in enumerate(ids)])
+        connection.execute(text('CREATE INDEX ix_todos_position ON todos (position)'))
+
 class DbTodoList(TodoList):
-    def __init__(self):
+    def __init__(self, session=None):
         """
         Initializes the class instance by setting up the database engine, creating all tables, and setting up a session for database interactions.
+
+        The todos are numbered by a persisted, indexed `position` column, so index-based operations resolve with one
+        indexed query instead of needing `all()` first. Objects are not expired on commit, so todos loaded by `all()`
+        are reused from the session's identity map without any query.
+
+        Args:
+            session (Session): A session to use instead of creating an engine, such as the one `AsyncDbTodoList` runs
+                these methods in. Its database must have the schema already.
         """
         super().__init__ ()
-        self.engine = create_engine(os.getenv('DATABASE_URL'))
-        Base.metadata.create_all(self.engine)
-        self.Session = sessionmaker(bind=self.engine)
-        self.session = self.Session()
+        if session is None:
+            self.engine = create_engine(os.getenv('DATABASE_URL'))
+            create_schema(self.engine)
+            self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
+            session = self.Session()
+        else:
+            self.engine = session.get_bind()
+        self.session = session
+        self.loaded = False
+
+    def count(self) -> int:
+        """
+        Returns the number of todo items, without a query once `all()` has loaded them.
+
+        Returns:
+            int: The number of todo items.
+        """
+        if self.loaded:
+            return len(self.todos)
+        return self.session.query(func.count(TodoModel.id)).scalar()
+
+    def get_todo_model(self, todo_index: int) -> TodoModel:
+        """
+        Returns the todo item at the given index.
+
+        Todos loaded by `all()` are returned directly, otherwise the todo is fetched with one query on the indexed
+        `position` column.
+
+        Args:
+            todo_index (int): The index of the todo item.
+
+        Returns:
+            TodoModel: The todo item.
+
+        Raises:
+            IndexError: If there is no todo item at the index.
+            ValueError: If the index is not an integer.
+        """
+        todo_index = int(todo_index)
+        if self.loaded:
+            return self.todos[todo_index]
+        if todo_index < 0:
+            todo_index += self.count()
+        todo_model = self.session.query(TodoModel).filter_by(position=todo_index).first() if todo_index >= 0 else None
+        if todo_model is None:
+            raise IndexError('todo index out of range')
+        return todo_model
+
+    def find_todo(self, todo_id: str):
+        """
+        Finds a todo item by its id, in the id index once `all()` has loaded the todos, otherwise with one query on
+        the primary key.
+
+        Args:
+            todo_id (str): The id of the todo item.
+
+        Returns:
+            TodoModel: The todo item, or None if there is no todo with that id.
+        """
+        if self.loaded:
+            return super().find_todo(todo_id)
+        return self.session.get(TodoModel, todo_id)
+
+    def get_todo(self, todo_index: int) -> TodoModel:
+        """
+        Returns the todo item at the given index. See `get_todo_model`.
+        """
+        return self.get_todo_model(todo_index)
+
+    def todos_page(self, offset: int = 0, limit: int = 100, done: bool = None) -> list:
+        """
+        Returns one page of todo items together with their indexes, in position order.
+
+        Without a `done` filter the page is a range of the indexed `position` column, so it is read without skipping
+        the rows before it.
+
+        Args:
+            offset (int): The number of matching todo items to skip.
+            limit (int): The maximum number of todo items to return.
+            done (bool, optional): Only return done todos if True, or undone todos if False. Defaults to None,
+                which returns every todo.
+
+        Returns:
+            list: (index, todo) pairs.
+        """
+        if self.loaded:
+            return super().todos_page(offset, limit, done)
+        query = self.session.query(TodoModel.position, TodoModel).order_by(TodoModel.position).populate_existing()
+        if done is None:
+            query = query.filter(TodoModel.position >= offset)
+        else:
+            query = query.filter_by(done=int(done)).offset(offset)
+        return [(position, todo_model) for position, todo_model in query.limit(limit)]
+
+    def get_todo_models(self, positions: list, chunk_size: int = 500) -> list:
+        """
+        Returns the todo items at the given non-negative positions, in the same order.
+
+        Args:
+            positions (list): The positions of the todo items.
+            chunk_size (int): The number of positions per query.
+
+        Returns:
+            list: The todo items.
+        """
+        if self.loaded:
+            return [self.todos[position] for position in positions]
+        todo_models = {}
+        for start in range(0, len(positions), chunk_size):
+            chunk = positions[start:start + chunk_size]
+            for todo_model in self.session.query(TodoModel).filter(TodoModel.position.in_(chunk)):
+                todo_models[todo_model.position] = todo_model
+        return [todo_models[position] for position in positions]
+
+    def close_gaps(self, positions: list) -> None:
+        """
+        Renumbers the todos after deleted positions so the positions stay dense.
+
+        Runs one UPDATE per deleted position, each shifting only the todos between it and the next deleted position.
+        The session is synchronized with each UPDATE, so the todos it already holds, such as those loaded by `load()`,
+        get their new positions too.
+
+        Args:
+            positions (list): The deleted positions, in ascending order.
+
+        Returns:
+            None
+        """
+        for shift, position in enumerate(positions, start=1):
+            statement = update(TodoModel).where(TodoModel.position > position)
+            if shift < len(positions):
+                statement = statement.where(TodoModel.position < positions[shift])
+            statement = statement.values(position=TodoModel.position - shift)
+            self.session.execute(statement.execution_options(synchronize_session='fetch'))
+
+    def insert_at_end(self, todos: list) -> int:
+        """
+        Inserts todo items after the last position, without committing.
+
+        The position of the first todo is computed inside its INSERT, from the largest position in the database, so
+        two sessions adding todos at once cannot both take the same position as they could with a count read before
+        the insert. That INSERT takes the database's write lock (on PostgreSQL, the table is locked first), which is
+        held until the commit, so the following todos can take the positions after it.
+
+        Args:
+            todos (list): The `Todo` items to insert.
+
+        Returns:
+            int: The position of the first todo.
+        """
+        if self.engine.dialect.name == 'postgresql':
+            self.session.execute(text('LOCK TABLE todos IN SHARE ROW EXCLUSIVE MODE'))
+        first = todos[0]
+        next_position = select(func.coalesce(func.max(TodoModel.position) + 1, 0)).scalar_subquery()
+        self.session.execute(insert(TodoModel).from_select(
+            ['id', 'title', 'description', 'done', 'position'],
+            select(literal(first.id), literal(first.title), literal(first.description), literal(0), next_position)))
+        start = self.session.query(TodoModel.position).filter_by(id=first.id).scalar()
+        if len(todos) > 1:
+            rows = [{'id': todo.id, 'title': todo.title, 'description': todo.description, 'done': 0, 'position': start + offset}
+                    for offset, todo in enumerate(todos[1:], start=1)]
+            self.session.execute(insert(TodoModel), rows)
+        return start
 
     def add_todo(self, title: str, description: str) -> None:
         """
@@ -50,14 +254,17 @@ class DbTodoList(TodoList):
             None
 
         This function creates a new `Todo` instance with the given `title` and `description`,
-        and then creates a corresponding `TodoModel` instance with the same `id`, `title`, and `description`.
-        The `TodoModel` instance is then added to the session and the changes are committed to the database.
+        and then inserts a corresponding row with the same `id`, `title`, and `description` after the last position
+        with `insert_at_end`. The changes are then committed to the database.
         Finally, a success message is printed indicating that the todo item was saved successfully.
         """
         todo = Todo(title, description)
-        todo_model = TodoModel(id=todo.id, title=title, description=description)
-        self.session.add(todo_model)
+        self.insert_at_end([todo])
         self.session.commit()
+        if self.loaded:
+            self.todos.append(self.session.get(TodoModel, todo.id))
+            if self.index is not None:
+                self.index.add(todo.id, False)
         print(f'Todo item {todo.id} saved successfully!')
 
     def mark_as_done(self, todo_index: int) -> None:
@@ -71,20 +278,70 @@ class DbTodoList(TodoList):
             None
         """
         try:
-            todo_model = self.session.query(TodoModel).filter_by(id=self.todos[todo_index].id).first()
+            todo_model = self.get_todo_model(todo_index)
             todo_model.completed()
             self.session.commit()
+            if self.loaded and self.index is not None:
+                self.index.mark_done(todo_model.id)
             print(f'Todo "{todo_model.title}" marked as done successfully!')
         except (IndexError, ValueError):
             print('Invalid todo index. Please try again.')
 
+    def iter_pages(self, page_size: int = 100, **filters):
+        """
+        Iterates over the todo items page by page, in position order.
+
+        Pages are fetched with keyset pagination on the indexed `position` column: each query starts right after the
+        last position of the previous page, so fetching a page never scans the rows before it the way OFFSET would.
+        That position is the one read from the database, and todos already in the session are refreshed with the
+        rows of each page, so positions changed by another session are never stale.
+
+        Args:
+            page_size (int): The number of todo items per page.
+            **filters: Column values to filter by, such as `done=1`.
+
+        Yields:
+            list: The todo items of each page.
+        """
+        last_position = -1
+        while True:
+            rows = (self.session.query(TodoModel.position, TodoModel)
+                    .filter_by(**filters)
+                    .filter(TodoModel.position > last_position)
+                    .order_by(TodoModel.position)
+                    .limit(page_size)
+                    .populate_existing()
+                    .all())
+            if not rows:
+                return
+            yield [todo_model for position, todo_model in rows]
+            if len(rows) < page_size:
+                return
+            last_position = rows[-1][0]
+
+    def load(self) -> None:
+        """
+        Retrieves all todo items from the database using the session and stores them in `self.todos`,
+        so index-based operations can reuse them without queries.
+        """
+        self.todos = self.session.query(TodoModel).order_by(TodoModel.position).all()
+        self.loaded = True
+        self.index = None
+
     def all(self) -> None:
         """
-        Retrieves all todo items from the database using the session and stores them in `self.todos`.
-        Calls the parent class's `all` method.
+        Prints the index, title and description of each todo item, streaming them from the database page by page.
         """
-        self.todos = self.session.query(TodoModel).all()
-        super().all()
+        empty = True
+        for page in self.iter_pages():
+            empty = False
+            for todo_model in page:
+                if todo_model.done:
+                    print(f'{todo_model.position}: {todo_model.title} {todo_model.description} (done)')
+                else:
+                    print(f'{todo_model.position}: {todo_model.title} {todo_model.description}')
+        if empty:
+            print('No todos to view. Please add a todo first!')
 
     def update_todo(self, todo_index: int) -> None:
         """
@@ -103,7 +360,7 @@ class DbTodoList(TodoList):
         This function queries the database to find the todo item with the given index and prompts the user to update the title and description. If the user confirms the update, the changes are committed to the database. If the update is cancelled or the todo_index is invalid, an appropriate message is printed.
         """
         try:
-            todo_model = self.session.query(TodoModel).filter_by(id=self.todos[todo_index].id).first()
+            todo_model = self.get_todo_model(todo_index)
             print(f'Current todo: title: {todo_model.title}  description: {todo_model.description}')
 
             update_title = input('Update title? (y/n): ')
@@ -130,6 +387,29 @@ class DbTodoList(TodoList):
         except (IndexError, ValueError):
             print('Invalid todo index. Please try again.')
 
+    def edit_todo(self, todo_index: int, title: str, description: str):
+        """
+        Sets the title and description of a todo item without prompting and commits the change.
+
+        Args:
+            todo_index (int): The index of the todo item to edit.
+            title (str): The new title of the todo item.
+            description (str): The new description of the todo item.
+
+        Returns:
+            TodoModel: The edited todo item, or None if the index is invalid.
+        """
+        try:
+            todo_model = self.get_todo_model(todo_index)
+        except (IndexError, ValueError):
+            print('Invalid todo index. Please try again.')
+            return None
+        todo_model.title = title
+        todo_model.description = description
+        self.session.commit()
+        print(f'Todo "{todo_model.title}" updated successfully!')
+        return todo_model
+
     def delete_todo(self, todo_index: int) -> None:
         """
         Deletes a todo item from the list of todos based on the provided index.
@@ -151,11 +431,20 @@ class DbTodoList(TodoList):
             - If the deletion is cancelled by the user, prints a message indicating that the deletion has been cancelled.
         """
         try:
-            todo_model = self.session.query(TodoModel).filter_by(id=self.todos[todo_index].id).first()
+            todo_index = int(todo_index)
+            if todo_index < 0:
+                todo_index += self.count()
+            todo_model = self.get_todo_model(todo_index)
             # confirm deletion
             if self.confirm(f'Confirm deletion of "{todo_model.title}"?'):
                 self.session.delete(todo_model)
+                self.session.flush()
+                self.close_gaps([todo_index])
                 self.session.commit()
+                if self.loaded:
+                    self.todos.pop(todo_index)
+                    if self.index is not None:
+                        self.index.remove(todo_model.id)
                 print(f'Todo "{todo_model.title}" deleted successfully!')
             else:
                 print('Deletion cancelled.')
@@ -173,7 +462,7 @@ class DbTodoList(TodoList):
             None
         """
         try:
-            todo_model = self.session.query(TodoModel).filter_by(id=self.todos[todo_index].id).first()
+            todo_model = self.get_todo_model(todo_index)
             print(f'Todo Index: {todo_index}')
             print(f'ID: {todo_model.id}')
             print(f'Title: {todo_model.title}')
@@ -186,7 +475,7 @@ class DbTodoList(TodoList):
         """
         Views all completed todos in the database.
 
-        This function retrieves all completed todo items from the database using a query to filter by the 'done' attribute set to 1. If no completed todos are found, it prints a message indicating that there are no completed todos to view. Otherwise, it iterates over the completed todos and prints their index, title, description, and done status.
+        This function streams the completed todo items from the database page by page, filtering by the 'done' attribute set to 1. If no completed todos are found, it prints a message indicating that there are no completed todos to view. Otherwise, it iterates over the completed todos and prints their index, title, description, and done status.
 
         Parameters:
             None
@@ -194,18 +483,19 @@ class DbTodoList(TodoList):
         Returns:
             None
         """
-        completed_todos = self.session.query(TodoModel).filter_by(done=1).all()
-        if not completed_todos:
+        index = 0
+        for page in self.iter_pages(done=1):
+            for todo_model in page:
+                index += 1
+                print(f'{index}: {todo_model.title} {todo_model.description} ({"Done" if todo_model.done else "Not done"})')
+        if not index:
             print('No completed todos to view.')
-            return
-        for index, todo_model in enumerate(completed_todos, start=1):
-            print(f'{index}: {todo_model.title} {todo_model.description} ({"Done" if todo_model.done else "Not done"})')
 
     def view_uncompleted_todos(self) -> None:
         """
         Views all uncompleted todos in the database.
 
-        This function retrieves all uncompleted todo items from the database using a query to filter by the 'done' attribute set to 0. If no uncompleted todos are found, it prints a message indicating that there are no uncompleted todos to view. Otherwise, it iterates over the uncompleted todos and prints their index, title, description, and done status.
+        This function streams the uncompleted todo items from the database page by page, filtering by the 'done' attribute set to 0. If no uncompleted todos are found, it prints a message indicating that there are no uncompleted todos to view. Otherwise, it iterates over the uncompleted todos and prints their index, title, description, and done status.
 
         Parameters:
             self (object): The instance of the class.
@@ -213,12 +503,92 @@ class DbTodoList(TodoList):
         Returns:
             None
         """
-        uncompleted_todos = self.session.query(TodoModel).filter_by(done=0).all()
-        if not uncompleted_todos:
+        index = 0
+        for page in self.iter_pages(done=0):
+            for todo_model in page:
+                index += 1
+                print(f'{index}: {todo_model.title} {todo_model.description} ({"Done" if todo_model.done else "Not done"})')
+        if not index:
             print('No uncompleted todos to view.')
-            return
-        for index, todo_model in enumerate(uncompleted_todos, start=1):
-            print(f'{index}: {todo_model.title} {todo_model.description} ({"Done" if todo_model.done else "Not done"})')
+
+    def add_many(self, items: list) -> list:
+        """
+        Adds many todo items to the database with a bulk insert after the first one and one commit.
+
+        Args:
+            items (list): (title, description) pairs of the todo items to add.
+
+        Returns:
+            list: The new todo items.
+        """
+        todos = [Todo(title, description) for title, description in items]
+        if todos:
+            self.insert_at_end(todos)
+            self.session.commit()
+            # the bulk insert bypasses the identity map, so load the todos again on the next `all()`
+            self.loaded = False
+            self.todos = []
+            self.index = None
+        print(f'{len(todos)} todo items saved successfully!')
+        return todos
+
+    def mark_many_done(self, todo_indexes: list) -> list:
+        """
+        Marks many todo items as done with a single bulk update and one commit.
+
+        Args:
+            todo_indexes (list): The indexes of the todo items to mark as done.
+
+        Returns:
+            list: The todo items that were marked as done.
+        """
+        todo_models = self.get_todo_models(self.valid_indexes(todo_indexes))
+        if todo_models:
+            # one flush that the unit of work batches into a single executemany UPDATE
+            for todo_model in todo_models:
+                todo_model.completed()
+            self.session.commit()
+            if self.loaded and self.index is not None:
+                for todo_model in todo_models:
+                    self.index.mark_done(todo_model.id)
+        print(f'{len(todo_models)} todo items marked as done successfully!')
+        return todo_models
+
+    def delete_many(self, todo_indexes: list, chunk_size: int = 500) -> list:
+        """
+        Deletes many todo items in one transaction, after a single confirmation.
+
+        The ids are deleted in chunks of `chunk_size` to stay below the database's limit on bound parameters.
+
+        Args:
+            todo_indexes (list): The indexes of the todo items to delete.
+            chunk_size (int): The number of ids per DELETE statement.
+
+        Returns:
+            list: The deleted todo items, empty if the deletion was cancelled.
+        """
+        positions = self.valid_indexes(todo_indexes)
+        if not positions:
+            print('No todos to delete.')
+            return []
+        if not self.confirm(f'Confirm deletion of {len(positions)} todos?'):
+            print('Deletion cancelled.')
+            return []
+        todo_models = self.get_todo_models(positions)
+        ids = [todo_model.id for todo_model in todo_models]
+        for start in range(0, len(ids), chunk_size):
+            statement = delete(TodoModel).where(TodoModel.id.in_(ids[start:start + chunk_size]))
+            self.session.execute(statement.execution_options(synchronize_session=False))
+        self.close_gaps(positions)
+        self.session.commit()
+        for todo_model in todo_models:
+            self.session.expunge(todo_model)
+        if self.loaded:
+            doomed = set(positions)
+            self.todos = [todo_model for position, todo_model in enumerate(self.todos) if position not in doomed]
+        self.index = None
+        print(f'{len(todo_models)} todo items deleted successfully!')
+        return todo_models
 
     def close(self):
         """
@@ -1,52 +1,328 @@
 from todolist import TodoList, Todo
+from lazytodos import LazyTodos
+from columnartodos import ColumnarTodos
+from serializers import JsonSerializer, get_serializer
+from contextlib import contextmanager
 import json
 import os
 
+try:
+    import fcntl
+except ImportError:
+    # not available on Windows, where shared todo lists are not supported
+    fcntl = None
+
 class FileTodoList(TodoList):
-    def __init__(self, filename: str):
+    # size in bytes after which the change log of a shared list is started afresh
+    changes_rotate_size = 1024 * 1024
+
+    def __init__(self, filename: str, streaming: bool = False, shared: bool = False, columnar: bool = False,
+                 file_format: str = None):
         """
         Initializes a new instance of the `FileTodoList` class.
 
+        The file is read and written by the serializer of its format, JSON or the compact binary format of
+        `BinarySerializer`, chosen by `file_format` or else by the file's extension.
+
+        A shared list can be used by several processes at once. Every change is made holding an advisory `fcntl`
+        lock on `filename.lock`, after bringing the todos up to date, and is appended to the change log
+        `filename.changes` before the file is replaced. Other processes check the generation number and size of the
+        change log before each operation and apply only the records they have not seen yet, so they reload the whole
+        file only when the log was started afresh. The size is compared rather than the modification time, whose
+        granularity can hide two changes made in quick succession, and the generation rather than the inode, which
+        the file system may reuse for a later log.
+
         Args:
             filename (str): The name of the file to load the todo list from.
+            streaming (bool): Whether to parse the file lazily, one todo at a time, instead of loading it all at once.
+            shared (bool): Whether other processes may change the file while it is in use.
+            columnar (bool): Whether to keep the todos in a compact `ColumnarTodos` store instead of a list of `Todo` objects.
+            file_format (str, optional): json or binary. Defaults to None, which chooses the format by extension.
 
         Returns:
             None
+
+        Raises:
+            ValueError: If a shared or binary list is streamed, the format is unknown, or a shared list is used on a
+                platform without `fcntl`.
         """
-        super().__init__()
+        super().__init__(columnar)
         self.filename = filename
+        self.streaming = streaming
+        self.shared = shared
+        self.columnar = columnar
+        self.serializer = get_serializer(filename, file_format)
+        if streaming and not isinstance(self.serializer, JsonSerializer):
+            raise ValueError('Only JSON todo lists can be streamed')
+        if shared:
+            if streaming:
+                raise ValueError('A shared todo list cannot be streamed')
+            if fcntl is None:
+                raise ValueError('Shared todo lists need fcntl, which is not available on this platform')
+            self.lock_filename = filename + '.lock'
+            self.changes_filename = filename + '.changes'
+            self.lock_file = None
+            # id -> (title, description, done) of each todo as it is in the file
+            self.saved = {}
+            self.changes_generation = None
+            self.changes_offset = 0
+            open(self.changes_filename, 'ab').close()
         self.load()
 
     def load(self) -> None:
         """
-        Loads todo list data from a JSON file based on the specified filename.
+        Loads todo list data from the file based on the specified filename.
+
+        In streaming mode the todos are wrapped in a `LazyTodos` sequence that parses the file as it is indexed or listed.
+        A shared list is loaded holding a shared lock, so no other process changes it meanwhile.
         """
+        if self.shared:
+            self.refresh()
+            return
         if os.path.exists(self.filename):
-            with open(self.filename, 'r') as f:
-                data = json.load(f)
-                for todo_data in data:
-                    todo = Todo(todo_data['title'], todo_data['description'])
-                    todo.id = todo_data['id']
-                    todo.done = todo_data['done']
-                    self.todos.append(todo)
+            if self.streaming:
+                self.todos = LazyTodos(self.filename)
+                self.index = None
+                return
+            self.todos = self.serializer.load(self.filename, self.columnar)
+            self.index = None
 
     def save(self) -> None:
         """
-        Saves the current list of todos to a file in JSON format.
+        Saves the current list of todos to the file in its format.
+
+        The todos are written to a temporary file that then replaces the file, so a crash while saving leaves the
+        previous file intact. A shared list first appends the changes made since it was last saved to the change log,
+        and is not written at all if there are none.
+
+        In streaming mode the todos are written one at a time to a temporary file, which then replaces the
+        file that is still being read from.
+
+        Returns:
+            None
+        """
+        if self.streaming:
+            self.save_streaming()
+            return
+        if self.shared:
+            records = self.changes()
+            if not records:
+                return
+            self.append_changes(records)
+        # one temporary file per process, so processes saving at once do not write into the same one
+        temp_filename = f'{self.filename}.{os.getpid()}.tmp'
+        with open(temp_filename, 'wb') as f:
+            self.serializer.dump(self.todos, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_filename, self.filename)
+        if self.shared and self.changes_offset >= self.changes_rotate_size:
+            # the file holds every change now, so the log can start afresh, headed by the next generation number
+            header = json.dumps({'generation': self.changes_generation + 1}).encode() + b'\n'
+            with open(self.changes_filename + '.tmp', 'wb') as f:
+                f.write(header)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(self.changes_filename + '.tmp', self.changes_filename)
+            self.changes_generation += 1
+            self.changes_offset = len(header)
+
+    @contextmanager
+    def locked(self, operation: int = None):
+        """
+        Holds the lock of a shared list, and brings the todos up to date once it is held.
+
+        Does nothing for a list that is not shared, or if this list holds the lock already.
+
+        Args:
+            operation (int, optional): `fcntl.LOCK_SH` or `fcntl.LOCK_EX`. Defaults to `fcntl.LOCK_EX`.
+
+        Yields:
+            None
+        """
+        if not self.shared or self.lock_file is not None:
+            yield
+            return
+        self.lock_file = open(self.lock_filename, 'a')
+        try:
+            fcntl.flock(self.lock_file, fcntl.LOCK_EX if operation is None else operation)
+            self.refresh()
+            yield
+        finally:
+            # closing the file releases the lock
+            self.lock_file.close()
+            self.lock_file = None
+
+    def refresh(self) -> None:
+        """
+        Applies the changes other processes made to a shared list since it was last refreshed.
+
+        Costs reading the first line of the change log if nothing changed. New records of the log are applied in
+        place, and the whole file is reloaded, holding a shared lock, only if the log was started afresh since, which
+        shows as a different generation number.
 
         Returns:
             None
         """
-        data = []
+        if not self.shared:
+            return
+        with open(self.changes_filename, 'rb') as f:
+            generation, start = self.read_generation(f)
+            if generation == self.changes_generation:
+                if os.fstat(f.fileno()).st_size != self.changes_offset:
+                    self.read_changes(f)
+                return
+            if self.lock_file is not None:
+                if os.path.exists(self.filename):
+                    self.todos = self.serializer.load(self.filename, self.columnar)
+                else:
+                    self.todos = ColumnarTodos() if self.columnar else []
+                self.index = None
+                self.saved = {todo.id: (todo.title, todo.description, todo.done) for todo in self.todos}
+                # replaying the whole log is harmless, the file may already hold some of its changes
+                self.changes_generation = generation
+                self.changes_offset = start
+                self.read_changes(f)
+                return
+        # refreshes again once the lock is held
+        with self.locked(fcntl.LOCK_SH):
+            return
+
+    @staticmethod
+    def read_generation(f) -> tuple:
+        """
+        Reads the generation number from the first line of a change log.
+
+        A log is headed by its generation number once it has been started afresh, the first log has none.
+
+        Args:
+            f (file): The change log, opened in binary mode at its start.
+
+        Returns:
+            tuple: The generation number, 0 for the first log, and the offset of the first record.
+        """
+        header = f.readline()
+        if header.startswith(b'{"generation":') and header.endswith(b'\n'):
+            return json.loads(header)['generation'], len(header)
+        return 0, 0
+
+    def read_changes(self, f) -> None:
+        """
+        Applies the records of the change log after the ones already applied.
+
+        A record that is still being written is left for the next refresh.
+
+        Args:
+            f (file): The change log, opened in binary mode, of the generation the applied records were read from.
+
+        Returns:
+            None
+        """
+        f.seek(self.changes_offset)
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            self.apply_change(json.loads(line))
+            self.changes_offset += len(line)
+
+    def apply_change(self, record: dict) -> None:
+        """
+        Applies a change log record to the todos in place, keeping the indexes up to date.
+
+        Records use the format of `JournalTodoList`: an `op` of add, done, update or delete, and the todo's id.
+
+        Args:
+            record (dict): The change log record.
+
+        Returns:
+            None
+        """
+        op, todo_id = record['op'], record['id']
+        if op == 'add':
+            if todo_id not in self.saved:
+                todo = Todo.restore(todo_id, record['title'], record['description'], False)
+                self.todos.append(todo)
+                if self.index is not None:
+                    self.index.add(todo.id, todo.done)
+                self.saved[todo_id] = (todo.title, todo.description, todo.done)
+            return
+        if todo_id not in self.saved:
+            return
+        if op == 'delete':
+            self.todos.pop(self.indexes().position(todo_id))
+            self.index.remove(todo_id)
+            del self.saved[todo_id]
+            return
+        todo = self.todos[self.indexes().position(todo_id)]
+        if op == 'done':
+            todo.completed()
+            self.index.mark_done(todo_id)
+        elif op == 'update':
+            todo.title = record['title']
+            todo.description = record['description']
+        self.saved[todo_id] = (todo.title, todo.description, todo.done)
+
+    def changes(self) -> list:
+        """
+        Returns the change log records of the changes made since the todos were last saved, and marks them as saved.
+
+        Returns:
+            list: The change log records.
+        """
+        records = []
+        saved = {}
         for todo in self.todos:
-            data.append({
-                'id': todo.id,
-                'title': todo.title,
-                'description': todo.description,
-                'done': todo.done
-            })
-        with open(self.filename, 'w') as f:
-            json.dump(data, f, indent=4)
+            before = self.saved.get(todo.id)
+            if before is None:
+                records.append({'op': 'add', 'id': todo.id, 'title': todo.title, 'description': todo.description})
+                before = (todo.title, todo.description, False)
+            if (todo.title, todo.description) != before[:2]:
+                records.append({'op': 'update', 'id': todo.id, 'title': todo.title, 'description': todo.description})
+            if todo.done and not before[2]:
+                records.append({'op': 'done', 'id': todo.id})
+            saved[todo.id] = (todo.title, todo.description, todo.done)
+        records.extend({'op': 'delete', 'id': todo_id} for todo_id in self.saved.keys() - saved.keys())
+        self.saved = saved
+        return records
+
+    def append_changes(self, records: list) -> None:
+        """
+        Appends records to the change log with a single write, and flushes them to disk.
+
+        Must be called holding the exclusive lock, after a refresh, so the log ends with the records already applied.
+
+        Args:
+            records (list): The change log records.
+
+        Returns:
+            None
+        """
+        lines = ''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in records).encode()
+        with open(self.changes_filename, 'ab') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        self.changes_offset += len(lines)
+
+    def save_streaming(self) -> None:
+        """
+        Saves the todos one at a time and reopens the saved file lazily.
+
+        Returns:
+            None
+        """
+        temp_filename = self.filename + '.tmp'
+        with open(temp_filename, 'w') as f:
+            f.write('[')
+            for index, todo in enumerate(self.todos):
+                f.write(',\n    ' if index else '\n    ')
+                f.write(json.dumps(todo.to_dict()))
+            f.write('\n]')
+        if isinstance(self.todos, LazyTodos):
+            self.todos.close()
+        os.replace(temp_filename, self.filename)
+        self.todos = LazyTodos(self.filename)
+        self.index = None
 
     def add_todo(self, title: str, description: str) -> None:
         """
@@ -59,8 +335,9 @@ class FileTodoList(TodoList):
         Returns:
             None
         """
-        super().add_todo(title, description)
-        self.save()
+        with self.locked():
+            super().add_todo(title, description)
+            self.save()
 
     def delete_todo(self, todo_index: int) -> None:
         """
@@ -72,8 +349,29 @@ class FileTodoList(TodoList):
         Returns:
             None
         """
-        super().delete_todo(todo_index)
-        self.save()
+        if not self.shared:
+            super().delete_todo(todo_index)
+            self.save()
+            return
+        # confirmed before the lock is taken, so a user at the prompt does not hold up the other processes
+        self.refresh()
+        if not self.todos:
+            print('No todos to delete. Please add a todo first!')
+            return
+        try:
+            todo = self.todos[int(todo_index)]
+        except (IndexError, ValueError):
+            print('Invalid todo index. Please try again.')
+            return
+        if not self.confirm(f'Confirm deletion of "{todo.title}"?'):
+            print('Deletion cancelled.')
+            return
+        todos = [(todo.id, todo.title)]
+        with self.locked():
+            positions = self.current_positions(todos)
+            if positions:
+                self.remove_todos(positions)
+                self.save()
 
     def mark_as_done(self, todo_index: int) -> None:
         """
@@ -84,8 +382,9 @@ class FileTodoList(TodoList):
         Returns:
             None
         """
-        super().mark_as_done(todo_index)
-        self.save()
+        with self.locked():
+            super().mark_as_done(todo_index)
+            self.save()
 
     def update_todo(self, todo_index: int) -> None:
         """
@@ -99,5 +398,203 @@ class FileTodoList(TodoList):
             None
 
         """
-        super().update_todo(todo_index)
-        self.save()
\ No newline at end of file
+        if not self.shared:
+            super().update_todo(todo_index)
+            self.save()
+            return
+        # prompted before the lock is taken, so a user at the prompt does not hold up the other processes
+        self.refresh()
+        if not self.todos:
+            print('No todos to update. Please add a todo first!')
+            return
+        try:
+            todo = self.todos[int(todo_index)]
+        except (IndexError, ValueError):
+            print('Invalid todo index. Please try again.')
+            return
+        todos = [(todo.id, todo.title)]
+        values = self.prompt_update(todo)
+        if values is None:
+            return
+        with self.locked():
+            positions = self.current_positions(todos)
+            if positions:
+                self.edit_todo(positions[0], *values)
+
+    def edit_todo(self, todo_index: int, title: str, description: str):
+        """
+        Sets the title and description of a todo item without prompting and saves the updated list.
+
+        Args:
+            todo_index (int): The index of the todo item to edit.
+            title (str): The new title of the todo item.
+            description (str): The new description of the todo item.
+
+        Returns:
+            Todo: The edited todo item, or None if the index is invalid.
+        """
+        with self.locked():
+            todo = super().edit_todo(todo_index, title, description)
+            if todo is not None:
+                self.save()
+        return todo
+
+    def add_many(self, items: list) -> list:
+        """
+        Adds many todo items to the list of todos and saves the list once.
+
+        Args:
+            items (list): (title, description) pairs of the todo items to add.
+
+        Returns:
+            list: The new todo items.
+        """
+        with self.locked():
+            todos = super().add_many(items)
+            self.save()
+        return todos
+
+    def mark_many_done(self, todo_indexes: list) -> list:
+        """
+        Marks many todo items as done and saves the list once.
+
+        Args:
+            todo_indexes (list): The indexes of the todo items to mark as done.
+
+        Returns:
+            list: The todo items that were marked as done.
+        """
+        with self.locked():
+            todos = super().mark_many_done(todo_indexes)
+            if todos:
+                self.save()
+        return todos
+
+    def delete_many(self, todo_indexes: list) -> list:
+        """
+        Deletes many todo items and saves the list once.
+
+        Args:
+            todo_indexes (list): The indexes of the todo items to delete.
+
+        Returns:
+            list: The deleted todo items, empty if the deletion was cancelled.
+        """
+        if not self.shared:
+            todos = super().delete_many(todo_indexes)
+            if todos:
+                self.save()
+            return todos
+        # confirmed before the lock is taken, so a user at the prompt does not hold up the other processes
+        self.refresh()
+        positions = self.valid_indexes(todo_indexes)
+        if not positions:
+            print('No todos to delete.')
+            return []
+        if not self.confirm(f'Confirm deletion of {len(positions)} todos?'):
+            print('Deletion cancelled.')
+            return []
+        todos = [(self.todos[position].id, self.todos[position].title) for position in positions]
+        with self.locked():
+            positions = self.current_positions(todos)
+            todos = self.remove_todos(positions) if positions else []
+            if todos:
+                self.save()
+        return todos
+
+    def current_positions(self, todos: list) -> list:
+        """
+        Returns the positions todo items have now, after the changes other processes made since they were read.
+
+        Must be called holding the lock. Todos that another process deleted meanwhile are reported and left out.
+
+        Args:
+            todos (list): The (id, title) pairs of the todo items, taken when they were read, since a todo of a
+                columnar list is only a view of whatever todo is at its position.
+
+        Returns:
+            list: The positions of the todo items that still exist, in ascending order.
+        """
+        positions = []
+        for todo_id, title in todos:
+            position = self.indexes().position(todo_id)
+            if position is None:
+                print(f'Todo "{title}" was deleted by another process.')
+            else:
+                positions.append(position)
+        return sorted(positions)
+
+    def count(self) -> int:
+        """
+        Returns the number of todo items, after applying the changes of other processes to a shared list.
+
+        Returns:
+            int: The number of todo items.
+        """
+        self.refresh()
+        return super().count()
+
+    def find_todo(self, todo_id: str):
+        """
+        Finds a todo item by its id, after applying the changes of other processes to a shared list.
+
+        Args:
+            todo_id (str): The id of the todo item.
+
+        Returns:
+            Todo: The todo item, or None if there is no todo with that id.
+        """
+        self.refresh()
+        return super().find_todo(todo_id)
+
+    def get_todo(self, todo_index: int) -> Todo:
+        """
+        Returns the todo item at the given index, after applying the changes of other processes to a shared list.
+
+        Args:
+            todo_index (int): The index of the todo item.
+
+        Returns:
+            Todo: The todo item.
+        """
+        self.refresh()
+        return super().get_todo(todo_index)
+
+    def todos_page(self, offset: int = 0, limit: int = 100, done: bool = None) -> list:
+        """
+        Returns one page of todo items together with their indexes, after applying the changes of other processes to a
+        shared list. See `TodoList.todos_page`.
+        """
+        self.refresh()
+        return super().todos_page(offset, limit, done)
+
+    def all(self) -> None:
+        """
+        Prints every todo item, after applying the changes of other processes to a shared list.
+        """
+        self.refresh()
+        super().all()
+
+    def view_todo(self, todo_index: int) -> None:
+        """
+        Prints the details of a todo item, after applying the changes of other processes to a shared list.
+
+        Args:
+            todo_index (int): The index of the todo item to view.
+        """
+        self.refresh()
+        super().view_todo(todo_index)
+
+    def view_completed_todos(self) -> None:
+        """
+        Prints the completed todo items, after applying the changes of other processes to a shared list.
+        """
+        self.refresh()
+        super().view_completed_todos()
+
+    def view_uncompleted_todos(self) -> None:
+        """
+        Prints the uncompleted todo items, after applying the changes of other processes to a shared list.
+        """
+        self.refresh()
+        super().view_uncompleted_todos()
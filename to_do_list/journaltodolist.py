@@ -0,0 +1,344 @@
+from filetodolist import FileTodoList
+from todolist import TodoList, Todo
+import threading
+import json
+import os
+
+class JournalTodoList(FileTodoList):
+    def __init__(self, filename: str, compact_threshold: int = 1024 * 1024, fsync: bool = True):
+        """
+        Initializes a new instance of the `JournalTodoList` class.
+
+        The todo list is stored as a JSON snapshot in `filename` plus an append-only journal in `filename.journal`.
+        Every mutation appends one compact record to the journal instead of rewriting the whole file.
+
+        Args:
+            filename (str): The name of the snapshot file to load the todo list from.
+            compact_threshold (int): Journal size in bytes after which a background compaction is started.
+            fsync (bool): Whether every journal record is flushed to disk with `os.fsync` before returning.
+
+        Returns:
+            None
+        """
+        self.journal_filename = filename + '.journal'
+        self.compacting_filename = filename + '.journal.compacting'
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+        self.lock = threading.Lock()
+        self.compactor = None
+        self.journal = None
+        # the snapshot is always JSON, written by `write_snapshot`
+        super().__init__(filename, file_format='json')
+        if os.path.exists(self.compacting_filename):
+            # an earlier compaction was interrupted, finish it before its journal is overwritten
+            self.write_snapshot(self.snapshot_data())
+        self.journal = open(self.journal_filename, 'a', encoding='utf-8')
+
+    def load(self) -> None:
+        """
+        Loads the snapshot file and replays the journals written after it.
+
+        A journal left behind by an interrupted compaction is replayed before the current journal.
+        Replaying is idempotent, so a journal whose changes already reached the snapshot is harmless.
+        """
+        super().load()
+        todos = {todo.id: todo for todo in self.todos}
+        for journal_filename in (self.compacting_filename, self.journal_filename):
+            self.replay(journal_filename, todos)
+        self.todos = list(todos.values())
+        self.index = None
+
+    def replay(self, journal_filename: str, todos: dict) -> None:
+        """
+        Applies the records of a journal file to a dictionary of todos keyed by id.
+
+        A torn record at the end of the journal, left by a crash mid-append, is discarded and truncated away.
+
+        Args:
+            journal_filename (str): The journal file to replay.
+            todos (dict): The todos to update, keyed by id.
+
+        Returns:
+            None
+        """
+        if not os.path.exists(journal_filename):
+            return
+        valid_size = 0
+        with open(journal_filename, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b'\n'):
+                    break
+                self.apply(record, todos)
+                valid_size += len(line)
+        if valid_size < os.path.getsize(journal_filename):
+            with open(journal_filename, 'r+b') as f:
+                f.truncate(valid_size)
+
+    @staticmethod
+    def apply(record: dict, todos: dict) -> None:
+        """
+        Applies a single journal record to a dictionary of todos keyed by id.
+
+        Args:
+            record (dict): The journal record with an `op` key of add, done, update or delete.
+            todos (dict): The todos to update, keyed by id.
+
+        Returns:
+            None
+        """
+        op = record['op']
+        if op == 'add':
+            if record['id'] not in todos:
+                todo = Todo(record['title'], record['description'])
+                todo.id = record['id']
+                todos[todo.id] = todo
+        elif op == 'done':
+            if record['id'] in todos:
+                todos[record['id']].done = True
+        elif op == 'update':
+            if record['id'] in todos:
+                todos[record['id']].title = record['title']
+                todos[record['id']].description = record['description']
+        elif op == 'delete':
+            todos.pop(record['id'], None)
+
+    def append(self, *records: dict) -> None:
+        """
+        Appends records to the journal and starts a background compaction once the journal is too large.
+
+        All records are written and fsynced together.
+
+        Args:
+            records (dict): The journal records to append.
+
+        Returns:
+            None
+        """
+        if not records:
+            return
+        lines = ''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in records)
+        with self.lock:
+            self.journal.write(lines)
+            self.journal.flush()
+            if self.fsync:
+                os.fsync(self.journal.fileno())
+            journal_size = self.journal.tell()
+        if journal_size >= self.compact_threshold:
+            self.compact()
+
+    def compact(self, wait: bool = False) -> None:
+        """
+        Writes the current todos to a new snapshot and starts a fresh journal.
+
+        The current journal is renamed so new mutations go to an empty journal right away,
+        and the snapshot is written and atomically swapped in on a background thread.
+
+        Args:
+            wait (bool): Whether to block until the snapshot has been written.
+
+        Returns:
+            None
+        """
+        if self.compactor is not None:
+            if not wait and self.compactor.is_alive():
+                return
+            self.compactor.join()
+        with self.lock:
+            data = self.snapshot_data()
+            self.journal.close()
+            os.replace(self.journal_filename, self.compacting_filename)
+            self.journal = open(self.journal_filename, 'a', encoding='utf-8')
+        self.compactor = threading.Thread(target=self.write_snapshot, args=(data,), daemon=True)
+        self.compactor.start()
+        if wait:
+            self.compactor.join()
+
+    def snapshot_data(self) -> list:
+        """
+        Returns the current todos as a list of dictionaries ready to be written to the snapshot.
+
+        Returns:
+            list: The todos as dictionaries.
+        """
+        return [todo.to_dict() for todo in self.todos]
+
+    def write_snapshot(self, data: list) -> None:
+        """
+        Writes the snapshot to a temporary file, fsyncs it and atomically replaces the snapshot file.
+
+        Args:
+            data (list): The todos to write, as a list of dictionaries.
+
+        Returns:
+            None
+        """
+        temp_filename = self.filename + '.tmp'
+        with open(temp_filename, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_filename, self.filename)
+        directory = os.open(os.path.dirname(os.path.abspath(self.filename)), os.O_RDONLY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+        os.remove(self.compacting_filename)
+
+    def save(self) -> None:
+        """
+        Writes a full snapshot of the todo list and waits for it to finish.
+
+        Returns:
+            None
+        """
+        self.compact(wait=True)
+
+    def add_todo(self, title: str, description: str) -> None:
+        """
+        Adds a new todo item to the list of todos and appends it to the journal.
+
+        Args:
+            title (str): The title of the todo item.
+            description (str): The description of the todo item.
+
+        Returns:
+            None
+        """
+        TodoList.add_todo(self, title, description)
+        todo = self.todos[-1]
+        self.append({'op': 'add', 'id': todo.id, 'title': todo.title, 'description': todo.description})
+
+    def delete_todo(self, todo_index: int) -> None:
+        """
+        Deletes a todo item from the list of todos and appends the deletion to the journal.
+
+        Args:
+            todo_index (int): The index of the todo item to delete.
+
+        Returns:
+            None
+        """
+        todo = self.journal_todo(todo_index)
+        count = len(self.todos)
+        TodoList.delete_todo(self, todo_index)
+        if todo is not None and len(self.todos) < count:
+            self.append({'op': 'delete', 'id': todo.id})
+
+    def mark_as_done(self, todo_index: int) -> None:
+        """
+        Marks a todo item as done at the specified index and appends the change to the journal.
+
+        Args:
+            todo_index (int): The index of the todo item to mark as done.
+
+        Returns:
+            None
+        """
+        TodoList.mark_as_done(self, todo_index)
+        todo = self.journal_todo(todo_index)
+        if todo is not None and todo.done:
+            self.append({'op': 'done', 'id': todo.id})
+
+    def update_todo(self, todo_index: int) -> None:
+        """
+        Updates a todo item based on the provided index and appends the change to the journal.
+
+        Args:
+            todo_index (int): The index of the todo item to update.
+
+        Returns:
+            None
+        """
+        todo = self.journal_todo(todo_index)
+        before = (todo.title, todo.description) if todo is not None else None
+        TodoList.update_todo(self, todo_index)
+        if todo is not None and (todo.title, todo.description) != before:
+            self.append({'op': 'update', 'id': todo.id, 'title': todo.title, 'description': todo.description})
+
+    def edit_todo(self, todo_index: int, title: str, description: str):
+        """
+        Sets the title and description of a todo item without prompting and appends the change to the journal.
+
+        Args:
+            todo_index (int): The index of the todo item to edit.
+            title (str): The new title of the todo item.
+            description (str): The new description of the todo item.
+
+        Returns:
+            Todo: The edited todo item, or None if the index is invalid.
+        """
+        todo = TodoList.edit_todo(self, todo_index, title, description)
+        if todo is not None:
+            self.append({'op': 'update', 'id': todo.id, 'title': todo.title, 'description': todo.description})
+        return todo
+
+    def add_many(self, items: list) -> list:
+        """
+        Adds many todo items to the list of todos and appends them to the journal with a single write.
+
+        Args:
+            items (list): (title, description) pairs of the todo items to add.
+
+        Returns:
+            list: The new todo items.
+        """
+        todos = TodoList.add_many(self, items)
+        self.append(*({'op': 'add', 'id': todo.id, 'title': todo.title, 'description': todo.description} for todo in todos))
+        return todos
+
+    def mark_many_done(self, todo_indexes: list) -> list:
+        """
+        Marks many todo items as done and appends the changes to the journal with a single write.
+
+        Args:
+            todo_indexes (list): The indexes of the todo items to mark as done.
+
+        Returns:
+            list: The todo items that were marked as done.
+        """
+        todos = TodoList.mark_many_done(self, todo_indexes)
+        self.append(*({'op': 'done', 'id': todo.id} for todo in todos))
+        return todos
+
+    def delete_many(self, todo_indexes: list) -> list:
+        """
+        Deletes many todo items and appends the deletions to the journal with a single write.
+
+        Args:
+            todo_indexes (list): The indexes of the todo items to delete.
+
+        Returns:
+            list: The deleted todo items, empty if the deletion was cancelled.
+        """
+        todos = TodoList.delete_many(self, todo_indexes)
+        self.append(*({'op': 'delete', 'id': todo.id} for todo in todos))
+        return todos
+
+    def journal_todo(self, todo_index: int):
+        """
+        Returns the todo item at the given index, or None if the index is invalid.
+
+        Args:
+            todo_index (int): The index of the todo item.
+
+        Returns:
+            Todo: The todo item, or None.
+        """
+        try:
+            return self.todos[int(todo_index)]
+        except (IndexError, ValueError, TypeError):
+            return None
+
+    def close(self) -> None:
+        """
+        Waits for a running compaction and closes the journal file.
+        """
+        if self.compactor is not None:
+            self.compactor.join()
+        if self.journal is not None:
+            self.journal.close()
@@ -0,0 +1,238 @@
+from collections.abc import MutableSequence
+from todo import Todo
+from array import array
+import codecs
+import json
+
+# entries with this bit set point into `LazyTodos.extra` instead of holding a file offset
+IN_MEMORY = 1 << 63
+
+def iter_json_array(filename: str, chunk_size: int = 1 << 16):
+    """
+    Parses a JSON array of objects from a file element by element.
+
+    The file is read in chunks, so only the current chunk and element are held in memory.
+
+    Args:
+        filename (str): The JSON file to read.
+        chunk_size (int): The number of bytes read at a time.
+
+    Yields:
+        tuple: The byte offset of each element in the file and the decoded element.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    with open(filename, 'rb') as f:
+        buffer = ''
+        position = 0
+        # byte offset in the file of buffer[mark]
+        mark = 0
+        mark_offset = 0
+        eof = False
+        started = False
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position < len(buffer):
+                if not started:
+                    if buffer[position] != '[':
+                        raise ValueError(f'{filename} does not contain a JSON array')
+                    started = True
+                    position += 1
+                    continue
+                if buffer[position] == ']':
+                    return
+                try:
+                    record, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    mark_offset += len(buffer[mark:position].encode('utf-8'))
+                    mark = position
+                    yield mark_offset, record
+                    position = end
+                    continue
+            elif eof:
+                raise ValueError(f'Unexpected end of JSON array in {filename}')
+            data = f.read(chunk_size)
+            eof = not data
+            mark_offset += len(buffer[mark:position].encode('utf-8'))
+            buffer = buffer[position:] + utf8.decode(data, final=eof)
+            mark = position = 0
+
+def read_json_at(f, offset: int, chunk_size: int = 4096):
+    """
+    Decodes the single JSON value that starts at a byte offset of an open binary file.
+
+    Args:
+        f (file): The file, opened in binary mode.
+        offset (int): The byte offset of the value.
+        chunk_size (int): The number of bytes read at a time.
+
+    Returns:
+        The decoded value.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    f.seek(offset)
+    buffer = ''
+    while True:
+        data = f.read(chunk_size)
+        buffer += utf8.decode(data, final=not data)
+        try:
+            return decoder.raw_decode(buffer)[0]
+        except json.JSONDecodeError:
+            if not data:
+                raise
+        chunk_size *= 2
+
+class LazyTodos(MutableSequence):
+    def __init__(self, filename: str):
+        """
+        Initializes a lazily loaded list of todos backed by a JSON todo file.
+
+        The file is scanned only as far as the requested index, and only the byte offset of each scanned todo is kept.
+        `Todo` objects are built when an index is accessed, and iterating builds a short-lived `Todo` for each item,
+        so listing a large file holds one todo at a time instead of the whole file.
+
+        Reading an index builds a new `Todo` each time. Only todos that are assigned or inserted are kept in memory,
+        so a todo changed in place must be assigned back to its index to keep the change.
+
+        Args:
+            filename (str): The JSON todo file to read.
+
+        Returns:
+            None
+        """
+        self.filename = filename
+        self.file = open(filename, 'rb')
+        self.scanner = iter_json_array(filename)
+        self.entries = array('Q')
+        self.extra = []
+        self.last_scanned = None
+
+    def scan(self, index: int) -> bool:
+        """
+        Scans the file until the todo at the given index has been found.
+
+        Args:
+            index (int): The index to scan up to.
+
+        Returns:
+            bool: True if the index exists, False otherwise.
+        """
+        while len(self.entries) <= index and self.scanner is not None:
+            try:
+                self.last_scanned = next(self.scanner)
+            except StopIteration:
+                self.scanner = None
+                break
+            self.entries.append(self.last_scanned[0])
+        return index < len(self.entries)
+
+    def pin(self, index: int, todo: Todo) -> None:
+        """
+        Keeps a todo in memory at the given index, replacing the one kept there before, so changes to it are not lost.
+
+        Args:
+            index (int): The index of the todo.
+            todo (Todo): The todo to keep.
+
+        Returns:
+            None
+        """
+        entry = self.entries[index]
+        if entry & IN_MEMORY:
+            self.extra[entry ^ IN_MEMORY] = todo
+            return
+        self.extra.append(todo)
+        self.entries[index] = IN_MEMORY | (len(self.extra) - 1)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if (index.start or 0) >= 0 and index.stop is not None and index.stop >= 0 and (index.step or 1) > 0:
+                # a forward slice only needs the file scanned as far as its end
+                self.scan(index.stop - 1)
+                size = len(self.entries)
+            else:
+                size = len(self)
+            return [self[i] for i in range(*index.indices(size))]
+        if index < 0:
+            index += len(self)
+        if index < 0 or not self.scan(index):
+            raise IndexError('todo index out of range')
+        entry = self.entries[index]
+        if entry & IN_MEMORY:
+            return self.extra[entry ^ IN_MEMORY]
+        return Todo.from_dict(read_json_at(self.file, entry))
+
+    def __setitem__(self, index, todo: Todo) -> None:
+        if index < 0:
+            index += len(self)
+        if index < 0 or not self.scan(index):
+            raise IndexError('todo index out of range')
+        self.pin(index, todo)
+
+    def __delitem__(self, index) -> None:
+        if index < 0:
+            index += len(self)
+        if index < 0 or not self.scan(index):
+            raise IndexError('todo index out of range')
+        del self.entries[index]
+
+    def insert(self, index: int, todo: Todo) -> None:
+        if index < 0:
+            index += len(self)
+        self.scan(index)
+        index = max(0, min(index, len(self.entries)))
+        self.entries.insert(index, 0)
+        self.pin(index, todo)
+
+    def __len__(self) -> int:
+        self.scan(float('inf'))
+        return len(self.entries)
+
+    def __bool__(self) -> bool:
+        return self.scan(0)
+
+    def __iter__(self):
+        """
+        Iterates over the todos, scanning the file only as far as the iteration goes.
+
+        Todos that were already scanned are re-read with a second streaming pass over the file.
+        """
+        stream = None
+        index = 0
+        try:
+            while True:
+                scanned = len(self.entries)
+                if not self.scan(index):
+                    return
+                entry = self.entries[index]
+                if entry & IN_MEMORY:
+                    yield self.extra[entry ^ IN_MEMORY]
+                elif index >= scanned:
+                    yield Todo.from_dict(self.last_scanned[1])
+                else:
+                    if stream is None:
+                        stream = iter_json_array(self.filename)
+                    for offset, record in stream:
+                        if offset == entry:
+                            break
+                    yield Todo.from_dict(record)
+                index += 1
+        finally:
+            if stream is not None:
+                stream.close()
+
+    def close(self) -> None:
+        """
+        Closes the todo file.
+        """
+        if self.scanner is not None:
+            self.scanner.close()
+        self.file.close()
+
+    def __repr__(self) -> str:
+        return f'LazyTodos({self.filename!r})'
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""todo list server load test
+
+Starts `server.py` on every backend in turn, or on the backends given as arguments, and reports the latency
+percentiles and throughput of concurrent clients:
+
+    ./loadtest.py                   # every backend
+    ./loadtest.py file database     # some backends
+"""
+from concurrent.futures import ThreadPoolExecutor
+import http.client
+import subprocess
+import tempfile
+import socket
+import random
+import json
+import time
+import sys
+import os
+
+BACKENDS = ('in_memory', 'file', 'journal', 'database')
+
+# share of each kind of request in the mix
+REQUEST_MIX = (('get', 50), ('page', 20), ('add', 15), ('done', 10), ('edit', 5))
+
+def free_port() -> int:
+    """
+    Returns a TCP port that is free on the loopback interface.
+
+    Returns:
+        int: The port.
+    """
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_server(backend: str, directory: str) -> tuple:
+    """
+    Starts `server.py` in a new process and waits until it accepts connections.
+
+    Args:
+        backend (str): The `TODO_LIST_OPTION` of the server.
+        directory (str): The directory of the todo file or database.
+
+    Returns:
+        tuple: The server process and its port.
+    """
+    port = free_port()
+    env = dict(os.environ,
+               TODO_LIST_OPTION=backend,
+               TODO_LIST_FILE=os.path.join(directory, backend + '.json'),
+               DATABASE_URL='sqlite:///' + os.path.join(directory, backend + '.db'),
+               TODO_SERVER_HOST='127.0.0.1',
+               TODO_SERVER_PORT=str(port),
+               TODO_SERVER_LOG='false')
+    server = subprocess.Popen([sys.executable, 'server.py'], cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+                              stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return server, port
+        except OSError:
+            if server.poll() is not None or time.monotonic() > deadline:
+                server.kill()
+                raise RuntimeError(f'The {backend} server did not start')
+            time.sleep(0.05)
+
+def percentile(latencies: list, fraction: float) -> float:
+    """
+    Returns a percentile of sorted latencies.
+
+    Args:
+        latencies (list): The latencies, in ascending order.
+        fraction (float): The percentile as a fraction, such as 0.99.
+
+    Returns:
+        float: The latency below which `fraction` of the latencies are.
+    """
+    return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+
+def run_client(port: int, requests: int, count: int, seed: int) -> list:
+    """
+    Sends a mix of requests over one keep-alive connection and measures each one.
+
+    Args:
+        port (int): The port of the server.
+        requests (int): The number of requests to send.
+        count (int): The number of todo items the list started with; requests name indexes below it.
+        seed (int): The seed of the random request mix.
+
+    Returns:
+        list: The latency of each request in seconds.
+    """
+    generator = random.Random(seed)
+    kinds = generator.choices([kind for kind, _ in REQUEST_MIX], [weight for _, weight in REQUEST_MIX], k=requests)
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    latencies = []
+    for number, kind in enumerate(kinds):
+        todo_index = generator.randrange(count)
+        if kind == 'get':
+            method, path, body = 'GET', f'/todos/{todo_index}', None
+        elif kind == 'page':
+            method, path, body = 'GET', f'/todos?offset={todo_index}&limit=20', None
+        elif kind == 'add':
+            method, path, body = 'POST', '/todos', {'title': f'client {seed} todo {number}', 'description': 'load test'}
+        elif kind == 'done':
+            method, path, body = 'POST', f'/todos/{todo_index}/done', None
+        else:
+            method, path, body = 'PUT', f'/todos/{todo_index}', {'title': f'edited by client {seed}', 'description': 'load test'}
+        start = time.perf_counter()
+        connection.request(method, path, None if body is None else json.dumps(body), {'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        if response.status >= 400:
+            raise RuntimeError(f'{method} {path} failed with {response.status}')
+    connection.close()
+    return latencies
+
+def load_test(backend: str, count: int = 10000, clients: int = 32, requests: int = 300) -> None:
+    """
+    Starts a server on a backend with `count` todo items and reports the latency and throughput of `clients`
+    concurrent clients each sending `requests` requests.
+
+    Args:
+        backend (str): The `TODO_LIST_OPTION` of the server.
+        count (int): The number of todo items in the list at the start.
+        clients (int): The number of concurrent clients, each with its own keep-alive connection.
+        requests (int): The number of requests sent by each client.
+
+    Returns:
+        None
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        server, port = start_server(backend, directory)
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port)
+            items = [{'title': f'title {index}', 'description': f'description {index}'} for index in range(count)]
+            connection.request('POST', '/todos', json.dumps(items), {'Content-Type': 'application/json'})
+            connection.getresponse().read()
+            connection.close()
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=clients) as executor:
+                results = list(executor.map(lambda seed: run_client(port, requests, count, seed), range(clients)))
+            elapsed = time.perf_counter() - start
+        finally:
+            server.terminate()
+            server.wait()
+    latencies = sorted(latency for result in results for latency in result)
+    print(f'  {backend:<10} {len(latencies) / elapsed:8.0f} requests/s'
+          f'   p50 {percentile(latencies, 0.5) * 1000:7.2f} ms   p99 {percentile(latencies, 0.99) * 1000:7.2f} ms')
+
+if __name__ == '__main__':
+    clients, requests, count = 32, 300, 10000
+    print(f'load test: {clients} clients x {requests} requests, {count} todos, '
+          + ', '.join(f'{weight}% {kind}' for kind, weight in REQUEST_MIX))
+    for backend in sys.argv[1:] or BACKENDS:
+        load_test(backend, count, clients, requests)
@@ -0,0 +1,307 @@
+from columnartodos import ColumnarTodos
+from lazytodos import iter_json_array
+from todo import Todo
+from contextlib import contextmanager
+from itertools import accumulate, chain, compress
+from array import array
+import struct
+import gc
+import json
+import sys
+import os
+
+# magic number, format version, reserved, number of todos
+BINARY_HEADER = struct.Struct('<4sHHQ')
+BINARY_MAGIC = b'TODO'
+BINARY_VERSION = 1
+
+# the done status of the 8 todos of each possible byte of done bits
+DONE_BITS = [tuple(bool(byte >> bit & 1) for bit in range(8)) for byte in range(256)]
+
+@contextmanager
+def paused_gc():
+    """
+    Pauses the garbage collector while many todos are created.
+
+    Todos hold no reference cycles, but allocating millions of them triggers full collections that scan every todo
+    created so far, which takes about as long as creating them.
+
+    Yields:
+        None
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def uuid_strings(ids: bytes, count: int) -> list:
+    """
+    Formats binary UUIDs as strings, like `str(uuid.UUID(bytes=...))` but for all of them at once.
+
+    Each hex digit column is copied into place with one strided slice assignment, so the work per UUID is done in C.
+
+    Args:
+        ids (bytes): The 16-byte binary UUIDs, back to back.
+        count (int): The number of UUIDs.
+
+    Returns:
+        list: The UUID strings.
+    """
+    digits = ids.hex().encode('ascii')
+    text = bytearray(b'-' * (36 * count))
+    position = 0
+    for digit in range(32):
+        if digit in (8, 12, 16, 20):
+            position += 1
+        text[position::36] = digits[digit::32]
+        position += 1
+    text = text.decode('ascii')
+    return [text[start:start + 36] for start in range(0, 36 * count, 36)]
+
+class JsonSerializer:
+    name = 'json'
+    extensions = ('.json',)
+
+    def dump(self, todos, f) -> None:
+        """
+        Writes todos as a pretty-printed JSON array, the same as `json.dump(data, f, indent=4)` would.
+
+        The todos are encoded one at a time, so a large columnar store is never copied into a list of dictionaries.
+
+        Args:
+            todos (list): The todos, or a `ColumnarTodos` store.
+            f (file): The file to write, opened in binary mode.
+
+        Returns:
+            None
+        """
+        first = True
+        for todo in todos:
+            f.write(b'[\n    ' if first else b',\n    ')
+            first = False
+            f.write(f'{{\n        "id": {json.dumps(todo.id)},\n        "title": {json.dumps(todo.title)},\n'
+                    f'        "description": {json.dumps(todo.description)},\n'
+                    f'        "done": {json.dumps(todo.done)}\n    }}'.encode('ascii'))
+        f.write(b'[]' if first else b'\n]')
+
+    def load(self, filename: str, columnar: bool = False):
+        """
+        Reads the todos of a JSON todo file.
+
+        A columnar store is filled while the file is parsed element by element, so the whole file is never held in
+        memory as a list of dictionaries.
+
+        Args:
+            filename (str): The JSON todo file.
+            columnar (bool): Whether to return a `ColumnarTodos` store instead of a list of `Todo` objects.
+
+        Returns:
+            list: The todos, or a `ColumnarTodos` store.
+        """
+        if columnar:
+            todos = ColumnarTodos()
+            for offset, todo_data in iter_json_array(filename):
+                todos.append(Todo.from_dict(todo_data))
+            return todos
+        with open(filename, 'rb') as f, paused_gc():
+            return [Todo.from_dict(todo_data) for todo_data in json.load(f)]
+
+class BinarySerializer:
+    """
+    A compact binary todo file, laid out as one column after another, all little-endian:
+        - a header: the magic number b'TODO', the format version, two reserved bytes and the number of todos.
+        - the ids, as 16-byte binary UUIDs.
+        - the done status, one bit per todo, bit `i % 8` of byte `i // 8` for todo `i`.
+        - the length prefixes of the strings, the UTF-8 byte lengths of each todo's title and description as
+          unsigned 32-bit integers.
+        - the strings, each todo's UTF-8 title and description, back to back.
+
+    Grouping the length prefixes in one column lets a reader compute every string's offset with a single pass over
+    an array, and the layout matches `ColumnarTodos`, so a columnar store is loaded without building a `Todo` per item.
+    """
+    name = 'binary'
+    extensions = ('.todos', '.bin')
+
+    def dump(self, todos, f) -> None:
+        """
+        Writes todos in the binary format.
+
+        Args:
+            todos (list): The todos, or a `ColumnarTodos` store.
+            f (file): The file to write, opened in binary mode.
+
+        Returns:
+            None
+        """
+        if isinstance(todos, ColumnarTodos):
+            ids, done_bits, lengths, text = self.store_columns(todos)
+        else:
+            ids, done_bits, lengths, text = self.todo_columns(todos)
+        if sys.byteorder == 'big':
+            lengths.byteswap()
+        f.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, 0, len(lengths) // 2))
+        f.write(ids)
+        f.write(done_bits)
+        f.write(lengths.tobytes())
+        f.write(text)
+
+    @staticmethod
+    def todo_columns(todos: list) -> tuple:
+        """
+        Returns the columns of a list of todo items.
+
+        Args:
+            todos (list): The todos.
+
+        Returns:
+            tuple: The ids, the done bits, the string lengths and the strings.
+        """
+        ids = bytes.fromhex(''.join([todo.id for todo in todos]).replace('-', ''))
+        done_bits = bytearray((len(todos) + 7) >> 3)
+        for index in compress(range(len(todos)), [todo.done for todo in todos]):
+            done_bits[index >> 3] |= 1 << (index & 7)
+        strings = [value.encode('utf-8') for todo in todos for value in (todo.title, todo.description)]
+        return ids, done_bits, array('I', map(len, strings)), b''.join(strings)
+
+    @staticmethod
+    def store_columns(store: ColumnarTodos) -> tuple:
+        """
+        Returns the columns of a `ColumnarTodos` store.
+
+        A store whose text already holds each title and description in order, such as one that was only appended to
+        or was loaded from a binary file, is written as it is. Otherwise the strings are gathered in order first.
+
+        Args:
+            store (ColumnarTodos): The store.
+
+        Returns:
+            tuple: The ids, the done bits, the string lengths and the strings.
+        """
+        count = len(store)
+        lengths = array('I', bytes(8 * count))
+        lengths[0::2] = array('I', store.title_spans[1::2])
+        lengths[1::2] = array('I', store.description_spans[1::2])
+        offsets = array('Q', bytes(16 * count))
+        offsets[0::2] = store.title_spans[0::2]
+        offsets[1::2] = store.description_spans[0::2]
+        expected = array('Q', accumulate(lengths, initial=0))
+        if expected[-1] == len(store.text) and offsets == expected[:-1]:
+            text = store.text
+        else:
+            view = memoryview(store.text)
+            text = b''.join(view[offset:offset + length] for offset, length in zip(offsets, lengths))
+        return store.ids, store.done_bits[:(count + 7) >> 3], lengths, text
+
+    def load(self, filename: str, columnar: bool = False):
+        """
+        Reads the todos of a binary todo file.
+
+        Args:
+            filename (str): The binary todo file.
+            columnar (bool): Whether to return a `ColumnarTodos` store instead of a list of `Todo` objects.
+
+        Returns:
+            list: The todos, or a `ColumnarTodos` store.
+
+        Raises:
+            ValueError: If the file is not a binary todo file, has an unknown version or is truncated.
+        """
+        with open(filename, 'rb') as f:
+            data = memoryview(f.read())
+        if len(data) < BINARY_HEADER.size:
+            raise ValueError(f'{filename} is not a binary todo file')
+        magic, version, reserved, count = BINARY_HEADER.unpack_from(data)
+        if magic != BINARY_MAGIC:
+            raise ValueError(f'{filename} is not a binary todo file')
+        if version != BINARY_VERSION:
+            raise ValueError(f'{filename} has version {version} of the binary todo format, only {BINARY_VERSION} is supported')
+        position = BINARY_HEADER.size
+        ids = data[position:position + 16 * count]
+        position += 16 * count
+        done_bits = data[position:position + ((count + 7) >> 3)]
+        position += (count + 7) >> 3
+        lengths = array('I')
+        lengths.frombytes(data[position:position + 8 * count])
+        if sys.byteorder == 'big':
+            lengths.byteswap()
+        position += 8 * count
+        text = data[position:]
+        offsets = array('Q', accumulate(lengths, initial=0))
+        if len(ids) < 16 * count or len(lengths) < 2 * count or len(text) != offsets[-1]:
+            raise ValueError(f'{filename} is truncated')
+        if columnar:
+            title_spans = array('Q', bytes(16 * count))
+            title_spans[0::2] = offsets[0:2 * count:2]
+            title_spans[1::2] = array('Q', lengths[0::2])
+            description_spans = array('Q', bytes(16 * count))
+            description_spans[0::2] = offsets[1:2 * count:2]
+            description_spans[1::2] = array('Q', lengths[1::2])
+            return ColumnarTodos.from_columns(ids, text, title_spans, description_spans, done_bits)
+        text = bytes(text)
+        if text.isascii():
+            # byte offsets are character offsets in ASCII text, so it is decoded once
+            strings = text.decode('ascii')
+            titles = [strings[start:end] for start, end in zip(offsets[0::2], offsets[1::2])]
+            descriptions = [strings[start:end] for start, end in zip(offsets[1::2], offsets[2::2])]
+        else:
+            titles = [text[start:end].decode('utf-8') for start, end in zip(offsets[0::2], offsets[1::2])]
+            descriptions = [text[start:end].decode('utf-8') for start, end in zip(offsets[1::2], offsets[2::2])]
+        todo_ids = uuid_strings(ids, count)
+        done = chain.from_iterable(map(DONE_BITS.__getitem__, done_bits))
+        with paused_gc():
+            return list(map(Todo.restore, todo_ids, titles, descriptions, done))
+
+SERIALIZERS = {serializer.name: serializer for serializer in (JsonSerializer(), BinarySerializer())}
+
+def get_serializer(filename: str, file_format: str = None):
+    """
+    Returns the serializer of a todo file.
+
+    Args:
+        filename (str): The todo file, whose extension chooses the format: .json, or .todos or .bin for binary.
+        file_format (str, optional): json or binary, which takes precedence over the extension, such as the
+            `TODO_LIST_FORMAT` setting. Defaults to None.
+
+    Returns:
+        Union[JsonSerializer, BinarySerializer]: The serializer, JSON for unknown extensions.
+
+    Raises:
+        ValueError: If the format is not json or binary.
+    """
+    if file_format:
+        if file_format.lower() not in SERIALIZERS:
+            raise ValueError(f'Unknown todo list format "{file_format}", use {" or ".join(SERIALIZERS)}')
+        return SERIALIZERS[file_format.lower()]
+    extension = os.path.splitext(filename)[1].lower()
+    for serializer in SERIALIZERS.values():
+        if extension in serializer.extensions:
+            return serializer
+    return SERIALIZERS['json']
+
+def convert(source: str, target: str, source_format: str = None, target_format: str = None) -> int:
+    """
+    Converts a todo file to another format.
+
+    The todos are read into a `ColumnarTodos` store, so files with millions of todos fit in memory, and the target
+    is written to a temporary file that then replaces it.
+
+    Args:
+        source (str): The todo file to read.
+        target (str): The todo file to write.
+        source_format (str, optional): The format of the source, instead of the one chosen by its extension.
+        target_format (str, optional): The format of the target, instead of the one chosen by its extension.
+
+    Returns:
+        int: The number of todos converted.
+    """
+    todos = get_serializer(source, source_format).load(source, columnar=True)
+    temp_filename = f'{target}.{os.getpid()}.tmp'
+    with open(temp_filename, 'wb') as f:
+        get_serializer(target, target_format).dump(todos, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_filename, target)
+    return len(todos)
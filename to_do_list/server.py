@@ -0,0 +1,574 @@
+#!/usr/bin/env python3
+"""todo list HTTP server
+
+Serves the todo list chosen by `TODO_LIST_OPTION` as JSON over HTTP/1.1, on `TODO_SERVER_HOST` and
+`TODO_SERVER_PORT`. Connections are kept alive between requests, and each one is served by its own thread.
+
+    GET    /todos?offset=0&limit=100&done=true   one page of todos, `done` is optional, `limit` at most 1000
+    GET    /todos/<index>                        one todo
+    POST   /todos                                add a todo {"title": ..., "description": ...}, or many as a list
+    PUT    /todos/<index>                        edit a todo {"title": ..., "description": ...}
+    POST   /todos/<index>/done                   mark a todo as done
+    DELETE /todos/<index>                        delete a todo
+    POST   /todos/done                           mark many todos as done {"indexes": [...]}
+    POST   /todos/delete                         delete many todos {"indexes": [...]}
+
+Every response carries the version of the list in its ETag header. A change request may send the version it was
+based on in an If-Match header, and is refused with 412 if the list changed since, for example when a deletion
+shifted the index it names.
+"""
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+from contextlib import redirect_stdout
+from app import create_todo_list
+import threading
+import json
+import io
+import os
+
+# the largest page of todos a request may ask for
+MAX_PAGE_SIZE = 1000
+
+class VersionConflict(Exception):
+    """
+    Raised when a change is based on an older version of the todo list than the current one.
+    """
+
+class CombinedRequest:
+    __slots__ = ('argument', 'result', 'finished')
+
+    def __init__(self, argument):
+        """
+        Initializes a request waiting to be applied together with other requests of the same kind.
+
+        Args:
+            argument: The argument of the request, such as the (title, description) pair of a todo to add.
+
+        Returns:
+            None
+        """
+        self.argument = argument
+        self.result = None
+        self.finished = False
+
+def todo_dict(index: int, todo) -> dict:
+    """
+    Returns the JSON representation of a todo item of any backend.
+
+    Args:
+        index (int): The index of the todo item.
+        todo: The `Todo`, columnar todo or `TodoModel`.
+
+    Returns:
+        dict: The index, id, title, description and done status of the todo item.
+    """
+    return {'index': index, 'id': todo.id, 'title': todo.title, 'description': todo.description, 'done': bool(todo.done)}
+
+class TodoService:
+    def __init__(self, todo_list):
+        """
+        Initializes a thread-safe service around a todo list of any backend.
+
+        None of the backends are thread-safe, so every call to the todo list is made holding `self.lock`, with the
+        messages it prints silenced. Requests are confirmed by being sent, so the list's confirmation prompt is
+        replaced by one that always agrees.
+
+        Concurrent requests to add todos or mark them as done are combined: a thread that gets the lock applies every
+        request of the same kind queued so far with one `add_many` or `mark_many_done` call, so a file list is saved
+        once and a database list commits once for the whole group instead of once per request.
+
+        Args:
+            todo_list (TodoList): The todo list to serve.
+
+        Returns:
+            None
+        """
+        self.todo_list = todo_list
+        self.todo_list.confirm = lambda prompt: True
+        self.lock = threading.Lock()
+        # incremented by every change, sent as the ETag of each response
+        self.version = 0
+        self.queue_lock = threading.Lock()
+        self.queues = {'add': [], 'done': []}
+
+    def call(self, method, *args):
+        """
+        Calls a todo list method with its output silenced. Must be called holding `self.lock`.
+
+        Args:
+            method (callable): The bound method of `self.todo_list`.
+            *args: The arguments of the method.
+
+        Returns:
+            The result of the method.
+        """
+        with redirect_stdout(io.StringIO()):
+            return method(*args)
+
+    def check_version(self, version) -> None:
+        """
+        Checks that a change is based on the current version of the todo list. Must be called holding `self.lock`.
+
+        Args:
+            version (int): The version the change is based on, or None to skip the check.
+
+        Returns:
+            None
+
+        Raises:
+            VersionConflict: If the todo list changed since that version.
+        """
+        if version is not None and version != self.version:
+            raise VersionConflict(f'The todo list is at version {self.version}, not {version}')
+
+    def check_index(self, todo_index: int) -> int:
+        """
+        Checks that a todo item exists at an index. Must be called holding `self.lock`.
+
+        Args:
+            todo_index (int): The index of the todo item.
+
+        Returns:
+            int: The index.
+
+        Raises:
+            IndexError: If there is no todo item at the index.
+        """
+        if not 0 <= todo_index < self.call(self.todo_list.count):
+            raise IndexError(f'No todo at index {todo_index}')
+        return todo_index
+
+    def combine(self, kind: str, argument, apply, version=None):
+        """
+        Applies a request together with the other requests of the same kind waiting for the lock.
+
+        Args:
+            kind (str): The queue of the request, "add" or "done".
+            argument: The argument of the request.
+            apply (callable): Applies the arguments of many requests holding `self.lock`, and returns their results
+                in the same order. A result may be an exception, which is raised in the thread of its request.
+            version (int, optional): The version the request is based on. A request with a version is applied on
+                its own, so it is checked against the version right before it.
+
+        Returns:
+            tuple: The result of the request and the version of the list after it.
+        """
+        if version is not None:
+            with self.lock:
+                self.check_version(version)
+                results = [(result, self.version) for result in apply([argument])]
+        else:
+            request = CombinedRequest(argument)
+            with self.queue_lock:
+                self.queues[kind].append(request)
+            with self.lock:
+                # an earlier lock holder may have applied this request already
+                if not request.finished:
+                    with self.queue_lock:
+                        batch, self.queues[kind] = self.queues[kind], []
+                    try:
+                        results = apply([waiting.argument for waiting in batch])
+                    except Exception as error:
+                        results = [error] * len(batch)
+                    for waiting, result in zip(batch, results):
+                        waiting.result = (result, self.version)
+                        waiting.finished = True
+            results = [request.result]
+        result, version = results[0]
+        if isinstance(result, Exception):
+            raise result
+        return result, version
+
+    def page(self, offset: int = 0, limit: int = 100, done: bool = None) -> tuple:
+        """
+        Returns one page of todo items.
+
+        Args:
+            offset (int): The number of matching todo items to skip.
+            limit (int): The maximum number of todo items to return.
+            done (bool, optional): Only return done or undone todos.
+
+        Returns:
+            tuple: The page, with the number of todo items in the list, and the version of the list.
+        """
+        with self.lock:
+            todos = self.call(self.todo_list.todos_page, offset, limit, done)
+            count = self.call(self.todo_list.count)
+            return {'count': count, 'todos': [todo_dict(index, todo) for index, todo in todos]}, self.version
+
+    def get(self, todo_index: int) -> tuple:
+        """
+        Returns a todo item.
+
+        Args:
+            todo_index (int): The index of the todo item.
+
+        Returns:
+            tuple: The todo item and the version of the list.
+        """
+        with self.lock:
+            self.check_index(todo_index)
+            return todo_dict(todo_index, self.call(self.todo_list.get_todo, todo_index)), self.version
+
+    def apply_add(self, items: list) -> list:
+        """
+        Adds todo items with one `add_many` call. Must be called holding `self.lock`.
+
+        Args:
+            items (list): (title, description) pairs of the todo items to add.
+
+        Returns:
+            list: The new todo items.
+        """
+        start = self.call(self.todo_list.count)
+        todos = self.call(self.todo_list.add_many, items)
+        self.version += 1
+        return [todo_dict(start + offset, todo) for offset, todo in enumerate(todos)]
+
+    def apply_done(self, todo_indexes: list) -> list:
+        """
+        Marks todo items as done with one `mark_many_done` call. Must be called holding `self.lock`.
+
+        Args:
+            todo_indexes (list): The indexes of the todo items.
+
+        Returns:
+            list: The todo item for each index, or an `IndexError` for an index without one.
+        """
+        count = self.call(self.todo_list.count)
+        positions = sorted({todo_index for todo_index in todo_indexes if 0 <= todo_index < count})
+        todos = dict(zip(positions, self.call(self.todo_list.mark_many_done, positions))) if positions else {}
+        if todos:
+            self.version += 1
+        return [todo_dict(todo_index, todos[todo_index]) if todo_index in todos else IndexError(f'No todo at index {todo_index}')
+                for todo_index in todo_indexes]
+
+    def add(self, title: str, description: str, version: int = None) -> tuple:
+        """
+        Adds a todo item, combined with other concurrent additions.
+
+        Args:
+            title (str): The title of the todo item.
+            description (str): The description of the todo item.
+            version (int, optional): The version the change is based on.
+
+        Returns:
+            tuple: The new todo item and the version of the list.
+        """
+        return self.combine('add', (title, description), self.apply_add, version)
+
+    def add_many(self, items: list, version: int = None) -> tuple:
+        """
+        Adds many todo items at once.
+
+        Args:
+            items (list): (title, description) pairs of the todo items to add.
+            version (int, optional): The version the change is based on.
+
+        Returns:
+            tuple: The new todo items and the version of the list.
+        """
+        with self.lock:
+            self.check_version(version)
+            return self.apply_add(items), self.version
+
+    def mark_done(self, todo_index: int, version: int = None) -> tuple:
+        """
+        Marks a todo item as done, combined with other concurrent requests to mark todos as done.
+
+        Args:
+            todo_index (int): The index of the todo item.
+            version (int, optional): The version the change is based on.
+
+        Returns:
+            tuple: The todo item and the version of the list.
+        """
+        return self.combine('done', todo_index, self.apply_done, version)
+
+    def mark_many_done(self, todo_indexes: list, version: int = None) -> tuple:
+        """
+        Marks many todo items as done at once. Indexes without a todo item are skipped.
+
+        Args:
+            todo_indexes (list): The indexes of the todo items.
+            version (int, optional): The version the change is based on.
+
+        Returns:
+            tuple: The todo items marked as done and the version of the list.
+        """
+        with self.lock:
+            self.check_version(version)
+            return [todo for todo in self.apply_done(todo_indexes) if not isinstance(todo, Exception)], self.version
+
+    def edit(self, todo_index: int, title: str, description: str, version: int = None) -> tuple:
+        """
+        Sets the title and description of a todo item.
+
+        Args:
+            todo_index (int): The index of the todo item.
+            title (str): The new title of the todo item.
+            description (str): The new description of the todo item.
+            version (int, optional): The version the change is based on.
+
+        Returns:
+            tuple: The edited todo item and the version of the list.
+        """
+        with self.lock:
+            self.check_version(version)
+            self.check_index(todo_index)
+            todo = self.call(self.todo_list.edit_todo, todo_index, title, description)
+            self.version += 1
+            return todo_dict(todo_index, todo), self.version
+
+    def delete_many(self, todo_indexes: list, version: int = None) -> tuple:
+        """
+        Deletes many todo items at once. Indexes without a todo item are skipped.
+
+        Args:
+            todo_indexes (list): The indexes of the todo items.
+            version (int, optional): The version the change is based on.
+
+        Returns:
+            tuple: The deleted todo items with the indexes they had, and the version of the list.
+        """
+        with self.lock:
+            self.check_version(version)
+            count = self.call(self.todo_list.count)
+            positions = sorted({todo_index for todo_index in todo_indexes if 0 <= todo_index < count})
+            todos = self.call(self.todo_list.delete_many, positions) if positions else []
+            if todos:
+                self.version += 1
+            return [todo_dict(position, todo) for position, todo in zip(positions, todos)], self.version
+
+    def delete(self, todo_index: int, version: int = None) -> tuple:
+        """
+        Deletes a todo item.
+
+        Args:
+            todo_index (int): The index of the todo item.
+            version (int, optional): The version the change is based on.
+
+        Returns:
+            tuple: The deleted todo item and the version of the list.
+        """
+        todos, version = self.delete_many([todo_index], version)
+        if not todos:
+            raise IndexError(f'No todo at index {todo_index}')
+        return todos[0], version
+
+    def close(self) -> None:
+        """
+        Closes the todo list if its backend has anything to close.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            if hasattr(self.todo_list, 'close'):
+                self.call(self.todo_list.close)
+
+class TodoRequestHandler(BaseHTTPRequestHandler):
+    # keep connections open between requests
+    protocol_version = 'HTTP/1.1'
+    # send each small response right away instead of waiting for the client's acknowledgement
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        self.dispatch('GET')
+
+    def do_POST(self) -> None:
+        self.dispatch('POST')
+
+    def do_PUT(self) -> None:
+        self.dispatch('PUT')
+
+    def do_DELETE(self) -> None:
+        self.dispatch('DELETE')
+
+    def dispatch(self, method: str) -> None:
+        """
+        Serves a request and sends its JSON response, turning errors into 4xx responses.
+
+        Args:
+            method (str): The HTTP method of the request.
+
+        Returns:
+            None
+        """
+        # read the body first, so the connection can be reused even if the request is refused
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        url = urlsplit(self.path)
+        try:
+            data = json.loads(body) if body else {}
+            status, result, version = self.route(method, url.path.strip('/').split('/'), parse_qs(url.query), data)
+        except VersionConflict as error:
+            status, result, version = 412, {'error': str(error)}, self.server.service.version
+        except KeyError as error:
+            status, result, version = 400, {'error': f'Missing field {error}'}, self.server.service.version
+        except LookupError as error:
+            status, result, version = 404, {'error': str(error)}, self.server.service.version
+        except (ValueError, TypeError, AttributeError) as error:
+            status, result, version = 400, {'error': str(error)}, self.server.service.version
+        except Exception as error:
+            status, result, version = 500, {'error': str(error)}, self.server.service.version
+        self.send_json(status, result, version)
+
+    def route(self, method: str, parts: list, query: dict, data) -> tuple:
+        """
+        Calls the service method for a request.
+
+        Args:
+            method (str): The HTTP method of the request.
+            parts (list): The segments of the request path.
+            query (dict): The query string parameters.
+            data: The decoded JSON body of the request.
+
+        Returns:
+            tuple: The status code, the result and the version of the list.
+
+        Raises:
+            LookupError: If the path or the todo item does not exist.
+            ValueError: If a parameter or the body is invalid.
+            VersionConflict: If the If-Match header names an older version of the list.
+        """
+        service = self.server.service
+        version = self.if_match()
+        if parts[0] != 'todos' or len(parts) > 3:
+            raise LookupError(f'No such path: {self.path}')
+        if len(parts) == 1:
+            if method == 'GET':
+                return (200, *service.page(*self.page_query(query)))
+            if method == 'POST':
+                if isinstance(data, list):
+                    return (201, *service.add_many([(item['title'], item.get('description', '')) for item in data], version))
+                return (201, *service.add(data['title'], data.get('description', ''), version))
+        elif parts[1] in ('done', 'delete') and len(parts) == 2:
+            if method == 'POST':
+                indexes = [int(todo_index) for todo_index in data['indexes']]
+                if parts[1] == 'done':
+                    return (200, *service.mark_many_done(indexes, version))
+                return (200, *service.delete_many(indexes, version))
+        else:
+            todo_index = int(parts[1])
+            if len(parts) == 3:
+                if parts[2] != 'done':
+                    raise LookupError(f'No such path: {self.path}')
+                if method == 'POST':
+                    return (200, *service.mark_done(todo_index, version))
+            elif method == 'GET':
+                return (200, *service.get(todo_index))
+            elif method == 'PUT':
+                return (200, *service.edit(todo_index, data['title'], data.get('description', ''), version))
+            elif method == 'DELETE':
+                return (200, *service.delete(todo_index, version))
+        return 405, {'error': f'{method} is not allowed on {self.path}'}, service.version
+
+    def page_query(self, query: dict) -> tuple:
+        """
+        Reads the offset, limit and done parameters of a request for a page of todos.
+
+        Args:
+            query (dict): The query string parameters.
+
+        Returns:
+            tuple: The offset, the limit and the done filter, None if there is none.
+
+        Raises:
+            ValueError: If the offset is negative, the limit is not between 1 and `MAX_PAGE_SIZE`, or done is not
+                true or false.
+        """
+        offset = int(query.get('offset', ['0'])[0])
+        limit = int(query.get('limit', ['100'])[0])
+        done = query.get('done', [None])[0]
+        if offset < 0:
+            raise ValueError(f'offset must not be negative, not {offset}')
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f'limit must be between 1 and {MAX_PAGE_SIZE}, not {limit}')
+        if done is not None:
+            if done.lower() not in ('true', 'false'):
+                raise ValueError(f'done must be true or false, not {done}')
+            done = done.lower() == 'true'
+        return offset, limit, done
+
+    def if_match(self):
+        """
+        Returns the version named by the If-Match header of the request.
+
+        Returns:
+            Union[int, None]: The version, or None if there is no If-Match header or it is "*".
+
+        Raises:
+            ValueError: If the header is not a version sent in an ETag.
+        """
+        etag = self.headers.get('If-Match')
+        if etag is None or etag.strip() == '*':
+            return None
+        return int(etag.strip().strip('"'))
+
+    def send_json(self, status: int, result, version: int) -> None:
+        """
+        Sends a JSON response with the version of the list as its ETag.
+
+        Args:
+            status (int): The status code.
+            result: The JSON-serializable result.
+            version (int): The version of the list.
+
+        Returns:
+            None
+        """
+        body = json.dumps(result).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', f'"{version}"')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.log_requests:
+            super().log_message(format, *args)
+
+class TodoServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # many clients may connect at once
+    request_queue_size = 128
+
+    def __init__(self, address: tuple, todo_list, log_requests: bool = True):
+        """
+        Initializes an HTTP server for a todo list, with one thread per connection.
+
+        Args:
+            address (tuple): The host and port to listen on.
+            todo_list (TodoList): The todo list to serve.
+            log_requests (bool): Whether to log each request to stderr.
+
+        Returns:
+            None
+        """
+        self.service = TodoService(todo_list)
+        self.log_requests = log_requests
+        super().__init__(address, TodoRequestHandler)
+
+def main() -> None:
+    todo_list_option = os.getenv('TODO_LIST_OPTION')
+    if todo_list_option in ('file', 'journal') and os.getenv('TODO_LIST_FILE') is None:
+        print('Set TODO_LIST_FILE to the file of the todo list. Exiting.')
+        return
+    todo_list = create_todo_list(todo_list_option)
+    if todo_list is None:
+        print('Set TODO_LIST_OPTION to in_memory, file, journal or database. Exiting.')
+        return
+    address = (os.getenv('TODO_SERVER_HOST', '127.0.0.1'), int(os.getenv('TODO_SERVER_PORT', '8000')))
+    server = TodoServer(address, todo_list, os.getenv('TODO_SERVER_LOG', 'true').lower() == 'true')
+    print(f'Serving {todo_list_option} list on http://{address[0]}:{server.server_address[1]}', flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print('Goodbye!')
+    finally:
+        server.server_close()
+        server.service.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+from asyncdbtodolist import AsyncDbTodoList, get_async_engine
+from dbtodolist import DbTodoList, TodoModel
+import asyncio
+import pytest
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{tmp_path / "todos.db"}')
+    monkeypatch.delenv('ASYNC_DATABASE_URL', raising=False)
+    get_async_engine.cache_clear()
+    todo_list = DbTodoList()
+    todo_list.add_many([(f't{index}', 'description') for index in range(3)])
+    yield todo_list
+    todo_list.close()
+    get_async_engine.cache_clear()
+
+async def add(title: str) -> None:
+    async with AsyncDbTodoList() as todo_list:
+        await todo_list.add_todo(title, 'description')
+
+async def add_concurrently(count: int) -> None:
+    await asyncio.gather(*(add(f'a{index}') for index in range(count)))
+    # pooled connections belong to this event loop
+    await get_async_engine().dispose()
+
+def test_concurrent_adds_take_distinct_positions(database):
+    asyncio.run(add_concurrently(20))
+    positions = [position for position, in database.session.query(TodoModel.position).order_by(TodoModel.position)]
+    assert positions == list(range(23))
+    pages = [todo_model.title for page in database.iter_pages(4) for todo_model in page]
+    assert len(pages) == 23 and pages[:3] == ['t0', 't1', 't2']
+
+def test_add_many_after_concurrent_adds(database):
+    asyncio.run(add_concurrently(5))
+    database.add_many([('m0', ''), ('m1', '')])
+    positions = dict(database.session.query(TodoModel.title, TodoModel.position))
+    assert sorted(positions.values()) == list(range(10))
+    assert positions['m1'] == positions['m0'] + 1 == 9
+
+def test_deletes_do_not_prompt(database, monkeypatch):
+    monkeypatch.setattr('builtins.input', lambda prompt='': pytest.fail('prompted'))
+
+    async def edit_and_delete():
+        async with AsyncDbTodoList() as todo_list:
+            await todo_list.edit_todo(0, 'edited', 'new')
+            await todo_list.delete_todo(1)
+            await todo_list.delete_many([0])
+        await get_async_engine().dispose()
+
+    asyncio.run(edit_and_delete())
+    database.session.expire_all()
+    assert [todo_model.title for page in database.iter_pages() for todo_model in page] == ['t2']
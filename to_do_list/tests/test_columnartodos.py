@@ -0,0 +1,106 @@
+from columnartodos import ColumnarTodos, ColumnarTodo
+from todo import Todo
+import random
+import pytest
+
+def dicts(todos) -> list:
+    return [todo.to_dict() for todo in todos]
+
+def make_todo(index: int, done: bool = False) -> Todo:
+    todo = Todo(f'title {index} é', f'description {index} ✓' * (index % 3))
+    todo.done = done
+    return todo
+
+@pytest.fixture
+def random_todos():
+    generator = random.Random(3)
+    return generator, [make_todo(index, generator.random() < 0.5) for index in range(40)]
+
+def test_insert_delete_and_mark_done_match_a_list(random_todos):
+    generator, todos = random_todos
+    expected = list(todos)
+    store = ColumnarTodos()
+    store.extend(todos)
+    assert dicts(store) == dicts(expected)
+    for step in range(600):
+        operation = generator.choice(['insert', 'delete', 'done', 'undone', 'edit', 'set'])
+        index = generator.randrange(-len(expected), len(expected)) if expected else 0
+        if operation == 'insert' or not expected:
+            todo = make_todo(100 + step, generator.random() < 0.5)
+            expected.insert(index, todo)
+            store.insert(index, todo)
+        elif operation == 'delete':
+            del expected[index]
+            del store[index]
+        elif operation in ('done', 'undone'):
+            expected[index].done = operation == 'done'
+            store[index].done = operation == 'done'
+        elif operation == 'edit':
+            expected[index].title = store[index].title = f'edited {step}'
+        else:
+            todo = make_todo(1000 + step, generator.random() < 0.5)
+            expected[index] = todo
+            store[index] = todo
+        assert len(store) == len(expected)
+        assert dicts(store) == dicts(expected), (step, operation, index)
+    # the garbage of edits and deletes is reclaimed along the way
+    assert store.garbage <= len(store.text)
+
+def test_done_bits_shift_across_bytes():
+    store = ColumnarTodos()
+    store.extend(make_todo(index, index % 3 == 0) for index in range(20))
+    expected = [index % 3 == 0 for index in range(20)]
+    for index in (0, 7, 8, 15, 16, 19):
+        store.insert(index, make_todo(-1, True))
+        expected.insert(index, True)
+        assert [todo.done for todo in store] == expected
+    for index in (23, 16, 8, 7, 0, -1):
+        del store[index]
+        del expected[index]
+        assert [todo.done for todo in store] == expected
+    assert len(store.done_bits) == (len(store) + 7) // 8
+
+def test_slices(random_todos):
+    generator, todos = random_todos
+    store = ColumnarTodos()
+    store.extend(todos)
+    for key in (slice(None), slice(5, 9), slice(-3, None), slice(None, None, -2), slice(30, 100), slice(10, 2)):
+        views = store[key]
+        assert all(isinstance(view, ColumnarTodo) for view in views)
+        assert dicts(views) == dicts(todos[key])
+
+def test_pop_returns_a_standalone_todo(random_todos):
+    generator, todos = random_todos
+    store = ColumnarTodos()
+    store.extend(todos[:3])
+    popped = store.pop(0)
+    assert type(popped) is Todo
+    assert popped.to_dict() == todos[0].to_dict()
+    # a view would now read the todo that moved into its place
+    store.pop()
+    inserted = make_todo(99)
+    store.insert(0, inserted)
+    assert popped.to_dict() == todos[0].to_dict()
+    assert dicts(store) == dicts([inserted, todos[1]])
+
+def test_index_errors():
+    store = ColumnarTodos()
+    store.append(make_todo(0))
+    for index in (1, -2):
+        with pytest.raises(IndexError):
+            store[index]
+        with pytest.raises(IndexError):
+            del store[index]
+
+def test_assigning_a_view_back_adds_no_garbage():
+    store = ColumnarTodos()
+    store.extend(make_todo(index) for index in range(3))
+    todo = store[1]
+    todo.completed()
+    text = len(store.text)
+    store[1] = todo
+    assert (len(store.text), store.garbage) == (text, 0)
+    assert store[1].done
+    # a view of another index copies its values
+    store[0] = store[2]
+    assert store[0].to_dict() == store[2].to_dict()
@@ -0,0 +1,91 @@
+from dbtodolist import DbTodoList
+import pytest
+
+@pytest.fixture
+def todo_list(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{tmp_path / "todos.db"}')
+    todo_list = DbTodoList()
+    todo_list.confirm = lambda prompt: True
+    for index in range(5):
+        todo_list.add_todo(f't{index}', 'description')
+    yield todo_list
+    todo_list.close()
+
+def printed_indexes(todo_list, capsys) -> list:
+    capsys.readouterr()
+    todo_list.all()
+    return [line.split(':')[0] for line in capsys.readouterr().out.splitlines()]
+
+@pytest.mark.parametrize('loaded', [False, True])
+def test_delete_todo_renumbers_held_todos(todo_list, capsys, loaded):
+    if loaded:
+        todo_list.load()
+    held = todo_list.get_todo_models([0, 1, 2, 3, 4])
+    todo_list.delete_todo(1)
+    assert printed_indexes(todo_list, capsys) == ['0', '1', '2', '3']
+    assert [(todo.title, todo.position) for todo in held if todo.title != 't1'] == [('t0', 0), ('t2', 1), ('t3', 2), ('t4', 3)]
+
+@pytest.mark.parametrize('loaded', [False, True])
+def test_delete_many_renumbers_held_todos(todo_list, capsys, loaded):
+    if loaded:
+        todo_list.load()
+    held = todo_list.get_todo_models([0, 1, 2, 3, 4])
+    todo_list.delete_many([1, 3])
+    assert printed_indexes(todo_list, capsys) == ['0', '1', '2']
+    assert [(todo.title, todo.position) for todo in held if todo.title in ('t0', 't2', 't4')] == [('t0', 0), ('t2', 1), ('t4', 2)]
+
+def page_titles(todo_list, page_size: int) -> list:
+    return [[todo.title for todo in page] for page in todo_list.iter_pages(page_size)]
+
+def test_pages_after_delete(todo_list):
+    todo_list.load()
+    todo_list.delete_todo(1)
+    assert page_titles(todo_list, 2) == [['t0', 't2'], ['t3', 't4']]
+    assert [(index, todo.title) for index, todo in todo_list.todos_page(0, 10)] == [(0, 't0'), (1, 't2'), (2, 't3'), (3, 't4')]
+
+def test_pages_after_delete_by_another_session(todo_list, capsys):
+    held = todo_list.get_todo_models([0, 1, 2, 3, 4])
+    other = DbTodoList()
+    other.confirm = lambda prompt: True
+    other.delete_many([1, 2])
+    other.close()
+    assert page_titles(todo_list, 2) == [['t0', 't3'], ['t4']]
+    assert printed_indexes(todo_list, capsys) == ['0', '1', '2']
+    assert [(index, todo.title) for index, todo in todo_list.todos_page(1, 10)] == [(1, 't3'), (2, 't4')]
+    assert [todo.position for todo in held if todo.title in ('t3', 't4')] == [1, 2]
+
+@pytest.fixture
+def loaded_list(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{tmp_path / "loaded.db"}')
+    todo_list = DbTodoList()
+    todo_list.confirm = lambda prompt: True
+    todo_list.add_many([('a', ''), ('b', ''), ('c', '')])
+    todo_list.load()
+    assert [todo_model.title for position, todo_model in todo_list.todos_page(done=False)] == ['a', 'b', 'c']
+    yield todo_list
+    todo_list.close()
+
+def undone_titles(todo_list) -> list:
+    return [(position, todo_model.title) for position, todo_model in todo_list.todos_page(done=False)]
+
+def test_filtered_pages_follow_mutations_of_a_loaded_list(loaded_list):
+    loaded_list.mark_as_done(0)
+    loaded_list.add_todo('d', '')
+    assert undone_titles(loaded_list) == [(1, 'b'), (2, 'c'), (3, 'd')]
+    loaded_list.delete_todo(1)
+    loaded_list.mark_many_done([0])
+    assert undone_titles(loaded_list) == [(1, 'c'), (2, 'd')]
+    loaded_list.delete_many([0])
+    assert undone_titles(loaded_list) == [(0, 'c'), (1, 'd')]
+
+@pytest.mark.parametrize('loaded', [False, True])
+def test_find_todo_after_add(loaded_list, loaded):
+    if not loaded:
+        loaded_list.loaded = False
+        loaded_list.todos = []
+        loaded_list.index = None
+    loaded_list.todos_page(done=False)
+    loaded_list.add_todo('d', '')
+    todo_model = loaded_list.get_todo(3)
+    assert loaded_list.find_todo(todo_model.id) is todo_model
+    assert loaded_list.find_todo('missing') is None
@@ -0,0 +1,78 @@
+from filetodolist import FileTodoList
+import pytest
+import fcntl
+
+@pytest.fixture
+def filename(tmp_path):
+    return str(tmp_path / 'todos.json')
+
+def shared_list(filename: str) -> FileTodoList:
+    todo_list = FileTodoList(filename, shared=True)
+    todo_list.changes_rotate_size = 300
+    return todo_list
+
+def test_no_lost_updates_across_log_rotations(filename, capsys):
+    a, b = shared_list(filename), shared_list(filename)
+    b.add_todo('b0', '')
+    # enough adds for the change log to be started afresh twice, which may reuse its first inode
+    for index in range(8):
+        a.add_todo(f'a{index}', '')
+    b.add_todo('b1', '')
+    titles = [todo.title for todo in FileTodoList(filename).todos]
+    assert sorted(titles) == sorted(['b0', 'b1'] + [f'a{index}' for index in range(8)])
+    a.load()
+    assert [todo.title for todo in a.todos] == [todo.title for todo in b.todos] == titles
+
+def test_changes_of_other_lists_are_applied(filename, capsys):
+    a, b = shared_list(filename), shared_list(filename)
+    for index in range(6):
+        a.add_todo(f'a{index}', '')
+        b.mark_as_done(index)
+    a.load()
+    assert [todo.done for todo in a.todos] == [True] * 6
+
+def lock_is_free(filename: str) -> bool:
+    with open(filename + '.lock', 'a') as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+
+@pytest.fixture
+def lists(filename, capsys):
+    a, b = FileTodoList(filename, shared=True), FileTodoList(filename, shared=True)
+    a.add_many([(f't{index}', '') for index in range(4)])
+    return a, b
+
+def prompting(answers: list, filename: str, while_prompted):
+    # answers the prompts of one list while checking that it holds no lock, and lets another list make a change
+    answers = iter(answers)
+
+    def prompt(text=''):
+        assert lock_is_free(filename)
+        while_prompted()
+        return next(answers)
+    return prompt
+
+def test_delete_todo_confirms_without_the_lock(filename, lists, monkeypatch):
+    a, b = lists
+    monkeypatch.setattr('builtins.input', prompting(['y'], filename, lambda: b.delete_todo(0) if b.count() == 4 else None))
+    b.confirm = lambda prompt: True
+    a.delete_todo(2)
+    assert [todo.title for todo in FileTodoList(filename).todos] == ['t1', 't3']
+
+def test_delete_many_confirms_without_the_lock(filename, lists, monkeypatch):
+    a, b = lists
+    b.confirm = lambda prompt: True
+    monkeypatch.setattr('builtins.input', prompting(['y'], filename, lambda: b.delete_todo(1) if b.count() == 4 else None))
+    assert [todo.title for todo in a.delete_many([0, 1, 3])] == ['t0', 't3']
+    assert [todo.title for todo in FileTodoList(filename).todos] == ['t2']
+
+def test_update_todo_prompts_without_the_lock(filename, lists, monkeypatch):
+    a, b = lists
+    b.confirm = lambda prompt: True
+    monkeypatch.setattr('builtins.input', prompting(['y', 'new', 'n', 'y'], filename,
+                                                    lambda: b.delete_todo(0) if b.count() == 4 else None))
+    a.update_todo(2)
+    assert [todo.title for todo in FileTodoList(filename).todos] == ['t1', 'new', 't3']
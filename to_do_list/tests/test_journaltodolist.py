@@ -0,0 +1,52 @@
+from journaltodolist import JournalTodoList
+import shutil
+import os
+import pytest
+
+def state(todo_list) -> list:
+    return [(todo.id, todo.title, todo.description, todo.done) for todo in todo_list.todos]
+
+@pytest.fixture
+def filename(tmp_path, capsys):
+    filename = str(tmp_path / 'todos.json')
+    todo_list = JournalTodoList(filename, fsync=False)
+    todo_list.confirm = lambda prompt: True
+    todo_list.add_many([(f't{index}', 'description') for index in range(5)])
+    todo_list.save()
+    todo_list.mark_as_done(0)
+    todo_list.edit_todo(1, 'edited', 'new')
+    todo_list.delete_todo(2)
+    todo_list.add_todo('added', 'after the snapshot')
+    todo_list.mark_as_done(4)
+    todo_list.delete_many([3])
+    todo_list.close()
+    return filename
+
+def reopen(filename: str) -> JournalTodoList:
+    todo_list = JournalTodoList(filename, fsync=False)
+    todo_list.close()
+    return todo_list
+
+def test_journal_is_replayed_over_the_snapshot(filename):
+    assert [(title, done) for _, title, _, done in state(reopen(filename))] == [
+        ('t0', True), ('edited', False), ('t3', False), ('added', True)]
+
+def test_replay_of_a_journal_already_in_the_snapshot(filename):
+    # a crash after the compacted snapshot was written but before its journal was removed
+    expected = state(reopen(filename))
+    shutil.copy(filename + '.journal', filename + '.journal.saved')
+    todo_list = JournalTodoList(filename, fsync=False)
+    todo_list.compact(wait=True)
+    todo_list.close()
+    os.replace(filename + '.journal.saved', filename + '.journal.compacting')
+    assert state(reopen(filename)) == expected
+    assert not os.path.exists(filename + '.journal.compacting')
+    assert state(reopen(filename)) == expected
+
+def test_torn_record_is_discarded(filename):
+    expected = state(reopen(filename))
+    with open(filename + '.journal', 'ab') as f:
+        f.write(b'{"op":"add","id":"torn","tit')
+    size = os.path.getsize(filename + '.journal')
+    assert state(reopen(filename)) == expected
+    assert os.path.getsize(filename + '.journal') < size
@@ -0,0 +1,68 @@
+from filetodolist import FileTodoList
+from lazytodos import LazyTodos
+from todo import Todo
+import pytest
+
+@pytest.fixture
+def filename(tmp_path, capsys):
+    filename = str(tmp_path / 'todos.json')
+    todo_list = FileTodoList(filename)
+    todo_list.add_many([(f't{index}', f'd{index}') for index in range(50)])
+    return filename
+
+def test_reads_keep_no_todos_in_memory(filename):
+    todos = LazyTodos(filename)
+    for _ in range(3):
+        for index in range(50):
+            assert todos[index].title == f't{index}'
+    assert [todo.title for todo in todos[10:13]] == ['t10', 't11', 't12']
+    assert todos.extra == []
+    todos.close()
+
+def test_assigning_an_index_again_replaces_the_kept_todo(filename):
+    todos = LazyTodos(filename)
+    for title in ('a', 'b', 'c'):
+        todo = todos[5]
+        todo.title = title
+        todos[5] = todo
+    assert todos[5].title == 'c'
+    assert len(todos.extra) == 1
+    todos.close()
+
+def test_forward_slices_scan_only_as_far_as_their_end(filename):
+    todos = LazyTodos(filename)
+    assert [todo.title for todo in todos[3:5]] == ['t3', 't4']
+    assert len(todos.entries) == 5
+    assert [todo.title for todo in todos[48:60]] == ['t48', 't49']
+    assert [todo.title for todo in todos[-2:]] == ['t48', 't49']
+    todos.close()
+
+def test_todos_page_does_not_scan_the_whole_file(filename):
+    todo_list = FileTodoList(filename, streaming=True)
+    page = todo_list.todos_page(offset=2, limit=3)
+    assert [(position, todo.title) for position, todo in page] == [(2, 't2'), (3, 't3'), (4, 't4')]
+    assert len(todo_list.todos.entries) == 5
+    assert [position for position, todo in todo_list.todos_page(offset=48, limit=5)] == [48, 49]
+
+def test_changes_in_place_are_kept_and_saved(filename, capsys):
+    todo_list = FileTodoList(filename, streaming=True)
+    todo_list.mark_as_done(1)
+    todo_list.edit_todo(2, 'edited', 'changed')
+    todo_list.mark_many_done([3, 4])
+    assert [todo.done for todo in FileTodoList(filename).todos[:6]] == [False, True, False, True, True, False]
+    todo = FileTodoList(filename).todos[2]
+    assert (todo.title, todo.description) == ('edited', 'changed')
+
+def test_update_todo_is_kept(filename, monkeypatch, capsys):
+    todo_list = FileTodoList(filename, streaming=True)
+    answers = iter(['y', 'new', 'n', 'y'])
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(answers))
+    todo_list.update_todo('7')
+    assert FileTodoList(filename).todos[7].title == 'new'
+
+def test_insert_is_kept(filename):
+    todos = LazyTodos(filename)
+    todos.insert(1, Todo('inserted', ''))
+    assert [todo.title for todo in todos[:3]] == ['t0', 'inserted', 't1']
+    assert len(todos) == 51
+    todos.close()
@@ -0,0 +1,61 @@
+from serializers import SERIALIZERS, convert
+from columnartodos import ColumnarTodos
+from todo import Todo
+import pytest
+
+TITLES = ['', 'plain', 'ünïcödé', 'emoji 📝', 'quote " and \\ backslash', 'line\nbreak', 'tab\there', '\x00nul']
+
+def make_todos(count: int) -> list:
+    return [Todo.restore(Todo('', '').id, TITLES[index % len(TITLES)], TITLES[-index % len(TITLES)] * (index % 3),
+                         index % 3 == 0) for index in range(count)]
+
+def as_tuples(todos) -> list:
+    return [(todo.id, todo.title, todo.description, todo.done) for todo in todos]
+
+def dump(serializer, todos, filename) -> str:
+    with open(filename, 'wb') as f:
+        serializer.dump(todos, f)
+    return filename
+
+@pytest.mark.parametrize('name', SERIALIZERS)
+@pytest.mark.parametrize('count', [0, 1, 8, 9, 17])
+@pytest.mark.parametrize('columnar', [False, True])
+def test_round_trip(tmp_path, name, count, columnar):
+    serializer = SERIALIZERS[name]
+    todos = make_todos(count)
+    if columnar:
+        store = ColumnarTodos()
+        store.extend(todos)
+        todos = store
+    filename = dump(serializer, todos, str(tmp_path / 'todos'))
+    for load_columnar in (False, True):
+        assert as_tuples(serializer.load(filename, load_columnar)) == as_tuples(todos)
+
+@pytest.mark.parametrize('name', SERIALIZERS)
+def test_edited_store_round_trip(tmp_path, name):
+    # edits leave the store's text out of order, which the binary format must gather back in order
+    store = ColumnarTodos()
+    store.extend(make_todos(20))
+    store[3].title = 'a much longer title than before'
+    store[5].description = ''
+    del store[7]
+    store[0].done = False
+    expected = as_tuples(store)
+    filename = dump(SERIALIZERS[name], store, str(tmp_path / 'todos'))
+    assert as_tuples(SERIALIZERS[name].load(filename, True)) == as_tuples(SERIALIZERS[name].load(filename)) == expected
+
+@pytest.mark.parametrize('name', SERIALIZERS)
+def test_files_are_rewritten_byte_for_byte(tmp_path, name):
+    serializer = SERIALIZERS[name]
+    first = dump(serializer, make_todos(17), str(tmp_path / 'first'))
+    second = dump(serializer, serializer.load(first), str(tmp_path / 'second'))
+    third = dump(serializer, serializer.load(first, True), str(tmp_path / 'third'))
+    with open(first, 'rb') as a, open(second, 'rb') as b, open(third, 'rb') as c:
+        assert a.read() == b.read() == c.read()
+
+def test_convert_round_trip(tmp_path):
+    source = dump(SERIALIZERS['json'], make_todos(17), str(tmp_path / 'todos.json'))
+    assert convert(source, str(tmp_path / 'todos.todos')) == 17
+    assert convert(str(tmp_path / 'todos.todos'), str(tmp_path / 'back.json')) == 17
+    with open(source, 'rb') as a, open(tmp_path / 'back.json', 'rb') as b:
+        assert a.read() == b.read()
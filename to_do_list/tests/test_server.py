@@ -0,0 +1,44 @@
+from server import TodoServer, MAX_PAGE_SIZE
+from http.client import HTTPConnection
+from todolist import TodoList
+import threading
+import pytest
+import json
+
+@pytest.fixture
+def connection(capsys):
+    todo_list = TodoList()
+    todo_list.add_many([(f't{index}', '') for index in range(5)])
+    todo_list.mark_as_done(1)
+    server = TodoServer(('127.0.0.1', 0), todo_list, log_requests=False)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    connection = HTTPConnection('127.0.0.1', server.server_address[1])
+    yield connection
+    connection.close()
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+def get(connection, path: str) -> tuple:
+    connection.request('GET', path)
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+def test_page(connection):
+    status, result = get(connection, '/todos?offset=1&limit=2')
+    assert status == 200
+    assert result['count'] == 5
+    assert [todo['title'] for todo in result['todos']] == ['t1', 't2']
+    status, result = get(connection, '/todos?done=TRUE')
+    assert [todo['title'] for todo in result['todos']] == ['t1']
+    status, result = get(connection, f'/todos?done=false&limit={MAX_PAGE_SIZE}')
+    assert [todo['title'] for todo in result['todos']] == ['t0', 't2', 't3', 't4']
+
+@pytest.mark.parametrize('query', [
+    'offset=-1', 'limit=0', 'limit=-5', f'limit={MAX_PAGE_SIZE + 1}', 'offset=x', 'done=yes',
+])
+def test_invalid_page_parameters_are_rejected(connection, query):
+    status, result = get(connection, f'/todos?{query}')
+    assert status == 400
+    assert 'error' in result
@@ -0,0 +1,64 @@
+from todoindex import TodoIndex
+from todolist import TodoList
+from todo import Todo
+import random
+import pytest
+
+def check(todo_list: TodoList) -> None:
+    # compares the indexes with positions found by scanning the list
+    index = todo_list.indexes()
+    todos = list(todo_list.todos)
+    for position, todo in enumerate(todos):
+        assert index.position(todo.id) == position
+    assert index.positions(True) == [position for position, todo in enumerate(todos) if todo.done]
+    assert index.positions(False) == [position for position, todo in enumerate(todos) if not todo.done]
+
+@pytest.mark.parametrize('columnar', [False, True], ids=['list', 'columnar'])
+def test_add_delete_and_mark_done_keep_the_indexes_in_step(columnar, capsys):
+    generator = random.Random(7)
+    todo_list = TodoList(columnar)
+    todo_list.add_many([(f't{index}', '') for index in range(10)])
+    todo_list.mark_as_done(3)
+    check(todo_list)
+    for step in range(400):
+        operation = generator.choice(['add', 'add', 'delete', 'delete many', 'done', 'done many'])
+        size = todo_list.count()
+        if operation == 'add' or size == 0:
+            todo_list.add_todo(f'a{step}', '')
+        elif operation == 'delete':
+            todo_list.remove_todos([generator.randrange(size)])
+        elif operation == 'delete many':
+            todo_list.remove_todos(sorted(generator.sample(range(size), min(size, 3))))
+        elif operation == 'done':
+            todo_list.mark_as_done(generator.randrange(size))
+        else:
+            todo_list.mark_many_done(generator.sample(range(size), min(size, 3)))
+        check(todo_list)
+        # an index built afresh agrees with the one kept up to date
+        assert TodoIndex(todo_list.todos).positions(False) == todo_list.indexes().positions(False)
+
+def test_removed_and_unknown_ids():
+    todos = [Todo(f't{index}', '') for index in range(5)]
+    index = TodoIndex(todos)
+    index.remove(todos[1].id)
+    index.remove(todos[1].id)
+    index.mark_done(todos[1].id)
+    assert index.position(todos[1].id) is None
+    assert index.position('unknown') is None
+    assert [index.position(todo.id) for todo in todos] == [0, None, 1, 2, 3]
+    assert index.positions(True) == []
+
+def test_adds_after_deletes_across_powers_of_two():
+    todos = [Todo(f't{index}', '') for index in range(3)]
+    index = TodoIndex(todos)
+    index.remove(todos[0].id)
+    index.remove(todos[2].id)
+    expected = [todos[1]]
+    # the new Fenwick nodes must count the deletions they cover
+    for number in range(70):
+        todo = Todo(f'n{number}', '')
+        index.add(todo.id, number % 2 == 0)
+        expected.append(todo)
+        if number % 5 == 4:
+            index.remove(expected.pop(1).id)
+        assert [index.position(todo.id) for todo in expected] == list(range(len(expected)))
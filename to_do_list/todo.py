@@ -1,5 +1,7 @@
 import uuid
 class Todo:
+    __slots__ = ('id', 'title', 'description', 'done')
+
     def __init__(self, title: str, description: str):
         """
         Initializes a new instance of the `Todo` class.
@@ -38,6 +40,54 @@ class Todo:
         """
         self.done = True
 
+    def to_dict(self) -> dict:
+        """
+        Returns a dictionary representation of the Todo instance.
+
+        Returns:
+            dict: A dictionary with the id, title, description, and done status of the todo item.
+        """
+        return {
+            'id': self.id,
+            'title': self.title,
+            'description': self.description,
+            'done': self.done
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Todo':
+        """
+        Creates a Todo instance from its dictionary representation.
+
+        Args:
+            data (dict): A dictionary with the id, title, description, and done status of the todo item.
+
+        Returns:
+            Todo: The todo item.
+        """
+        return cls.restore(data['id'], data['title'], data['description'], data['done'])
+
+    @classmethod
+    def restore(cls, todo_id: str, title: str, description: str, done: bool) -> 'Todo':
+        """
+        Creates a Todo instance for a saved todo item, without generating an id that would be replaced.
+
+        Args:
+            todo_id (str): The id of the todo item.
+            title (str): The title of the todo item.
+            description (str): The description of the todo item.
+            done (bool): Whether the todo item is done.
+
+        Returns:
+            Todo: The todo item.
+        """
+        todo = cls.__new__(cls)
+        todo.id = todo_id
+        todo.title = title
+        todo.description = description
+        todo.done = done
+        return todo
+
     def __repr__(self) -> str:
         """
         Returns a string representation of the Todo instance with its title, description, and done status.
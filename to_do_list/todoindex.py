@@ -0,0 +1,116 @@
+class TodoIndex:
+    def __init__(self, todos):
+        """
+        Initializes secondary indexes over a list of todos.
+
+        Every todo gets a sequence number in list order. Its current position is the sequence number minus the number
+        of todos deleted before it, which is counted with a Fenwick tree, so a deletion never renumbers the todos after it.
+
+        Args:
+            todos (list): The todos to index, in list order.
+
+        Returns:
+            None
+        """
+        self.sequences = {}
+        self.done = set()
+        self.undone = set()
+        for sequence, todo in enumerate(todos, start=1):
+            self.sequences[todo.id] = sequence
+            (self.done if todo.done else self.undone).add(sequence)
+        # Fenwick tree of deleted sequence numbers, 1-based
+        self.deleted = [0] * (len(self.sequences) + 1)
+
+    def deleted_before(self, sequence: int) -> int:
+        """
+        Returns the number of deleted todos with a sequence number up to the given one.
+
+        Args:
+            sequence (int): The sequence number.
+
+        Returns:
+            int: The number of deleted todos.
+        """
+        count = 0
+        while sequence > 0:
+            count += self.deleted[sequence]
+            sequence &= sequence - 1
+        return count
+
+    def add(self, todo_id: str, done: bool) -> None:
+        """
+        Indexes a todo appended to the end of the list.
+
+        Args:
+            todo_id (str): The id of the todo.
+            done (bool): Whether the todo is done.
+
+        Returns:
+            None
+        """
+        sequence = len(self.deleted)
+        # a new Fenwick node covers (sequence - lowbit, sequence], whose deletions are already counted
+        self.deleted.append(self.deleted_before(sequence - 1) - self.deleted_before(sequence - (sequence & -sequence)))
+        self.sequences[todo_id] = sequence
+        (self.done if done else self.undone).add(sequence)
+
+    def remove(self, todo_id: str) -> None:
+        """
+        Removes a deleted todo from the indexes.
+
+        Args:
+            todo_id (str): The id of the todo.
+
+        Returns:
+            None
+        """
+        sequence = self.sequences.pop(todo_id, None)
+        if sequence is None:
+            return
+        self.done.discard(sequence)
+        self.undone.discard(sequence)
+        while sequence < len(self.deleted):
+            self.deleted[sequence] += 1
+            sequence += sequence & -sequence
+
+    def mark_done(self, todo_id: str) -> None:
+        """
+        Moves a todo to the done index.
+
+        Args:
+            todo_id (str): The id of the todo.
+
+        Returns:
+            None
+        """
+        sequence = self.sequences.get(todo_id)
+        if sequence is not None:
+            self.undone.discard(sequence)
+            self.done.add(sequence)
+
+    def position(self, todo_id: str):
+        """
+        Returns the current list position of a todo.
+
+        Args:
+            todo_id (str): The id of the todo.
+
+        Returns:
+            int: The position of the todo, or None if there is no todo with that id.
+        """
+        sequence = self.sequences.get(todo_id)
+        if sequence is None:
+            return None
+        return sequence - 1 - self.deleted_before(sequence)
+
+    def positions(self, done: bool) -> list:
+        """
+        Returns the list positions of all done or all undone todos, in list order.
+
+        Args:
+            done (bool): Whether to return the done or the undone todos.
+
+        Returns:
+            list: The positions of the todos.
+        """
+        return [sequence - 1 - self.deleted_before(sequence) for sequence in sorted(self.done if done else self.undone)]
@@ -1,11 +1,93 @@
 from todo import Todo
+from columnartodos import ColumnarTodos
+from todoindex import TodoIndex
 
 class TodoList:
-    def __init__(self):
+    def __init__(self, columnar: bool = False):
         """
         Initializes a new instance of the `TodoList` class.
+
+        Args:
+            columnar (bool): Whether to keep the todos in a compact `ColumnarTodos` store instead of a list of `Todo` objects.
+        """
+        self.todos = ColumnarTodos() if columnar else []
+        self.index = None
+
+    def indexes(self) -> TodoIndex:
+        """
+        Returns the id and status indexes of the todo list, building them on first use.
+
+        Once built, the indexes are kept up to date by `add_todo`, `delete_todo` and `mark_as_done`.
+        Code that replaces `self.todos` must reset `self.index` to None.
+
+        Code that changes a todo in place assigns it back to its index as well, since a `LazyTodos` store only keeps
+        the changes of todos assigned to it.
+
+        Returns:
+            TodoIndex: The indexes of the todo list.
+        """
+        if self.index is None:
+            self.index = TodoIndex(self.todos)
+        return self.index
+
+    def count(self) -> int:
+        """
+        Returns the number of todo items in the list.
+
+        Returns:
+            int: The number of todo items.
+        """
+        return len(self.todos)
+
+    def find_todo(self, todo_id: str):
+        """
+        Finds a todo item by its id.
+
+        Parameters:
+            todo_id (str): The id of the todo item.
+
+        Returns:
+            Todo: The todo item, or None if there is no todo with that id.
+        """
+        position = self.indexes().position(todo_id)
+        if position is None:
+            return None
+        return self.todos[position]
+
+    def get_todo(self, todo_index: int) -> Todo:
         """
-        self.todos = []
+        Returns the todo item at the given index.
+
+        Args:
+            todo_index (int): The index of the todo item.
+
+        Returns:
+            Todo: The todo item.
+
+        Raises:
+            IndexError: If there is no todo item at the index.
+            ValueError: If the index is not an integer.
+        """
+        return self.todos[int(todo_index)]
+
+    def todos_page(self, offset: int = 0, limit: int = 100, done: bool = None) -> list:
+        """
+        Returns one page of todo items together with their indexes, in list order.
+
+        Args:
+            offset (int): The number of matching todo items to skip.
+            limit (int): The maximum number of todo items to return.
+            done (bool, optional): Only return done todos if True, or undone todos if False. Defaults to None,
+                which returns every todo.
+
+        Returns:
+            list: (index, todo) pairs.
+        """
+        if done is None:
+            # sliced rather than clamped to `count`, which would scan the whole file of a `LazyTodos` store
+            return list(enumerate(self.todos[offset:offset + limit], offset))
+        positions = self.indexes().positions(done)[offset:offset + limit]
+        return [(position, self.todos[position]) for position in positions]
 
     def add_todo(self, title: str, description: str) -> None:
         """
@@ -20,6 +102,8 @@ class TodoList:
         """
         todo = Todo(title, description)
         self.todos.append(todo)
+        if self.index is not None:
+            self.index.add(todo.id, todo.done)
         print(f'Todo item {todo.id} saved successfully!')
 
     def mark_as_done(self, todo_index: int) -> None:
@@ -35,6 +119,9 @@ class TodoList:
         try:
             todo = self.todos[todo_index]
             todo.completed()
+            self.todos[todo_index] = todo
+            if self.index is not None:
+                self.index.mark_done(todo.id)
             print(f'Todo "{todo.title}" marked as done successfully!')
         except (IndexError, ValueError):
             print('Invalid todo index. Please try again.')
@@ -46,7 +133,7 @@ class TodoList:
         This method iterates over the `self.todos` list and prints the index and title, description of each todo item.
         If the todo item is marked as done, it also prints the description in parentheses.
         """
-        if len(self.todos) == 0:
+        if not self.todos:
             print('No todos to delete. Please add a todo first!')
             return
         for index, todo in enumerate(self.todos):
@@ -65,36 +152,73 @@ class TodoList:
         Returns:
             None
         """
-        if len(self.todos) == 0:
+        if not self.todos:
             print('No todos to update. Please add a todo first!')
             return
         try:
             todo_index = int(todo_index)
             todo = self.todos[todo_index]
-            print(f'Current todo: title: {todo.title}  description: {todo.description}')
+        except (IndexError, ValueError):
+            print('Invalid todo index. Please try again.')
+            return
+        values = self.prompt_update(todo)
+        if values is not None:
+            todo.title, todo.description = values
+            self.todos[todo_index] = todo
+            print(f'Todo "{todo.title}" updated successfully!')
 
-            update_title = input('Update title ? (y/n): ')
-            if update_title.lower() == 'y':
-                new_title = input(f'Enter new title for "{todo.title}": ')
-            else:
-                new_title = todo.title
-            update_description = input('Update description ? (y/n): ')
-            if update_description.lower() == 'y':
-                new_description = input(f'Enter new description for "{todo.title} Current description is {todo.description}": ')
-            else:
-                new_description = todo.description
-            if update_description.lower() != 'y' and update_title.lower() != 'y':
-                print('Update cancelled.')
-                return
-            # confirm update
-            if self.confirm(f'Confirm update of "{todo.title}" to title "{new_title}" and description "{new_description}"?'):
-                todo.title = new_title
-                todo.description = new_description
-                print(f'Todo "{todo.title}" updated successfully!')
-            else:
-                print('Update cancelled.')
+    def prompt_update(self, todo) -> tuple:
+        """
+        Prompts the user for the new title and description of a todo item, and to confirm the update.
+
+        Args:
+            todo (Todo): The todo item to update, which is not changed.
+
+        Returns:
+            tuple: The new title and description, or None if the update was cancelled.
+        """
+        print(f'Current todo: title: {todo.title}  description: {todo.description}')
+        update_title = input('Update title ? (y/n): ')
+        if update_title.lower() == 'y':
+            new_title = input(f'Enter new title for "{todo.title}": ')
+        else:
+            new_title = todo.title
+        update_description = input('Update description ? (y/n): ')
+        if update_description.lower() == 'y':
+            new_description = input(f'Enter new description for "{todo.title} Current description is {todo.description}": ')
+        else:
+            new_description = todo.description
+        if update_description.lower() != 'y' and update_title.lower() != 'y':
+            print('Update cancelled.')
+            return None
+        # confirm update
+        if not self.confirm(f'Confirm update of "{todo.title}" to title "{new_title}" and description "{new_description}"?'):
+            print('Update cancelled.')
+            return None
+        return new_title, new_description
+
+    def edit_todo(self, todo_index: int, title: str, description: str):
+        """
+        Sets the title and description of a todo item without prompting, for callers that are not interactive.
+
+        Args:
+            todo_index (int): The index of the todo item to edit.
+            title (str): The new title of the todo item.
+            description (str): The new description of the todo item.
+
+        Returns:
+            Todo: The edited todo item, or None if the index is invalid.
+        """
+        try:
+            todo = self.get_todo(todo_index)
         except (IndexError, ValueError):
             print('Invalid todo index. Please try again.')
+            return None
+        todo.title = title
+        todo.description = description
+        self.todos[int(todo_index)] = todo
+        print(f'Todo "{todo.title}" updated successfully!')
+        return todo
 
     def delete_todo(self, todo_index: int) -> None:
         """
@@ -116,14 +240,16 @@ class TodoList:
             - If the provided todo index is invalid, prints an error message indicating that the todo index is invalid.
             - If the deletion is cancelled by the user, prints a message indicating that the deletion has been cancelled.
         """
-        if len(self.todos) == 0:
+        if not self.todos:
             print('No todos to delete. Please add a todo first!')
             return
         try:
             todo = self.todos[todo_index]
             # confirm deletion
             if self.confirm(f'Confirm deletion of "{todo.title}"?'):
-                self.todos.pop(todo_index)
+                todo = self.todos.pop(todo_index)
+                if self.index is not None:
+                    self.index.remove(todo.id)
                 print(f'Todo "{todo.title}" deleted successfully!')
             else:
                 print('Deletion cancelled.')
@@ -140,7 +266,7 @@ class TodoList:
         Returns:
             None
         """
-        if len(self.todos) == 0:
+        if not self.todos:
             print('No todos to view. Please add a todo first!')
             return
         try:
@@ -157,7 +283,7 @@ class TodoList:
         """
         View the completed todos in the todo list.
 
-        This function retrieves the completed todos from the `todos` list and prints their index, title, and description.
+        This function looks up the completed todos in the status index and prints their index, title, and description.
         If there are no completed todos, a message indicating that there are no completed todos to view is printed.
 
         Parameters:
@@ -166,7 +292,7 @@ class TodoList:
         Returns:
             None
         """
-        completed_todos = [todo for todo in self.todos if todo.done]
+        completed_todos = [self.todos[position] for position in self.indexes().positions(done=True)]
         if not completed_todos:
             print('No completed todos to view.')
             return
@@ -177,7 +303,7 @@ class TodoList:
         """
         View the uncompleted todos in the todo list.
 
-        This function retrieves the uncompleted todos from the `todos` list and prints their index, title, and description.
+        This function looks up the uncompleted todos in the status index and prints their index, title, and description.
         If there are no uncompleted todos, a message indicating that there are no uncompleted todos to view is printed.
 
         Parameters:
@@ -186,13 +312,118 @@ class TodoList:
         Returns:
             None
         """
-        uncompleted_todos = [todo for todo in self.todos if not todo.done]
+        uncompleted_todos = [self.todos[position] for position in self.indexes().positions(done=False)]
         if not uncompleted_todos:
             print('No uncompleted todos to view.')
             return
         for index, todo in enumerate(uncompleted_todos, start=1):
             print(f'{index}: {todo.title} {todo.description} ({"Done" if todo.done else "Not done"})')
 
+    def valid_indexes(self, todo_indexes: list) -> list:
+        """
+        Normalizes a list of todo indexes, dropping duplicates and reporting invalid ones.
+
+        Parameters:
+            todo_indexes (list): The indexes of the todo items.
+
+        Returns:
+            list: The valid, non-negative indexes in ascending order.
+        """
+        size = self.count()
+        positions = set()
+        for todo_index in todo_indexes:
+            try:
+                position = int(todo_index)
+            except (TypeError, ValueError):
+                position = size
+            if position < 0:
+                position += size
+            if 0 <= position < size:
+                positions.add(position)
+            else:
+                print(f'Invalid todo index {todo_index}. Skipping.')
+        return sorted(positions)
+
+    def add_many(self, items: list) -> list:
+        """
+        Adds many todo items to the list of todos at once.
+
+        Parameters:
+            items (list): (title, description) pairs of the todo items to add.
+
+        Returns:
+            list: The new todo items.
+        """
+        todos = [Todo(title, description) for title, description in items]
+        self.todos.extend(todos)
+        if self.index is not None:
+            for todo in todos:
+                self.index.add(todo.id, todo.done)
+        print(f'{len(todos)} todo items saved successfully!')
+        return todos
+
+    def mark_many_done(self, todo_indexes: list) -> list:
+        """
+        Marks many todo items as done at once.
+
+        Parameters:
+            todo_indexes (list): The indexes of the todo items to mark as done.
+
+        Returns:
+            list: The todo items that were marked as done.
+        """
+        todos = []
+        for position in self.valid_indexes(todo_indexes):
+            todo = self.todos[position]
+            todo.completed()
+            self.todos[position] = todo
+            todos.append(todo)
+            if self.index is not None:
+                self.index.mark_done(todo.id)
+        print(f'{len(todos)} todo items marked as done successfully!')
+        return todos
+
+    def delete_many(self, todo_indexes: list) -> list:
+        """
+        Deletes many todo items at once, after a single confirmation.
+
+        Parameters:
+            todo_indexes (list): The indexes of the todo items to delete.
+
+        Returns:
+            list: The deleted todo items, empty if the deletion was cancelled.
+        """
+        positions = self.valid_indexes(todo_indexes)
+        if not positions:
+            print('No todos to delete.')
+            return []
+        if not self.confirm(f'Confirm deletion of {len(positions)} todos?'):
+            print('Deletion cancelled.')
+            return []
+        return self.remove_todos(positions)
+
+    def remove_todos(self, positions: list) -> list:
+        """
+        Deletes the todo items at the given positions without a confirmation.
+
+        Parameters:
+            positions (list): The distinct, valid positions of the todo items, in ascending order.
+
+        Returns:
+            list: The deleted todo items.
+        """
+        if isinstance(self.todos, list):
+            doomed = set(positions)
+            todos = [self.todos[position] for position in positions]
+            self.todos[:] = [todo for position, todo in enumerate(self.todos) if position not in doomed]
+        else:
+            todos = [self.todos.pop(position) for position in reversed(positions)][::-1]
+        if self.index is not None:
+            for todo in todos:
+                self.index.remove(todo.id)
+        print(f'{len(todos)} todo items deleted successfully!')
+        return todos
+
     @staticmethod
     def confirm(prompt: str) -> bool:
         """